@@ -0,0 +1,5 @@
+"""
+Benchmark suite of regex4ocr with a synthetic receipts corpus.
+
+Run it with: python -m benchmarks.run --help
+"""
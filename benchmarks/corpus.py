@@ -0,0 +1,186 @@
+"""
+Module with the synthetic corpus generators: receipts OCR strings that look
+like the brazilian tax coupons and folders with many store specific DRMs.
+"""
+import os
+import random
+
+# items regexp of the DRMs table, too long for a line of the DRM template
+INLINE_NAMED_GROUP_CAPTURES = (
+    r"\d{3}\s+(?P<code>\d+)\s+(?P<description>.+?)\s+(?P<qty>\d+)\s*"
+    r"(?P<unit>[a-z]+)\s*x\s*(?P<price>\d+,\d{2})"
+)
+
+DRM_TEMPLATE = """identifiers:
+  - cupom fiscal
+  - loja\\s+{store_id:05d}
+priority: {priority}
+fields:
+  cnpj: 'cnpj:\\s*(\\d{{2}}\\.\\d{{3}}\\.\\d{{3}}\\/\\d{{4}}-?\\d{{2}})'
+  coo: 'coo:\\s*(\\d{{6}})'
+  date: '\\d{{2}}\\/\\d{{2}}\\/\\d{{4}}\\s*\\d{{2}}:\\d{{2}}:\\d{{2}}'
+  total: 'total\\s*r\\$\\s*(\\d+,\\d{{2}})'
+uniqueness_fields: ["cnpj", "coo"]
+options:
+  lowercase: true
+  remove_whitespace: false
+  force_ascii: true
+  replace:
+    - ['c00', 'coo']
+    - ['c10', 'coo']
+    - ['-+', '']
+    - ['bun', '3un']
+    - ['boun', '30un']
+    - ['b0un', '30un']
+table:
+  header: (item|iten)\\s+codigo.*vl.*(?=\\n)
+  line_start: \\n\\d{{3}}\\s+\\d+
+  inline_named_group_captures: {inline_named_group_captures}
+  footer: total\\s*r\\$
+types:
+  fields:
+    cnpj: str
+    coo: int
+    date: [datetime, '%d/%m/%Y %H:%M:%S']
+  table:
+    inline_named_group_captures:
+      code: int
+      qty: int
+      unit: str
+"""
+
+PRODUCTS = [
+    "cimento votoran todas as obras 50 kg",
+    "areia media lavada",
+    "pedra brita 1",
+    "tijolo ceramico 6 furos",
+    "argamassa colante ac1",
+    "tubo pvc esgoto 100mm",
+    "cal hidratada",
+    "vergalhao ca50 10mm",
+]
+
+ACCENTED_PRODUCTS = [
+    "CIMENTO VOTORAN ÇÃO MÉDIA",
+    "Areia Média Lavada",
+    "Tijolo Cerâmico 6 Furos",
+    "Argamassa Colante Açaí",
+]
+
+NOISE_WORDS = ["****", "ttccf", "ie:", "im:", "f1", "$17", "(ht)", "cred)"]
+
+
+def generate_receipt(rand, store_id, rows=10, noise=0.0, accents=False):
+    """
+    Generates the OCR string of a synthetic receipt of a store.
+
+    Args:
+        rand (random.Random): random generator of the corpus;
+        store_id (int): store identifier matched by its DRM;
+        rows (int): number of items of the receipt table;
+        noise (float): probability of OCR noise in each line;
+        accents (bool): uses accented uppercase text in the items.
+
+    Returns:
+        (str): the synthetic OCR string.
+    """
+    products = ACCENTED_PRODUCTS if accents else PRODUCTS
+
+    lines = [
+        "Loja {:05d} Comercio de Materiais".format(store_id),
+        "cnpj: {:02d}.{:03d}.{:03d}/0001-{:02d}".format(
+            rand.randint(10, 99),
+            rand.randint(100, 999),
+            rand.randint(100, 999),
+            rand.randint(10, 99),
+        ),
+        "ie: 111.111.111 111",
+        "{:02d}/{:02d}/2018 {:02d}:{:02d}:{:02d} ccf:{:06d} c00:{:06d}".format(
+            rand.randint(1, 28),
+            rand.randint(1, 12),
+            rand.randint(0, 23),
+            rand.randint(0, 59),
+            rand.randint(0, 59),
+            rand.randint(0, 999999),
+            rand.randint(0, 999999),
+        ),
+        "CUPOM FISCAL",
+        "item codigo descricao qtd un vl unit r$ vl item(r$)",
+    ]
+
+    total = 0
+
+    for item in range(1, rows + 1):
+        qty = rand.randint(1, 40)
+        price = rand.randint(100, 99999)
+        total += qty * price
+
+        lines.append(
+            "{:03d} {} {} {}{} x {},{:02d}".format(
+                item,
+                rand.randint(1000, 99999),
+                rand.choice(products),
+                qty,
+                rand.choice(["un", "kg", "bun", "b0un"]),
+                price // 100,
+                price % 100,
+            )
+        )
+
+        if rand.random() < noise:
+            lines.append(" ".join(rand.sample(NOISE_WORDS, 3)))
+
+    lines.append("TOTAL R$ {},{:02d}".format(total // 100, total % 100))
+    lines.append("dinheiro")
+
+    return "\n".join(lines) + "\n"
+
+
+def write_drms_folder(drms_path, count):
+    """
+    Writes a folder with store specific DRMs, one for each store identifier
+    from 0 to count - 1.
+
+    Args:
+        drms_path (str): folder path of the DRMs, created if needed;
+        count (int): number of DRMs.
+    """
+    os.makedirs(drms_path, exist_ok=True)
+
+    for store_id in range(count):
+        file_path = os.path.join(drms_path, "drm_{:05d}.yml".format(store_id))
+
+        with open(file_path, "w") as stream:
+            stream.write(
+                DRM_TEMPLATE.format(
+                    store_id=store_id,
+                    priority=0,
+                    inline_named_group_captures=INLINE_NAMED_GROUP_CAPTURES,
+                )
+            )
+
+
+def generate_corpus(drm_count, docs, rows, noise=0.0, accents=False, seed=0):
+    """
+    Generates the OCR strings of receipts from random stores of a folder
+    with drm_count DRMs.
+
+    Args:
+        drm_count (int): number of DRMs (stores) of the folder;
+        docs (int): number of receipts;
+        rows (int): number of items of each receipt;
+        noise (float): probability of OCR noise in each line;
+        accents (bool): uses accented uppercase text in the items;
+        seed (int): seed of the random generator.
+
+    Returns:
+        (list): list of OCR strings.
+    """
+    rand = random.Random(seed)
+
+    return [
+        generate_receipt(
+            rand, rand.randrange(drm_count), rows, noise=noise, accents=accents
+        )
+        for _ in range(docs)
+    ]
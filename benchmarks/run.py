@@ -0,0 +1,238 @@
+"""
+Benchmark runner that measures each parsing stage over synthetic corpora of
+increasing DRM counts and table sizes and emits the results as JSON.
+
+Usage:
+
+    python -m benchmarks.run --drm-counts 10 100 1000 --rows 10 100 500 \
+        --docs 200 --output results.json
+"""
+import argparse
+import copy
+import json
+import logging
+import math
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus import generate_corpus, write_drms_folder
+from regex4ocr.parser.drm_scanner import get_all_drms_match, scan_drms_folder
+from regex4ocr.parser.extraction import extract_ocr_data
+from regex4ocr.parser.pre_process import pre_process_result
+from regex4ocr.parser.registry import DrmRegistry
+from regex4ocr.parser.type_casting import validate_types
+
+timer = time.perf_counter
+
+
+def percentile(sorted_values, fraction):
+    """
+    Nearest rank percentile of an already sorted list of values.
+    """
+    if not sorted_values:
+        return None
+
+    # the rank is rounded first so that e.g. 0.07 * 100 is not taken as 8
+    rank = max(math.ceil(round(fraction * len(sorted_values), 9)) - 1, 0)
+
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(latencies):
+    """
+    Summarizes a list of latencies (seconds) in milliseconds.
+    """
+    values = sorted(latencies)
+    total = sum(values)
+
+    return {
+        "count": len(values),
+        "mean_ms": total / len(values) * 1000,
+        "p50_ms": percentile(values, 0.50) * 1000,
+        "p95_ms": percentile(values, 0.95) * 1000,
+        "p99_ms": percentile(values, 0.99) * 1000,
+        "per_sec": len(values) / total if total else None,
+    }
+
+
+def measure(function, *args):
+    """
+    Returns the result and the wall time of a function call.
+    """
+    start = timer()
+    result = function(*args)
+
+    return result, timer() - start
+
+
+def run_scenario(drm_count, rows, docs, noise, accents, work_dir):
+    """
+    Measures all the parsing stages of a corpus of docs receipts with the
+    given number of table rows parsed with a folder of drm_count DRMs.
+    """
+    drms_path = os.path.join(work_dir, "drms_{}".format(drm_count))
+
+    if not os.path.isdir(drms_path):
+        write_drms_folder(drms_path, drm_count)
+
+    corpus = generate_corpus(
+        drm_count, docs, rows, noise=noise, accents=accents, seed=rows
+    )
+
+    stages = {
+        name: []
+        for name in (
+            "identification",
+            "identification_linear",
+            "pre_process",
+            "extraction",
+            "type_casting",
+            "parse",
+        )
+    }
+
+    drm_dicts, scan_time = measure(scan_drms_folder, drms_path)
+    registry, load_time = measure(DrmRegistry, drms_path)
+    linear_drms = list(registry.drms)
+    matched = 0
+
+    for ocr_result in corpus:
+        drms, elapsed = measure(get_all_drms_match, ocr_result, registry.drms)
+        stages["identification"].append(elapsed)
+
+        _, elapsed = measure(get_all_drms_match, ocr_result, linear_drms)
+        stages["identification_linear"].append(elapsed)
+
+        if not drms:
+            continue
+
+        drm = drms[0]
+        untyped_drm = {k: v for k, v in drm.items() if k != "types"}
+
+        pre_processed, elapsed = measure(pre_process_result, ocr_result, drm)
+        stages["pre_process"].append(elapsed)
+
+        data, elapsed = measure(extract_ocr_data, pre_processed, drm)
+        stages["extraction"].append(elapsed)
+        matched += bool(data)
+
+        untyped_data = copy.deepcopy(
+            extract_ocr_data(pre_processed, untyped_drm)
+        )
+        _, elapsed = measure(validate_types, untyped_data, drm)
+        stages["type_casting"].append(elapsed)
+
+        _, elapsed = measure(registry.parse, ocr_result)
+        stages["parse"].append(elapsed)
+
+    return {
+        "drm_count": drm_count,
+        "rows": rows,
+        "docs": docs,
+        "matched_docs": matched,
+        "doc_size_mean": sum(map(len, corpus)) / len(corpus),
+        "scan_drms_folder_ms": scan_time * 1000,
+        "registry_load_ms": load_time * 1000,
+        "valid_drms": len(drm_dicts),
+        "stages": {
+            name: summarize(latencies)
+            for name, latencies in stages.items()
+            if latencies
+        },
+    }
+
+
+def run(args):
+    """
+    Runs the scaling curves: DRM counts with a fixed number of rows and
+    then rows with a fixed DRM count.
+    """
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="regex4ocr_bench_")
+    scenarios = []
+
+    try:
+        for drm_count in args.drm_counts:
+            scenarios.append(
+                run_scenario(
+                    drm_count,
+                    args.rows[0],
+                    args.docs,
+                    args.noise,
+                    args.accents,
+                    work_dir,
+                )
+            )
+
+        for rows in args.rows[1:]:
+            scenarios.append(
+                run_scenario(
+                    args.drm_counts[0],
+                    rows,
+                    args.docs,
+                    args.noise,
+                    args.accents,
+                    work_dir,
+                )
+            )
+
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        "metadata": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "arguments": {
+                key: value
+                for key, value in vars(args).items()
+                if key not in ("output", "work_dir")
+            },
+        },
+        "scenarios": scenarios,
+    }
+
+
+def parse_args(argv=None):
+    """
+    Parses the benchmark command line arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--drm-counts", type=int, nargs="+", default=[1, 10, 100, 1000]
+    )
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--docs", type=int, default=100)
+    parser.add_argument("--noise", type=float, default=0.1)
+    parser.add_argument("--accents", action="store_true")
+    parser.add_argument("--work-dir", help="keeps the generated DRM folders")
+    parser.add_argument("--output", help="JSON file, defaults to stdout")
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Benchmark entry point.
+    """
+    args = parse_args(argv)
+
+    # the library logs are not part of what is being measured
+    logging.getLogger().setLevel(logging.WARNING)
+
+    results = json.dumps(run(args), indent=2)
+
+    if args.output:
+        with open(args.output, "w") as stream:
+            stream.write(results)
+    else:
+        sys.stdout.write(results + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,16 @@ Init module to expose the regex4ocr function.
 """
 from regex4ocr.logger.formatter import config_log
 
+from .aio import aload_registry, aparse, aparse_many
+from .batch import parse_many
+from .cache import MemoryBackend, ResultCache, SqliteBackend
+from .dedup import DuplicateIndex
 from .main import parse
+from .parser.registry import DrmRegistry
+from .parser.spans import materialize
+from .parser.stats import ParseStats
+from .preload import memory_report, preload
+from .uniqueness import UniquenessStore
 
 # configures the application logger
 config_log()
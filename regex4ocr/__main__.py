@@ -0,0 +1,8 @@
+"""
+Allows running the command line interface with python -m regex4ocr.
+"""
+import sys
+
+from regex4ocr.cli import main
+
+sys.exit(main())
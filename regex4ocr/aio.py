@@ -0,0 +1,253 @@
+"""
+Module with the asyncio API to parse OCR results without blocking the
+event loop. The parsing runs on an executor (threads or processes).
+"""
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+from regex4ocr.batch import BatchResult
+from regex4ocr.parser.parser import FIRST_MATCH
+from regex4ocr.parser.registry import get_registry
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_document(ocr_result, drms_path, selection, options):
+    """
+    Parses an OCR result with the cached registry of the DRMs folder. It is
+    a module function so it can be sent to process pool executors, where
+    each worker process keeps its own cached registry.
+    """
+    return get_registry(drms_path).parse(
+        ocr_result, selection=selection, **options
+    )
+
+
+def _check_cache(executor, cache):
+    """
+    Refuses the results caches with the process pool executors, whose
+    worker processes would get pickled copies of the cache, which hold
+    locks and database connections that can not be pickled.
+    """
+    if cache is not None and isinstance(executor, ProcessPoolExecutor):
+        raise ValueError(
+            "The results cache is not available with process pool "
+            "executors, use a thread pool executor."
+        )
+
+
+async def aload_registry(drms_path="./drms", executor=None):
+    """
+    Loads the default cached registry of a DRMs folder on an executor so
+    the event loop is not blocked while the DRMs are scanned.
+
+    Args:
+        drms_path (str): filesys path to the folder with the
+                         document regexp models (drms);
+        executor (Executor): executor of the loading, defaults to the event
+                             loop default executor.
+
+    Returns:
+        (DrmRegistry): the cached registry of the folder.
+    """
+    loop = asyncio.get_running_loop()
+
+    return await loop.run_in_executor(executor, get_registry, drms_path)
+
+
+async def aparse(
+    ocr_result,
+    drms_path="./drms",
+    executor=None,
+    timeout=None,
+    selection=FIRST_MATCH,
+    deadline=None,
+    regex_timeout=None,
+    select=None,
+    cache=None,
+):
+    """
+    Parses an OCR result on an executor and awaits its extracted data.
+
+    When the call is cancelled or times out, its result is discarded. The
+    parsing itself is not interrupted, so a thread executor keeps it
+    running until it is done.
+
+    Args:
+        ocr_result (str): OCR result string;
+        drms_path (str): filesys path to the folder with the
+                         document regexp models (drms);
+        executor (Executor): thread or process pool executor, defaults to
+                             the event loop default executor;
+        timeout (float): seconds to wait for the result, None waits forever;
+        selection (str): DRM selection mode, see parse_ocr_result;
+        deadline (float): seconds available to parse the document, see
+                          regex4ocr.parse. Unlike the timeout, the sections
+                          extracted in time are returned;
+        regex_timeout (float): seconds available to each extraction regexp,
+                               see regex4ocr.parse;
+        select (list): sections of the data to be extracted, see
+                       regex4ocr.parse;
+        cache (ResultCache): optional cache of the results, see
+                             regex4ocr.ResultCache. Only available with the
+                             thread executors.
+
+    Returns:
+        (dict): the extracted data, see regex4ocr.parse.
+
+    Raises:
+        asyncio.TimeoutError: if the result is not ready within the timeout.
+        ValueError: if a cache is given with a process pool executor.
+    """
+    _check_cache(executor, cache)
+
+    loop = asyncio.get_running_loop()
+    options = {
+        "deadline": deadline,
+        "regex_timeout": regex_timeout,
+        "select": select,
+        "cache": cache,
+    }
+    future = loop.run_in_executor(
+        executor, _parse_document, ocr_result, drms_path, selection, options
+    )
+
+    return await asyncio.wait_for(future, timeout)
+
+
+async def aparse_many(
+    ocr_results,
+    drms_path="./drms",
+    executor=None,
+    concurrency=4,
+    timeout=None,
+    selection=FIRST_MATCH,
+    deadline=None,
+    regex_timeout=None,
+    select=None,
+    cache=None,
+):
+    """
+    Parses many OCR results on an executor and yields their results as soon
+    as they are done. The OCR results and their results go through bounded
+    queues, so a slow executor applies backpressure on the input iterable
+    and a slow consumer of the results stops the parsing.
+
+    Args:
+        ocr_results (iterable): iterable or async iterable of OCR results;
+        drms_path (str): filesys path to the folder with the
+                         document regexp models (drms);
+        executor (Executor): thread or process pool executor, defaults to
+                             the event loop default executor;
+        concurrency (int): maximum number of OCR results parsed at once;
+        timeout (float): seconds to wait for each OCR result;
+        selection (str): DRM selection mode, see parse_ocr_result;
+        deadline (float): seconds available to parse each document;
+        regex_timeout (float): seconds available to each extraction regexp;
+        select (list): sections of the data to be extracted;
+        cache (ResultCache): optional cache of the results, see aparse.
+
+    Yields:
+        (BatchResult): namedtuple with the input index of the OCR result,
+                       its extracted data and the error message if its
+                       parsing failed or timed out.
+
+    Raises:
+        ValueError: if the concurrency is not positive or if a cache is
+                    given with a process pool executor.
+    """
+    if concurrency < 1:
+        raise ValueError("The concurrency must be positive: %s" % concurrency)
+
+    _check_cache(executor, cache)
+
+    inputs = asyncio.Queue(maxsize=concurrency * 2)
+    outputs = asyncio.Queue(maxsize=concurrency)
+    done = object()  # marks the end of the inputs and of each worker
+
+    async def finish():
+        for _ in range(concurrency):
+            await inputs.put(done)
+
+    async def produce():
+        index = 0
+
+        try:
+            if hasattr(ocr_results, "__aiter__"):
+                async for ocr_result in ocr_results:
+                    await inputs.put((index, ocr_result))
+                    index += 1
+            else:
+                for ocr_result in ocr_results:
+                    await inputs.put((index, ocr_result))
+                    index += 1
+
+        # the consumers are cancelled along with the producer when the
+        # results are no longer read, so the full inputs queue never drains
+        except asyncio.CancelledError:
+            raise
+
+        except BaseException:
+            await finish()
+            raise
+
+        await finish()
+
+    async def consume():
+        while True:
+            item = await inputs.get()
+
+            if item is done:
+                await outputs.put(done)
+                return
+
+            index, ocr_result = item
+
+            try:
+                data = await aparse(
+                    ocr_result,
+                    drms_path,
+                    executor,
+                    timeout,
+                    selection,
+                    deadline,
+                    regex_timeout,
+                    select,
+                    cache,
+                )
+                await outputs.put(BatchResult(index, data, None))
+
+            except asyncio.TimeoutError:
+                error = "TimeoutError: parsing took more than %ss" % timeout
+                await outputs.put(BatchResult(index, None, error))
+
+            except (asyncio.CancelledError, KeyboardInterrupt, SystemExit):
+                raise
+
+            except BaseException as exc:  # pylint: disable=broad-except
+                logger.warning("Failed to parse OCR result %s: %s", index, exc)
+                error = "%s: %s" % (type(exc).__name__, exc)
+                await outputs.put(BatchResult(index, None, error))
+
+    tasks = [asyncio.ensure_future(produce())]
+    tasks.extend(asyncio.ensure_future(consume()) for _ in range(concurrency))
+
+    try:
+        running = concurrency
+
+        while running:
+            result = await outputs.get()
+
+            if result is done:
+                running -= 1
+                continue
+
+            yield result
+
+        # surfaces the errors of the input iterable
+        await tasks[0]
+
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,350 @@
+"""
+Module to parse many OCR results at once with a pool of worker processes.
+"""
+import copy
+import logging
+import os
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+from regex4ocr.parser.drm_scanner import get_first_drm_match
+from regex4ocr.parser.limits import ParseLimits
+from regex4ocr.parser.parser import (
+    FIRST_MATCH,
+    extract_pre_processed,
+    extract_uniqueness_fields,
+)
+from regex4ocr.parser.pre_process import pre_process_result
+from regex4ocr.parser.registry import get_registry
+from regex4ocr.parser.stats import timer
+from regex4ocr.uniqueness import UniquenessStore
+
+logger = logging.getLogger(__name__)
+
+# result of a single OCR document of a batch
+BatchResult = namedtuple("BatchResult", ["index", "data", "error"])
+
+
+def _init_worker(drms_path):
+    """
+    Loads the DRMs registry once when a worker process starts.
+    """
+    get_registry(drms_path)
+
+
+def _identify(chunk, registry, deadline, regex_timeout):
+    """
+    Identifies the DRMs of the OCR results of a chunk and extracts their
+    uniqueness keys. Only the DRMs identification, the pre processing and
+    the uniqueness fields regexps are evaluated, the extraction of the new
+    documents is finished from them by parse_chunk.
+
+    The time limits of each document are only used for its uniqueness
+    fields here, its deadline clock is not kept running while the other
+    documents of the chunk are identified and extracted: the seconds left
+    are kept instead, see _resume_limits.
+
+    Returns:
+        (dict): (drm, pre_processed_result, key, deadline, skipped) tuples
+                by the indexes of the OCR results, where deadline is the
+                number of seconds left to parse the document and skipped the
+                sections skipped so far. drm is None if no DRM matches. The
+                documents that failed are missing, their errors are left to
+                their full parsing.
+    """
+    identified = {}
+    drms = registry.drms
+
+    for index, ocr_result in chunk:
+        start = timer()
+        limits = None
+
+        try:
+            if deadline is not None or regex_timeout is not None:
+                limits = ParseLimits(deadline, regex_timeout)
+
+            drm = get_first_drm_match(ocr_result, drms)
+            pre_processed_result = uniqueness_fields = None
+
+            if drm:
+                pre_processed_result = pre_process_result(ocr_result, drm)
+                uniqueness_fields = extract_uniqueness_fields(
+                    pre_processed_result, drm, limits
+                )
+
+        except (KeyboardInterrupt, SystemExit):
+            raise
+
+        except BaseException:  # pylint: disable=broad-except
+            continue
+
+        key = None
+
+        if drm:
+            key = UniquenessStore.make_key(
+                getattr(drm, "name", None),
+                {"uniqueness_fields": uniqueness_fields},
+            )
+
+        left = None
+
+        if deadline is not None:
+            left = max(deadline - (timer() - start), 0)
+
+        skipped = [] if limits is None else limits.skipped
+        identified[index] = (drm, pre_processed_result, key, left, skipped)
+
+    return identified
+
+
+def _resume_limits(deadline, regex_timeout, skipped):
+    """
+    Returns the time limits of the extraction of an identified document,
+    whose deadline clock starts again right before it.
+
+    Args:
+        deadline (float): seconds left to parse the document;
+        regex_timeout (float): seconds available to each extraction regexp;
+        skipped (list): sections already skipped by the identification.
+
+    Returns:
+        (ParseLimits): the time limits or None if there are no limits.
+    """
+    if deadline is None and regex_timeout is None:
+        return None
+
+    limits = ParseLimits(deadline, regex_timeout)
+    limits.skipped.extend(skipped)
+
+    return limits
+
+
+def parse_chunk(
+    chunk,
+    drms_path,
+    selection=FIRST_MATCH,
+    deadline=None,
+    regex_timeout=None,
+    uniqueness_store=None,
+    skip_duplicates=False,
+):
+    """
+    Parses a chunk of OCR results with the cached registry of the DRMs
+    folder. Errors are returned instead of being raised so one broken
+    document does not stop the whole batch.
+
+    With a uniqueness store, the DRMs and the uniqueness keys of the whole
+    chunk are extracted first and looked up at once. The documents whose
+    keys are stored, or repeated within the chunk, are not parsed again.
+    The extraction of the new documents is finished from their matched DRM
+    and pre processed string, so they are only identified once, and their
+    results are stored at the end of the chunk.
+
+    Args:
+        chunk (list): list of (index, ocr_result) tuples;
+        drms_path (str): filesys path to the folder with the
+                         document regexp models (drms);
+        selection (str): DRM selection mode, see parse_ocr_result;
+        deadline (float): seconds available to parse each document;
+        regex_timeout (float): seconds available to each extraction regexp;
+        uniqueness_store (UniquenessStore): optional store of the results
+                                            by their uniqueness fields;
+        skip_duplicates (bool): leaves out the results of the documents
+                                already stored instead of returning their
+                                stored results.
+
+    Returns:
+        (list): list of BatchResult of each OCR result of the chunk.
+    """
+    registry = get_registry(drms_path)
+    results = []
+    identified = {}
+    stored = {}
+    new_results = []
+
+    if uniqueness_store is not None:
+        identified = _identify(chunk, registry, deadline, regex_timeout)
+        stored = uniqueness_store.get_many(
+            {item[2] for item in identified.values() if item[2] is not None}
+        )
+
+    for index, ocr_result in chunk:
+        key = None
+
+        try:
+            if index in identified:
+                drm, pre_processed, key, left, skipped = identified[index]
+
+                if key in stored:
+                    logger.debug(
+                        "Document %s is already stored: %s", index, key
+                    )
+
+                    if not skip_duplicates:
+                        data = copy.deepcopy(stored[key])
+                        results.append(BatchResult(index, data, None))
+
+                    continue
+
+                data = {}
+
+                if drm:
+                    limits = _resume_limits(left, regex_timeout, skipped)
+                    data = extract_pre_processed(
+                        pre_processed, drm, limits=limits
+                    )
+
+            else:
+                data = registry.parse(
+                    ocr_result,
+                    selection=selection,
+                    deadline=deadline,
+                    regex_timeout=regex_timeout,
+                )
+
+            results.append(BatchResult(index, data, None))
+
+            if key is not None and data:
+                stored[key] = data
+                new_results.append((key, data))
+
+        except (KeyboardInterrupt, SystemExit):
+            raise
+
+        except BaseException as exc:  # pylint: disable=broad-except
+            logger.warning("Failed to parse OCR result %s: %s", index, exc)
+            error = "%s: %s" % (type(exc).__name__, exc)
+            results.append(BatchResult(index, None, error))
+
+    if new_results:
+        uniqueness_store.put_many(new_results)
+
+    return results
+
+
+def _chunks(ocr_results, chunksize):
+    """
+    Splits the OCR results iterable in lists of (index, ocr_result) tuples.
+    """
+    iterator = enumerate(ocr_results)
+
+    while True:
+        chunk = list(islice(iterator, chunksize))
+
+        if not chunk:
+            return
+
+        yield chunk
+
+
+def parse_many(
+    ocr_results,
+    drms_path="./drms",
+    workers=None,
+    chunksize=100,
+    ordered=True,
+    selection=FIRST_MATCH,
+    deadline=None,
+    regex_timeout=None,
+    uniqueness_store=None,
+    skip_duplicates=False,
+):
+    """
+    Parses many OCR results strings with a pool of worker processes. Each
+    worker loads the DRMs folder only once and the OCR results are sent to
+    the workers in chunks, so the input iterable is consumed lazily.
+
+    Args:
+        ocr_results (iterable): iterable of OCR results strings;
+        drms_path (str): filesys path to the folder with the
+                         document regexp models (drms);
+        workers (int): number of worker processes, defaults to the number
+                       of CPUs. With 1 worker, the OCR results are parsed in
+                       the current process;
+        chunksize (int): number of OCR results sent to a worker at once;
+        ordered (bool): yields the results in the input order. Otherwise,
+                        the results are yielded as soon as their chunks
+                        are done;
+        selection (str): DRM selection mode, see parse_ocr_result;
+        deadline (float): seconds available to parse each document, see
+                          parse_ocr_result;
+        regex_timeout (float): seconds available to each extraction regexp.
+                               Each worker evaluates the regexps in its own
+                               helper process;
+        uniqueness_store (UniquenessStore): optional store of the results by
+                                            their uniqueness fields, the
+                                            documents already stored are not
+                                            parsed again, see parse_chunk.
+                                            Only available with the
+                                            'first_match' selection;
+        skip_duplicates (bool): does not yield the documents already stored
+                                instead of yielding their stored results.
+
+    Yields:
+        (BatchResult): namedtuple with the input index of the OCR result,
+                       its extracted data and the error message if its
+                       parsing failed (data is None in this case).
+    """
+    workers = workers or os.cpu_count() or 1
+    options = (selection, deadline, regex_timeout)
+
+    if uniqueness_store is not None:
+        if selection != FIRST_MATCH:
+            raise ValueError(
+                "The uniqueness store is only available with the "
+                "'first_match' selection."
+            )
+
+        if workers > 1 and uniqueness_store.path == ":memory:":
+            raise ValueError(
+                "The in memory uniqueness store is not shared with the "
+                "worker processes, use a SQLite file path."
+            )
+
+        options += (uniqueness_store, skip_duplicates)
+
+    if workers == 1:
+        for chunk in _chunks(ocr_results, chunksize):
+            yield from parse_chunk(chunk, drms_path, *options)
+
+        return
+
+    # bounds the number of chunks held in memory
+    max_pending = workers * 2
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(drms_path,)
+    ) as executor:
+        pending = deque()
+
+        try:
+            for chunk in _chunks(ocr_results, chunksize):
+                pending.append(
+                    executor.submit(parse_chunk, chunk, drms_path, *options)
+                )
+
+                if len(pending) >= max_pending:
+                    yield from _pop_done(pending, ordered)
+
+            while pending:
+                yield from _pop_done(pending, ordered)
+
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _pop_done(pending, ordered):
+    """
+    Waits for the next done chunk and returns its results. In the ordered
+    mode, the next chunk is always the oldest one.
+    """
+    if ordered:
+        return pending.popleft().result()
+
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    future = done.pop()
+    pending.remove(future)
+
+    return future.result()
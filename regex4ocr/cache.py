@@ -0,0 +1,340 @@
+"""
+Module with the results cache of the parsed OCR documents. The same OCR
+string is often parsed many times, e.g. when mobile clients retry their
+uploads, so its result is kept by a hash of the OCR string, the version of
+the DRMs registry and the parse options. The results are stored as pickled
+bytes by a pluggable backend: in process memory or a SQLite file shared by
+the workers of a host.
+"""
+import hashlib
+import logging
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# clock of the results expiration, it must be the same for all the workers
+# that share a SQLite cache
+clock = time.time
+
+
+class CacheBackend:
+    """
+    Interface of the results cache backends, which store the pickled
+    results by their keys. The backends evict the results on their own,
+    e.g. the least recently used ones or the expired ones.
+    """
+
+    def get(self, key):
+        """
+        Returns the stored value of a key.
+
+        Args:
+            key (str): hex digest key of the result.
+
+        Returns:
+            (bytes): the pickled result or None if it is not stored.
+        """
+        raise NotImplementedError
+
+    def set(self, key, value):
+        """
+        Stores the value of a key.
+
+        Args:
+            key (str): hex digest key of the result;
+            value (bytes): the pickled result.
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        """
+        Removes all the stored values.
+        """
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """
+    In process cache backend with LRU and optional TTL eviction.
+
+    Args:
+        max_size (int): maximum number of stored results, the least recently
+                        used one is evicted when it is exceeded;
+        ttl (float): seconds a result is kept, None keeps it until evicted.
+    """
+
+    def __init__(self, max_size=1024, ttl=None):
+        if max_size < 1:
+            raise ValueError(
+                "The cache max size must be positive: %s" % max_size
+            )
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self._values = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._values.get(key)
+
+            if item is None:
+                return None
+
+            value, expires = item
+
+            if expires is not None and clock() >= expires:
+                del self._values[key]
+                return None
+
+            self._values.move_to_end(key)
+
+            return value
+
+    def set(self, key, value):
+        expires = None if self.ttl is None else clock() + self.ttl
+
+        with self._lock:
+            self._values[key] = (value, expires)
+            self._values.move_to_end(key)
+
+            while len(self._values) > self.max_size:
+                self._values.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def __len__(self):
+        return len(self._values)
+
+
+class SqliteBackend(CacheBackend):
+    """
+    Cache backend stored in a SQLite file, which may be shared by the
+    worker processes of a host. It has LRU and optional TTL eviction.
+
+    The stored results are not counted on each write, which would walk the
+    whole table: each connection counts its own writes and only counts the
+    table again, evicting the least recently used results in a single
+    batch, once they exceed the max_size by a tenth of it. So the cache may
+    hold up to that many more results, times the number of processes
+    writing to it.
+
+    Args:
+        path (str): path of the SQLite database file;
+        max_size (int): maximum number of stored results, the least recently
+                        used ones are evicted when it is exceeded, see
+                        above;
+        ttl (float): seconds a result is kept, None keeps it until evicted;
+        timeout (float): seconds to wait for the database locks.
+    """
+
+    def __init__(self, path, max_size=100000, ttl=None, timeout=5.0):
+        if max_size < 1:
+            raise ValueError(
+                "The cache max size must be positive: %s" % max_size
+            )
+
+        self.path = path
+        self.max_size = max_size
+        self.ttl = ttl
+        self._slack = max_size // 10
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, timeout=timeout, check_same_thread=False
+        )
+
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+                "expires REAL, accessed REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS results_accessed "
+                "ON results (accessed)"
+            )
+            self._size = self._count()
+
+    def get(self, key):
+        now = clock()
+
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT value, expires FROM results WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            value, expires = row
+
+            if expires is not None and now >= expires:
+                self._connection.execute(
+                    "DELETE FROM results WHERE key = ?", (key,)
+                )
+                return None
+
+            self._connection.execute(
+                "UPDATE results SET accessed = ? WHERE key = ?", (now, key)
+            )
+
+        return value
+
+    def set(self, key, value):
+        now = clock()
+        expires = None if self.ttl is None else now + self.ttl
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                (key, value, expires, now),
+            )
+            # the replaced keys are counted too, until the next count
+            self._size += 1
+
+            if self._size > self.max_size + self._slack:
+                self._evict()
+
+    def _count(self):
+        return self._connection.execute(
+            "SELECT COUNT(*) FROM results"
+        ).fetchone()[0]
+
+    def _evict(self):
+        """
+        Counts the stored results and evicts the least recently used ones
+        that exceed the max size, in a single batch.
+        """
+        self._size = self._count()
+        excess = self._size - self.max_size
+
+        if excess > 0:
+            self._connection.execute(
+                "DELETE FROM results WHERE key IN (SELECT key FROM results "
+                "ORDER BY accessed LIMIT ?)",
+                (excess,),
+            )
+            self._size = self.max_size
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM results")
+            self._size = 0
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        with self._lock:
+            self._connection.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._count()
+
+
+class ResultCache:
+    """
+    Cache of the parse results, see regex4ocr.parse. The results of the
+    documents whose sections were skipped because of the time limits are
+    not cached.
+
+    Args:
+        backend (CacheBackend): storage of the results, defaults to a
+                                MemoryBackend with its default size.
+
+    Attributes:
+        hits (int): number of results found in the cache;
+        misses (int): number of results not found in the cache.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = MemoryBackend() if backend is None else backend
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(ocr_result, version, *options):
+        """
+        Hashes the OCR string, the version of the DRMs registry and the
+        parse options into a cache key.
+
+        Args:
+            ocr_result (str): OCR result string;
+            version (str): version of the DRMs registry;
+            options: parse options that change the results.
+
+        Returns:
+            (str): hex digest of the key.
+        """
+        key = hashlib.blake2b(digest_size=16)
+        key.update(repr((version, options)).encode())
+        key.update(b"\0")
+        key.update(ocr_result.encode("utf-8", "surrogatepass"))
+
+        return key.hexdigest()
+
+    def get(self, key):
+        """
+        Returns the cached result of a key.
+
+        Args:
+            key (str): key returned by make_key.
+
+        Returns:
+            the parse result or None if it is not cached.
+        """
+        value = self.backend.get(key)
+
+        if value is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+
+        return pickle.loads(value)
+
+    def set(self, key, result):
+        """
+        Caches the parse result of a key.
+
+        Args:
+            key (str): key returned by make_key;
+            result: the parse result.
+        """
+        results = result if isinstance(result, list) else [result]
+
+        if any("skipped_sections" in data for data in results):
+            logger.debug("Partial result is not cached: %s", key)
+            return
+
+        self.backend.set(key, pickle.dumps(result, pickle.HIGHEST_PROTOCOL))
+
+    def clear(self):
+        """
+        Removes all the cached results and resets the counters.
+        """
+        self.backend.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.backend)
+
+    def __repr__(self):
+        return "ResultCache(hits=%s, misses=%s, size=%s)" % (
+            self.hits,
+            self.misses,
+            len(self),
+        )
@@ -0,0 +1,68 @@
+"""
+Command line interface of regex4ocr.
+
+Usage:
+
+    python -m regex4ocr compile-drms ./drms [--output bundle.json] [--strict]
+"""
+import argparse
+import sys
+
+from regex4ocr.parser.bundle import compile_drms, default_bundle_path
+
+
+def compile_drms_command(args):
+    """
+    Validates a DRM directory folder and writes its compiled DRMs bundle.
+    """
+    bundle_path = args.output or default_bundle_path(args.drms_path)
+    bundle, invalid = compile_drms(args.drms_path, bundle_path, args.strict)
+
+    for name, reason in sorted(invalid.items()):
+        sys.stderr.write("invalid DRM file %s: %s\n" % (name, reason))
+
+    if invalid and args.strict:
+        sys.stderr.write("bundle was not written, fix the invalid files\n")
+        return 1
+
+    sys.stdout.write(
+        "wrote %s DRMs to %s (version %s)\n"
+        % (len(bundle["files"]) - len(invalid), bundle_path, bundle["version"])
+    )
+
+    return 0
+
+
+def parse_args(argv=None):
+    """
+    Parses the command line arguments.
+    """
+    parser = argparse.ArgumentParser(prog="regex4ocr")
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    compile_parser = commands.add_parser(
+        "compile-drms",
+        help="validates a DRM folder and writes its compiled DRMs bundle",
+    )
+    compile_parser.add_argument("drms_path", help="DRM directory folder")
+    compile_parser.add_argument(
+        "--output", help="bundle file path, defaults to the DRM folder"
+    )
+    compile_parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="fails without writing the bundle if any file is invalid",
+    )
+    compile_parser.set_defaults(function=compile_drms_command)
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+    """
+    args = parse_args(argv)
+
+    return args.function(args)
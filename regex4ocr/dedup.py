@@ -0,0 +1,283 @@
+"""
+Module with the near duplicate documents index. Two scans of the same paper
+document never have the exact same OCR string, so the results cache does not
+find them. The index keeps a MinHash fingerprint of the words of each parsed
+document and finds the previously parsed documents whose words are similar
+enough with a LSH (locality sensitive hashing) banding of the fingerprints.
+"""
+import logging
+import pickle
+import re
+import threading
+from collections import OrderedDict
+
+from regex4ocr.parser.literals import fold_case
+
+logger = logging.getLogger(__name__)
+
+# words of the normalized OCR strings
+WORD_REGEXP = re.compile(r"\w+")
+
+# value of the fingerprint bins without any word
+EMPTY_BIN = (1 << 64) - 1
+
+
+class DuplicateIndex:
+    """
+    In memory index of the parsed documents fingerprints. The fingerprint
+    is a one permutation MinHash of the set of case folded words of the OCR
+    string: each word hash goes to one of its bands * rows bins, which keep
+    their smallest hash. The ratio of equal bins of two fingerprints
+    estimates the Jaccard similarity of their words.
+
+    Two fingerprints are compared only when all the bins of one of their
+    bands are equal, which finds the documents with similarity above about
+    (1 / bands) ** (1 / rows) without comparing all of them. The word hashes
+    use the python hash function, so the fingerprints are only valid within
+    the same process.
+
+    Args:
+        threshold (float): minimum similarity of a duplicate, from 0 to 1;
+        max_size (int): maximum number of indexed documents, the least
+                        recently used one is evicted when it is exceeded;
+        reuse (bool): returns the result of the duplicate instead of
+                      parsing the document again, only when the uniqueness
+                      fields of the duplicate are the ones extracted from
+                      the document. Otherwise, the documents are parsed and
+                      only flagged as duplicates;
+        bands (int): number of LSH bands of the fingerprints;
+        rows (int): number of bins of each band.
+
+    Attributes:
+        lookups (int): number of documents looked up;
+        duplicates (int): number of duplicates found.
+    """
+
+    def __init__(
+        self, threshold=0.8, max_size=10000, reuse=False, bands=16, rows=8
+    ):
+        if not 0 < threshold <= 1:
+            raise ValueError("The threshold must be in (0, 1]: %s" % threshold)
+
+        if max_size < 1:
+            raise ValueError(
+                "The index max size must be positive: %s" % max_size
+            )
+
+        self.threshold = threshold
+        self.max_size = max_size
+        self.reuse = reuse
+        self.bands = bands
+        self.rows = rows
+        self.lookups = 0
+        self.duplicates = 0
+
+        self._bins = bands * rows
+        self._entries = OrderedDict()
+        self._buckets = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def fingerprint(self, ocr_result):
+        """
+        Computes the MinHash fingerprint of an OCR string.
+
+        Args:
+            ocr_result (str): OCR result string.
+
+        Returns:
+            (tuple): the smallest word hash of each bin.
+        """
+        bins = self._bins
+        mins = [EMPTY_BIN] * bins
+
+        for word in set(WORD_REGEXP.findall(fold_case(ocr_result))):
+            word_hash = hash(word) & EMPTY_BIN
+            index = word_hash % bins
+
+            if word_hash < mins[index]:
+                mins[index] = word_hash
+
+        return tuple(mins)
+
+    @staticmethod
+    def similarity(fingerprint, other):
+        """
+        Estimates the similarity of the words of two fingerprints.
+
+        Args:
+            fingerprint (tuple): fingerprint of a document;
+            other (tuple): fingerprint of another document.
+
+        Returns:
+            (float): ratio of the equal bins, from 0 to 1, ignoring the bins
+                     that are empty in both fingerprints.
+        """
+        equal = empty = 0
+
+        for value, other_value in zip(fingerprint, other):
+            if value == other_value:
+                if value == EMPTY_BIN:
+                    empty += 1
+                else:
+                    equal += 1
+
+        compared = len(fingerprint) - empty
+
+        return equal / compared if compared else 0.0
+
+    def _band_keys(self, fingerprint, context):
+        rows = self.rows
+
+        for band in range(self.bands):
+            values = fingerprint[band * rows : (band + 1) * rows]
+
+            # the bands without words would match all the short documents
+            if values.count(EMPTY_BIN) < rows:
+                yield (context, band, values)
+
+    def find(self, fingerprint, context=None):
+        """
+        Finds the most similar indexed document of a fingerprint.
+
+        Args:
+            fingerprint (tuple): fingerprint of the document;
+            context: hashable parse context of the document, such as the
+                     DRMs version and the parse options, only the documents
+                     of the same context are compared.
+
+        Returns:
+            (tuple): (similarity, result) of the most similar document above
+                     the threshold, or None if there is no such document.
+        """
+        best = None
+
+        with self._lock:
+            self.lookups += 1
+            candidates = set()
+
+            for key in self._band_keys(fingerprint, context):
+                candidates.update(self._buckets.get(key, ()))
+
+            for entry_id in candidates:
+                similarity = self.similarity(
+                    fingerprint, self._entries[entry_id][0]
+                )
+
+                if similarity >= self.threshold and (
+                    best is None or similarity > best[0]
+                ):
+                    best = (similarity, entry_id)
+
+            if best is None:
+                return None
+
+            self.duplicates += 1
+            self._entries.move_to_end(best[1])
+            result = self._entries[best[1]][1]
+
+        logger.debug("Found a duplicate with similarity: %s", best[0])
+
+        return best[0], pickle.loads(result)
+
+    def add(self, fingerprint, result, context=None):
+        """
+        Indexes the result of a document. The results of the documents whose
+        sections were skipped because of the time limits are not indexed.
+
+        Args:
+            fingerprint (tuple): fingerprint of the document;
+            result: the parse result of the document;
+            context: hashable parse context of the document, see find.
+        """
+        results = result if isinstance(result, list) else [result]
+
+        if any("skipped_sections" in data for data in results):
+            logger.debug("Partial result is not indexed...")
+            return
+
+        keys = tuple(self._band_keys(fingerprint, context))
+        value = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (fingerprint, value, keys)
+
+            for key in keys:
+                self._buckets.setdefault(key, set()).add(entry_id)
+
+            while len(self._entries) > self.max_size:
+                self._evict()
+
+    def _evict(self):
+        entry_id, (_, _, keys) = self._entries.popitem(last=False)
+
+        for key in keys:
+            bucket = self._buckets[key]
+            bucket.discard(entry_id)
+
+            if not bucket:
+                del self._buckets[key]
+
+    def clear(self):
+        """
+        Removes all the indexed documents and resets the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+            self.lookups = 0
+            self.duplicates = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return "DuplicateIndex(lookups=%s, duplicates=%s, size=%s)" % (
+            self.lookups,
+            self.duplicates,
+            len(self),
+        )
+
+
+def get_uniqueness_values(ocr_data):
+    """
+    Returns the uniqueness fields of each parse result, which tell apart the
+    similar documents that are not duplicates, e.g. two receipts of the same
+    store with the same items.
+
+    Args:
+        ocr_data: the parse result, a dict or a list of dicts.
+
+    Returns:
+        (list): the uniqueness fields of each result, or None if any result
+                has no uniqueness fields.
+    """
+    results = ocr_data if isinstance(ocr_data, list) else [ocr_data]
+    values = [data.get("uniqueness_fields") for data in results]
+
+    if not values or not all(values):
+        return None
+
+    return values
+
+
+def flag_duplicate(ocr_data, similarity):
+    """
+    Adds the similarity of the duplicate document to the parse results.
+
+    Args:
+        ocr_data: the parse result, a dict or a list of dicts;
+        similarity (float): similarity of the duplicate document.
+
+    Returns:
+        the parse result with the 'duplicate' key in its non empty dicts.
+    """
+    results = ocr_data if isinstance(ocr_data, list) else [ocr_data]
+
+    for data in results:
+        if data:
+            data["duplicate"] = {"similarity": similarity}
+
+    return ocr_data
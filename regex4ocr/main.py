@@ -3,31 +3,88 @@ Main module to parse OCR results.
 """
 import logging
 
-from regex4ocr.parser.drm_scanner import scan_drms_folder
-from regex4ocr.parser.parser import parse_ocr_result
+from regex4ocr.parser.parser import FIRST_MATCH
+from regex4ocr.parser.registry import get_registry
 
 logger = logging.getLogger(__name__)
 
 
-def parse(ocr_result, drms_path="./drms"):
+def parse(
+    ocr_result,
+    drms_path="./drms",
+    auto_reload=False,
+    selection=FIRST_MATCH,
+    stats=None,
+    deadline=None,
+    regex_timeout=None,
+    spans=False,
+    select=None,
+    cache=None,
+    duplicates=None,
+):
     """
     Applies regexp rules to the ocr result string in order to extract the
     desired data and convert it to a final JSON (Python dict) format.
 
+    The DRMs folder is scanned only on the first call for each drms_path,
+    the following calls reuse its cached registry of compiled DRMs.
+
     Args:
         ocr_result (str): OCR result string;
         drms_path (str): filesys path to the folder with the
-                         document regexp models (drms).
+                         document regexp models (drms);
+        auto_reload (bool or float): checks the DRMs folder for new, edited
+                                     or deleted files before parsing, at
+                                     most once per these seconds, True for
+                                     once per second;
+        selection (str): 'first_match' uses the first DRM that matches the
+                         OCR string, 'all_matches' uses all of them;
+        stats (ParseStats): optional object filled with the timings of each
+                            parsing stage and other statistics, see
+                            regex4ocr.ParseStats;
+        deadline (float): seconds available to parse the document. The
+                          sections that are not extracted in time are
+                          skipped and listed in the 'skipped_sections' key;
+        regex_timeout (float): seconds available to each extraction regexp,
+                               which are evaluated in a helper process;
+        spans (bool): returns the table header, all_rows, footer and rows
+                      as offsets into the pre processed OCR string, whose
+                      substrings are created only when accessed. Not
+                      available with the deadline or the regex_timeout;
+        select (list): sections of the data to be extracted and returned:
+                       'fields', 'fields.<field>', 'table' and
+                       'uniqueness_fields', e.g. ['fields.cnpj']. The other
+                       sections are skipped, but the uniqueness fields are
+                       always checked. None extracts all of them;
+        cache (ResultCache): optional cache of the results, the same OCR
+                             string is not parsed again until the DRMs
+                             change, see regex4ocr.ResultCache;
+        duplicates (DuplicateIndex): optional index of the parsed documents
+                                     fingerprints, the near duplicates of a
+                                     parsed OCR string, such as rescans,
+                                     are flagged or reuse its result, see
+                                     regex4ocr.DuplicateIndex.
 
     Returns:
         (dict): Python dict with the results or None if no DRM
-                matches the ocr_result string.
+                matches the ocr_result string. A list of dicts with the
+                results of each matching DRM for the 'all_matches' selection.
     """
-    logger.info("Scanning DRMs directory...")
-    drm_dicts = scan_drms_folder(drms_path)
+    logger.info("Getting the DRMs registry...")
+    registry = get_registry(drms_path, auto_reload=auto_reload)
 
     logger.info("Parsing the OCR string result...")
-    ocr_data = parse_ocr_result(ocr_result, drm_dicts)
+    ocr_data = registry.parse(
+        ocr_result,
+        selection=selection,
+        stats=stats,
+        deadline=deadline,
+        regex_timeout=regex_timeout,
+        spans=spans,
+        select=select,
+        cache=cache,
+        duplicates=duplicates,
+    )
 
     logger.info("Returning the parsed OCR data...\n%s", ocr_data)
 
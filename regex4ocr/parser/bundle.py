@@ -0,0 +1,192 @@
+"""
+Module with the compiled DRMs bundle: a single JSON file with all the
+validated DRMs of a DRM directory folder, so a cold start reads one file
+instead of parsing every yml file of the folder.
+"""
+import json
+import logging
+import os
+import re
+
+from regex4ocr.parser.compiler import compile_drm
+from regex4ocr.parser.drm_scanner import (
+    BUNDLE_FILE_NAME,
+    drms_version,
+    hash_file,
+    load_drm,
+    stat_drms_folder,
+)
+
+logger = logging.getLogger(__name__)
+
+# version of the bundle file layout, bundles of other versions are ignored
+BUNDLE_FORMAT = 1
+
+
+def default_bundle_path(drms_path):
+    """
+    Returns the path of the bundle file of a DRM directory folder.
+
+    Args:
+        drms_path (str): file system folder path of the drms.
+
+    Returns:
+        (str): file system path of the bundle file.
+    """
+    return os.path.join(drms_path, BUNDLE_FILE_NAME)
+
+
+def build_bundle(drms_path):
+    """
+    Loads and validates all the files of a DRM directory folder. A file is
+    valid if it is a valid DRM whose regexps compile.
+
+    The valid DRMs with values that JSON does not hold, such as the dates
+    of the yml files, are left out of the bundle, so the registry loads
+    them from their yml files.
+
+    Args:
+        drms_path (str): file system folder path of the drms.
+
+    Returns:
+        (tuple): the bundle dict and a dict with the names of the invalid
+                 files as keys and the reasons as values.
+    """
+    files = {}
+    invalid = {}
+    content_hashes = {}
+
+    for name, signature in sorted(stat_drms_folder(drms_path).items()):
+        file_path = os.path.join(drms_path, name)
+        drm = load_drm(file_path)
+
+        if drm is None:
+            invalid[name] = "not a valid DRM yml file"
+
+        else:
+            try:
+                compile_drm(drm)
+            except re.error as exc:
+                invalid[name] = "invalid regexp: %s" % exc
+                drm = None
+
+        content_hashes[name] = hash_file(file_path)
+
+        if drm is not None and not is_serializable(drm):
+            logger.warning(
+                "DRM file %s has values that the bundle does not hold, it "
+                "is left out of the bundle",
+                name,
+            )
+            continue
+
+        files[name] = {
+            "signature": list(signature),
+            "content_hash": content_hashes[name],
+            "drm": drm,
+        }
+
+    bundle = {
+        "format": BUNDLE_FORMAT,
+        "version": drms_version(content_hashes),
+        "files": files,
+    }
+
+    return bundle, invalid
+
+
+def is_serializable(drm):
+    """
+    Checks if a DRM dict is made of the JSON types only.
+
+    Args:
+        drm (dict): DRM dict loaded from a yml file.
+
+    Returns:
+        (bool): True if the DRM can be written to the bundle as it is.
+    """
+    try:
+        json.dumps(drm)
+    except (TypeError, ValueError):
+        return False
+
+    return True
+
+
+def write_bundle(bundle, bundle_path):
+    """
+    Writes a bundle file atomically, so a running registry never reads a
+    partially written bundle.
+
+    Args:
+        bundle (dict): bundle dict created by build_bundle;
+        bundle_path (str): file system path of the bundle file.
+    """
+    temp_path = "%s.%s.tmp" % (bundle_path, os.getpid())
+
+    with open(temp_path, "w") as stream:
+        json.dump(bundle, stream, separators=(",", ":"), sort_keys=True)
+
+    os.replace(temp_path, bundle_path)
+
+
+def read_bundle(bundle_path):
+    """
+    Reads a whole bundle file in one go.
+
+    Args:
+        bundle_path (str): file system path of the bundle file.
+
+    Returns:
+        (dict): the bundle dict or None if the file does not exist, is
+                broken or has another format version.
+    """
+    try:
+        with open(bundle_path, "rb") as stream:
+            bundle = json.loads(stream.read())
+
+    except FileNotFoundError:
+        return None
+
+    except (OSError, ValueError) as exc:
+        logger.warning("Ignoring broken DRMs bundle %s: %s", bundle_path, exc)
+        return None
+
+    if not isinstance(bundle, dict) or bundle.get("format") != BUNDLE_FORMAT:
+        logger.warning(
+            "Ignoring DRMs bundle of another format: %s", bundle_path
+        )
+        return None
+
+    return bundle
+
+
+def compile_drms(drms_path, bundle_path=None, strict=False):
+    """
+    Validates a DRM directory folder and writes its bundle file.
+
+    Args:
+        drms_path (str): file system folder path of the drms;
+        bundle_path (str): file system path of the bundle file, defaults to
+                           the bundle file inside the DRM folder;
+        strict (bool): does not write the bundle if any file is invalid.
+
+    Returns:
+        (tuple): the bundle dict and the invalid files, see build_bundle.
+    """
+    bundle_path = bundle_path or default_bundle_path(drms_path)
+    bundle, invalid = build_bundle(drms_path)
+
+    if invalid and strict:
+        logger.warning("Invalid DRM files, the bundle was not written...")
+        return bundle, invalid
+
+    write_bundle(bundle, bundle_path)
+
+    logger.info(
+        "Wrote %s DRMs to the bundle: %s",
+        len(bundle["files"]) - len(invalid),
+        bundle_path,
+    )
+
+    return bundle, invalid
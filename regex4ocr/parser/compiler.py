@@ -0,0 +1,124 @@
+"""
+Module with the functions that pre compile all the regexps of a DRM so
+they are not compiled again for every parsed OCR document.
+"""
+import logging
+import re
+
+from regex4ocr.parser.literals import folded_literal_matcher
+from regex4ocr.parser.plan import ExtractionPlan
+from regex4ocr.parser.pre_process import compile_replaces
+
+logger = logging.getLogger(__name__)
+
+# type of the objects returned by re.compile
+PATTERN_TYPE = type(re.compile(""))
+
+# keys of the DRM 'table' section that hold regexps
+TABLE_REGEXP_KEYS = (
+    "header",
+    "line_start",
+    "inline_named_group_captures",
+    "footer",
+)
+
+
+class CompiledDrm(dict):
+    """
+    Dict of a compiled DRM which also carries its extraction plan, used by
+    extract_ocr_data instead of navigating the DRM dict for each document,
+    and the matchers of its identifiers used by has_drm_match: a
+    (search, folded_matcher) tuple for each identifier, where the
+    folded_matcher is None unless the identifier is a literal, see
+    folded_literal_matcher.
+
+    The DRMs of a registry also carry the name of their file in the name
+    attribute, which identifies the DRM, e.g. in the uniqueness store keys.
+    """
+
+    __slots__ = ("plan", "matchers", "name")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.plan = None
+        self.matchers = None
+        self.name = None
+
+    def __reduce__(self):
+        # the plan holds closures, so the DRM is pickled as a plain dict
+        return (dict, (dict(self),))
+
+
+def compile_regexp(regexp, flags=0):
+    """
+    Compiles a DRM regexp. Already compiled regexps are returned as they are.
+
+    Args:
+        regexp (str): regexp string or an already compiled regexp;
+        flags (int): re module flags used to compile the regexp.
+
+    Returns:
+        (re.Pattern): the compiled regexp.
+    """
+    if isinstance(regexp, PATTERN_TYPE):
+        return regexp
+
+    return re.compile(regexp, flags)
+
+
+def compile_drm(drm):
+    """
+    Creates a copy of a valid DRM dict where all the identifiers, fields,
+    replaces and table regexps are pre compiled. The literal replaces are
+    fused whenever possible, see compile_replaces. The returned DRM keeps the
+    same structure of the original one so it can be used by all the parser
+    functions, but the identifiers and replaces lists are tuples since the
+    compiled DRMs are never changed. The returned DRM also carries its
+    ExtractionPlan in the plan attribute and its identifiers matchers in
+    the matchers attribute.
+
+    Args:
+        drm (dict): valid DRM dict with the regexps as strings.
+
+    Returns:
+        (dict): DRM dict with all the regexps compiled.
+    """
+    logger.debug("Compiling DRM regexps...")
+
+    compiled_drm = CompiledDrm(drm)
+
+    # identifiers are always matched ignoring the case
+    compiled_drm["identifiers"] = tuple(
+        compile_regexp(id_regexp, re.IGNORECASE)
+        for id_regexp in drm["identifiers"]
+    )
+
+    compiled_drm["fields"] = {
+        field: compile_regexp(regexp) for field, regexp in drm["fields"].items()
+    }
+
+    options = drm.get("options")
+
+    if options and options.get("replace"):
+        compiled_drm["options"] = dict(options)
+        compiled_drm["options"]["replace"] = tuple(
+            compile_replaces(options["replace"])
+        )
+
+    table = drm.get("table")
+
+    if table:
+        compiled_drm["table"] = {
+            key: compile_regexp(value)
+            if key in TABLE_REGEXP_KEYS and value
+            else value
+            for key, value in table.items()
+        }
+
+    compiled_drm.matchers = tuple(
+        (id_regexp.search, folded_literal_matcher(id_regexp))
+        for id_regexp in compiled_drm["identifiers"]
+    )
+    compiled_drm.plan = ExtractionPlan(compiled_drm)
+
+    return compiled_drm
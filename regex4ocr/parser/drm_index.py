@@ -0,0 +1,232 @@
+"""
+Module with the DRM identification index. The index extracts the required
+literals of all the DRMs identifiers once and scans the OCR result string
+only once with a multi pattern matcher in order to find the few DRMs whose
+identifiers regexps are worth running.
+"""
+import logging
+from collections import deque
+
+from regex4ocr.parser.literals import fold_case, required_literals
+
+logger = logging.getLogger(__name__)
+
+# up to this number of literals, searching each literal with the str 'in'
+# operator is faster than the pure python Aho-Corasick scan
+SCAN_LITERALS_LIMIT = 64
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton that finds all the occurrences of many literal
+    strings with a single scan of the text.
+
+    Args:
+        words (list): list of literal strings to be searched.
+    """
+
+    def __init__(self, words):
+        self.words = list(words)
+
+        # goto transitions, failure links and the words ended at each state
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [frozenset()]
+        self._alphabet = set()
+
+        for word_id, word in enumerate(self.words):
+            self._add_word(word_id, word)
+
+        self._build_failure_links()
+
+    def _add_word(self, word_id, word):
+        state = 0
+
+        for char in word:
+            next_state = self._goto[state].get(char)
+
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(frozenset())
+
+            state = next_state
+            self._alphabet.add(char)
+
+        self._out[state] = self._out[state] | {word_id}
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fail = self._fail[state]
+
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+
+                fail = self._goto[fail].get(char, 0)
+
+                self._fail[next_state] = fail
+                self._out[next_state] = self._out[next_state] | self._out[fail]
+
+    def find_all(self, text):
+        """
+        Scans the text once and returns the ids of the words found in it.
+
+        Args:
+            text (str): text to be scanned.
+
+        Returns:
+            (set): the indexes of the found words in the words list.
+        """
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        alphabet = self._alphabet
+
+        found = set()
+        state = 0
+
+        for char in text:
+            if char not in alphabet:
+                state = 0
+                continue
+
+            while state and char not in goto[state]:
+                state = fail[state]
+
+            state = goto[state].get(char, 0)
+
+            if out[state]:
+                found.update(out[state])
+
+        return found
+
+
+class DrmIndex:
+    """
+    Identification index of a list of DRMs. Behaves as the list of DRMs and
+    also returns the candidate DRMs for an OCR result string: the DRMs whose
+    identifiers required literals were all found in the string, plus the DRMs
+    without any required literal. The candidates keep the DRMs list order.
+
+    The index is never changed after it is built, so it only holds tuples
+    which are smaller than lists and can be shared by forked processes.
+
+    Indexes with few literals search each literal in the OCR result string
+    instead of using the Aho-Corasick automaton, see SCAN_LITERALS_LIMIT.
+
+    Args:
+        drms (list): list of all DRMs dicts.
+    """
+
+    def __init__(self, drms):
+        self.drms = tuple(drms)
+
+        literal_ids = {}
+
+        # DRMs positions by literal id and the number of literals of each DRM
+        self._drms_by_literal = []
+        self._literals_count = []
+        self._unfiltered = []
+
+        for position, drm in enumerate(self.drms):
+            literals = {
+                literal
+                for id_regexp in drm["identifiers"]
+                for literal in required_literals(id_regexp)
+            }
+
+            if not literals:
+                self._unfiltered.append(position)
+
+            for literal in literals:
+                if literal not in literal_ids:
+                    literal_ids[literal] = len(literal_ids)
+                    self._drms_by_literal.append([])
+
+                self._drms_by_literal[literal_ids[literal]].append(position)
+
+            self._literals_count.append(len(literals))
+
+        self._drms_by_literal = tuple(map(tuple, self._drms_by_literal))
+        self._literals_count = tuple(self._literals_count)
+        self._unfiltered = tuple(self._unfiltered)
+        self._literals = tuple(literal_ids)
+        self._automaton = (
+            AhoCorasick(self._literals)
+            if len(self._literals) > SCAN_LITERALS_LIMIT
+            else None
+        )
+
+        logger.debug(
+            "Built DRMs index with %s literals, %s DRMs are not indexed...",
+            len(literal_ids),
+            len(self._unfiltered),
+        )
+
+    def __iter__(self):
+        return iter(self.drms)
+
+    def __len__(self):
+        return len(self.drms)
+
+    def __getitem__(self, position):
+        return self.drms[position]
+
+    def find_literals(self, folded):
+        """
+        Returns the ids of the literals found in a case folded string.
+
+        Args:
+            folded (str): OCR result string folded with fold_case.
+
+        Returns:
+            (set): the ids of the found literals.
+        """
+        if self._automaton is not None:
+            return self._automaton.find_all(folded)
+
+        return {
+            literal_id
+            for literal_id, literal in enumerate(self._literals)
+            if literal in folded
+        }
+
+    def candidates(self, ocr_result, folded=None):
+        """
+        Returns the DRMs whose identifiers may match the OCR result string.
+
+        Args:
+            ocr_result (str): OCR result string;
+            folded (str): the OCR result string already folded with
+                          fold_case, if any.
+
+        Returns:
+            (list): list of the candidate DRMs dicts.
+        """
+        if folded is None:
+            folded = fold_case(ocr_result)
+
+        found_literals = self.find_literals(folded)
+        hits = {}
+
+        for literal_id in found_literals:
+            for position in self._drms_by_literal[literal_id]:
+                hits[position] = hits.get(position, 0) + 1
+
+        positions = [
+            position
+            for position, count in hits.items()
+            if count == self._literals_count[position]
+        ]
+        positions.extend(self._unfiltered)
+
+        return [self.drms[position] for position in sorted(positions)]
@@ -2,60 +2,220 @@
 Module to analyze the Document Regexp Model (DRM) directory in order
 to load the available DRMs for the document parser.
 """
+import hashlib
 import logging
 import os
 import re
 
+from regex4ocr.parser.compiler import compile_regexp
+from regex4ocr.parser.drm_index import DrmIndex
+from regex4ocr.parser.literals import fold_case
 from regex4ocr.parser.validation import is_valid_drm
 from regex4ocr.parser.yml_parser import parse_yml
 
 logger = logging.getLogger(__name__)
 
+# name of the compiled DRMs bundle file kept in the DRM directory folder
+BUNDLE_FILE_NAME = "drms.bundle.json"
 
-def has_drm_match(ocr_result, drm):
+
+def has_drm_match(ocr_result, drm, stats=None, folded=None):
     """
-    Checks if a drm matches the ocr_result format.
+    Checks if a drm matches the ocr_result format. The literal identifiers
+    of the compiled DRMs are searched with str methods in the case folded
+    OCR result string instead of the regexp engine.
 
     Args:
         ocr_result (str): OCR result string;
-        drm (dict): DRM dict object for parsing the OCR string.
+        drm (dict): DRM dict object for parsing the OCR string;
+        stats (ParseStats): optional statistics of the parsing;
+        folded (str): the OCR result string already folded with fold_case,
+                      so it is folded only once for all the DRMs.
 
     Returns:
         (bool): Returns True if the DRM identifier matches with
                 OCR result string.
     """
-    id_regexps = drm["identifiers"]
+    matchers = getattr(drm, "matchers", None)
+
+    if matchers is None:
+        matchers = [
+            (compile_regexp(id_regexp, re.IGNORECASE).search, None)
+            for id_regexp in drm["identifiers"]
+        ]
+
+    if stats is not None:
+        stats.drms_tested += 1
+
+    for search, folded_matcher in matchers:
+        if stats is not None:
+            stats.regexes_executed += 1
+
+        if folded_matcher is None:
+            if not search(ocr_result):
+                return False
 
-    for id_regexp in id_regexps:
-        regexp = re.compile(id_regexp, re.IGNORECASE)
+            continue
 
-        if not re.search(regexp, ocr_result):
+        if folded is None:
+            folded = fold_case(ocr_result)
+
+        if not folded_matcher(folded):
             return False
 
     return True
 
 
-def get_all_drms_match(ocr_result, drms):
+def get_all_drms_match(ocr_result, drms, stats=None):
     """
     Returns all DRM dicts that matches the OCR string document model.
 
+    If the drms are a DrmIndex, only its candidate DRMs for the OCR string
+    are tested with the identifiers regexps.
+
     Args:
         ocr_result (str): OCR result string;
-        drms (dict): list of all DRMs dicts found in the DRM directory folder.
+        drms (dict): list of all DRMs dicts found in the DRM directory folder
+                     or a DrmIndex of them;
+        stats (ParseStats): optional statistics of the parsing.
 
     Returns:
         (list): List of all DRM dicts that matches the OCR document string or
                 an empty list if there are no DRM matches.
     """
-    drm_matches = [drm for drm in drms if has_drm_match(ocr_result, drm)]
+    folded = fold_case(ocr_result)
+
+    if isinstance(drms, DrmIndex):
+        drms = drms.candidates(ocr_result, folded)
+
+    drm_matches = [
+        drm for drm in drms if has_drm_match(ocr_result, drm, stats, folded)
+    ]
 
     return drm_matches
 
 
+def get_first_drm_match(ocr_result, drms, stats=None):
+    """
+    Returns the first DRM dict that matches the OCR string document model.
+    The identifiers of the following DRMs are not evaluated.
+
+    Args:
+        ocr_result (str): OCR result string;
+        drms (dict): list of all DRMs dicts found in the DRM directory folder
+                     or a DrmIndex of them;
+        stats (ParseStats): optional statistics of the parsing.
+
+    Returns:
+        (dict): the first DRM dict that matches the OCR document string or
+                None if there are no DRM matches.
+    """
+    folded = fold_case(ocr_result)
+
+    if isinstance(drms, DrmIndex):
+        drms = drms.candidates(ocr_result, folded)
+
+    for drm in drms:
+        if has_drm_match(ocr_result, drm, stats, folded):
+            return drm
+
+    return None
+
+
+def sort_drms_by_priority(drms):
+    """
+    Sorts the DRMs by their optional 'priority' key, the DRMs with higher
+    priorities are evaluated first. DRMs without a priority have priority 0
+    and DRMs with the same priority keep their original order.
+
+    Args:
+        drms (list): list of DRMs dicts.
+
+    Returns:
+        (list): new list with the sorted DRMs dicts.
+    """
+    return sorted(drms, key=lambda drm: -drm.get("priority", 0))
+
+
+def stat_drms_folder(drms_path):
+    """
+    Performs a cheap stat check of all the files of a DRM directory folder,
+    except for the compiled DRMs bundle.
+
+    Args:
+        drms_path (str): file system folder path of the drms.
+
+    Returns:
+        (dict): file names as keys and (mtime_ns, size) tuples as values.
+    """
+    signatures = {}
+
+    for entry in os.scandir(drms_path):
+        if entry.is_file() and entry.name != BUNDLE_FILE_NAME:
+            stat = entry.stat()
+            signatures[entry.name] = (stat.st_mtime_ns, stat.st_size)
+
+    return signatures
+
+
+def hash_file(file_path):
+    """
+    Computes the content hash of a file.
+
+    Args:
+        file_path (str): file system path of the file.
+
+    Returns:
+        (str): hex digest of the file contents.
+    """
+    with open(file_path, "rb") as stream:
+        return hashlib.sha1(stream.read()).hexdigest()
+
+
+def drms_version(content_hashes):
+    """
+    Computes the version of a DRM directory folder from its files.
+
+    Args:
+        content_hashes (dict): file names as keys and their content hashes
+                               as values.
+
+    Returns:
+        (str): hex digest that changes whenever a file is added, removed,
+               renamed or edited.
+    """
+    return hashlib.sha1(
+        "".join(
+            name + content_hashes[name] for name in sorted(content_hashes)
+        ).encode()
+    ).hexdigest()
+
+
+def load_drm(file_path):
+    """
+    Loads a single DRM yml file.
+
+    Args:
+        file_path (str): file system path of the DRM yml file.
+
+    Returns:
+        (dict): the DRM dict or None if the file is not a valid DRM.
+    """
+    logger.debug("Reading file %s...", file_path)
+
+    drm_dict = parse_yml(file_path)
+
+    if drm_dict and is_valid_drm(drm_dict):
+        return drm_dict
+
+    return None
+
+
 def scan_drms_folder(drms_path):
     """
     Scans the DRM directory in order to load a list of available
-    DRMs to parse the ocr result string.
+    DRMs to parse the ocr result string. The DRMs are sorted by their
+    priorities and then by their file names.
 
     Args:
         drms_path (str): file system folder path of the drms
@@ -68,14 +228,15 @@ def scan_drms_folder(drms_path):
     drms = []
 
     for file in all_files:
-        logger.debug("Reading file %s...", base_path + file)
+        if file == BUNDLE_FILE_NAME:
+            continue
 
-        drm_dict = parse_yml(base_path + file)
+        drm_dict = load_drm(base_path + file)
 
-        if drm_dict and is_valid_drm(drm_dict):
+        if drm_dict:
             logger.debug("Appending valid DRM...")
             drms.append(drm_dict)
 
     logger.debug("Returning scanned DRMs...")
 
-    return drms
+    return sort_drms_by_priority(drms)
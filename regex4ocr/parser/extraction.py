@@ -3,21 +3,32 @@ Module with all the data extraction functions used after the OCR result
 string pre processing stage.
 """
 import logging
-import re
 
+from regex4ocr.parser.limits import finditer, search
+from regex4ocr.parser.regions import region_window, uses_table
+from regex4ocr.parser.stats import timer
 from regex4ocr.parser.type_casting import validate_types
 
 logger = logging.getLogger(__name__)
 
 
-def extract_fields(ocr_result, drm):
+def extract_fields(ocr_result, drm, limits=None):
     """
     Performs field extraction of the pre processed OCR result. This function
-    uses the key 'fields' of DRM and its regexps to extract the data.
+    uses the key 'fields' of DRM and its regexps to extract the data. The
+    regexps of the fields declared in the optional 'regions' key are only
+    searched within their regions of the OCR result.
+
+    When the DRM key 'sequential' is true, the fields are searched in their
+    declaration order and each search starts at the end of the previous
+    match. A field that is not found after the previous match is searched
+    again in its whole region unless the DRM key 'sequential_fallback' is
+    false, such a match does not move the search start.
 
     Args:
         ocr_result (str): OCR result string;
-        drm (dict): DRM dict object for parsing the OCR string.
+        drm (dict): DRM dict object for parsing the OCR string;
+        limits (ParseLimits): optional time limits of the extraction.
 
     Returns:
         (dict): Dict with all the 'fields' of the DRM as the keys and
@@ -39,11 +50,36 @@ def extract_fields(ocr_result, drm):
         }
     """
     fields_dict = drm["fields"]  # required yml key
+    regions = drm.get("regions") or {}
+    sequential = drm.get("sequential")
+    fallback = drm.get("sequential_fallback", True)
     data = {}
+    header = footer = None
+    cursor = 0
+
+    if regions and drm.get("table") and uses_table(regions):
+        header, footer = find_table_markers(ocr_result, drm, limits)
 
     # traverses all regexp
     for field, regexp in fields_dict.items():
-        rslt = re.search(regexp, ocr_result)
+        section = "fields." + field
+        pos, endpos = region_window(
+            regions.get(field), ocr_result, header, footer
+        )
+
+        if sequential:
+            rslt = search(
+                regexp, ocr_result, limits, section, max(pos, cursor), endpos
+            )
+
+            if rslt:
+                cursor = rslt.end()
+            elif fallback and cursor > pos:
+                logger.debug("Searching field %s in its region...", field)
+                rslt = search(regexp, ocr_result, limits, section, pos, endpos)
+
+        else:
+            rslt = search(regexp, ocr_result, limits, section, pos, endpos)
 
         if rslt:
             logger.debug("Found regexp for field: %s", field)
@@ -59,15 +95,43 @@ def extract_fields(ocr_result, drm):
     return data
 
 
-def extract_table_data(ocr_result, drm):
+def find_table_markers(ocr_result, drm, limits=None):
+    """
+    Searches the header and the footer of the DRM table. The footer is only
+    searched after the end of the header match.
+
+    Args:
+        ocr_result (str): already pre processed OCR result string;
+        drm (dict): DRM dict object with a 'table' section;
+        limits (ParseLimits): optional time limits of the extraction.
+
+    Returns:
+        (tuple): (header, footer) matches, each one may be None.
+    """
+    table = drm["table"]
+    header = search(table["header"], ocr_result, limits, "table")
+
+    if not header:
+        return None, None
+
+    footer = search(
+        table["footer"], ocr_result, limits, "table", header.end()
+    )
+
+    return header, footer
+
+
+def extract_table_data(ocr_result, drm, limits=None):
     """
     Performs extraction of tabular data from the pre processed OCR result
     string. Returns a substring of the pre processed OCR string that is
-    between the 'header' and 'footer' of the DRM regexp keys.
+    between the 'header' and 'footer' of the DRM regexp keys, the footer
+    being searched after the header.
 
     Args:
         ocr_result (str): already pre processed OCR result string;
-        drm (dict): DRM dict object for parsing the OCR string.
+        drm (dict): DRM dict object for parsing the OCR string;
+        limits (ParseLimits): optional time limits of the extraction.
 
     Returns:
         (str): Substring that contains tabular data of the OCR string or None
@@ -75,25 +139,24 @@ def extract_table_data(ocr_result, drm):
     """
     table = drm.get("table")
 
-    if table:
-        logger.debug("Beginning table regexp scan...")
+    if not table:
+        logger.debug("DRM has no table section...")
+        return None
 
-        header_regexp = table["header"]
-        end_regexp = table["footer"]
+    logger.debug("Beginning table regexp scan...")
 
-        header = re.search(header_regexp, ocr_result)
-        footer = re.search(end_regexp, ocr_result)
+    header, footer = find_table_markers(ocr_result, drm, limits)
 
-        if not header:
-            logger.debug("Table header was not found...")
-            return None
+    if not header:
+        logger.debug("Table header was not found...")
+        return None
 
-        if not footer:
-            logger.debug("Table footer was not found...")
-            return None
+    if not footer:
+        logger.debug("Table footer was not found...")
+        return None
 
-        beg = header.span()[1]
-        end = footer.span()[0]
+    beg = header.span()[1]
+    end = footer.span()[0]
 
     return {
         "header": header.group(),
@@ -102,7 +165,7 @@ def extract_table_data(ocr_result, drm):
     }
 
 
-def get_table_rows(all_rows, drm):
+def get_table_rows(all_rows, drm, limits=None):
     """
     Extract rows from the table data substring of the OCR result string
     by using the DRM key "line_start" which denotes the regexp that
@@ -110,7 +173,8 @@ def get_table_rows(all_rows, drm):
 
     Args:
         all_rows (str): substring containing all rows from the OCR string;
-        drm (dict): DRM dict object for parsing the OCR all rows string.
+        drm (dict): DRM dict object for parsing the OCR all rows string;
+        limits (ParseLimits): optional time limits of the extraction.
 
     Returns:
         (list): List of all the matched rows of the all_rows substring
@@ -121,7 +185,7 @@ def get_table_rows(all_rows, drm):
 
     # table data is guaranteed here
     row_start_re = drm["table"]["line_start"]
-    row_matches = re.finditer(row_start_re, all_rows)
+    row_matches = finditer(row_start_re, all_rows, limits, "table.rows")
 
     # holds all line start indexes when regexp matches
     line_start_indexes = []
@@ -161,12 +225,13 @@ def get_table_rows(all_rows, drm):
     return rows
 
 
-def extract_row_named_groups(row, drm):
+def extract_row_named_groups(row, drm, limits=None):
     """
     Performs inline group extreation for each line of the found tabular data.
 
     Args:
-        rows (str): row of the tabular data as strings.
+        rows (str): row of the tabular data as strings;
+        limits (ParseLimits): optional time limits of the extraction.
 
     Returns:
         (list): list of all the group matches for each row.
@@ -177,7 +242,7 @@ def extract_row_named_groups(row, drm):
     row_structure = {"row": row, "data": {}}
 
     if named_group_regexp:
-        rslt = re.search(named_group_regexp, row)
+        rslt = search(named_group_regexp, row, limits, "table.rows")
 
         # some named groups were found
         if rslt:
@@ -225,7 +290,7 @@ def get_uniqueness_fields(fields_section, uniqueness_fields):
     }
 
 
-def extract_ocr_data(ocr_result, drm):
+def extract_ocr_data(ocr_result, drm, stats=None, limits=None):
     """
     Performs all the data extraction by calling the extraction functions.
     The data extraction is as follows:
@@ -234,7 +299,12 @@ def extract_ocr_data(ocr_result, drm):
 
     Args:
         ocr_result (str): already pre processed OCR result string;
-        drm (dict): DRM dict object for parsing the OCR string.
+        drm (dict): DRM dict object for parsing the OCR string, the compiled
+                    DRMs are extracted with their ExtractionPlan;
+        stats (ParseStats): optional statistics of the parsing;
+        limits (ParseLimits): optional time limits of the extraction. The
+                              names of the sections skipped because of them
+                              are listed in the 'skipped_sections' key.
 
     Returns:
         (dict): Dict with all the extracted data from the OCR string.
@@ -258,34 +328,67 @@ def extract_ocr_data(ocr_result, drm):
             }
         }
     """
+    plan = getattr(drm, "plan", None)
+
+    # the plan of a compiled DRM extracts the same data, only the time
+    # limits require the step by step extraction
+    if plan is not None and limits is None:
+        logger.info("Extracting data with the DRM extraction plan...")
+        return plan.extract(ocr_result, stats)
+
     # types sections of the drm
     extracted_data = {"fields": {}, "table": {}}
 
+    if stats is not None:
+        start = timer()
+
     logger.info("Performing fields extraction...")
-    extracted_data["fields"] = extract_fields(ocr_result, drm)
+    extracted_data["fields"] = extract_fields(ocr_result, drm, limits)
+
+    if stats is not None:
+        stats.regexes_executed += len(drm["fields"])
+        start = stats.lap("fields", start)
 
     # may be empty
     logger.info("Performing table data extraction...")
-    table_data = extract_table_data(ocr_result, drm)
+    table_data = extract_table_data(ocr_result, drm, limits)
+
+    if stats is not None:
+        # header and footer regexps
+        stats.regexes_executed += 2 if drm.get("table") else 0
+        start = stats.lap("table", start)
 
     if table_data:
         extracted_data["table"] = table_data
 
         # may be empty
         logger.info("Performing table rows extraction...")
-        rows = get_table_rows(table_data["all_rows"], drm)
+        rows = get_table_rows(table_data["all_rows"], drm, limits)
 
         if rows:
             logger.info("Performing named groups extraction for each row...")
 
             extracted_data["table"]["rows"] = [
-                extract_row_named_groups(row, drm) for row in rows
+                extract_row_named_groups(row, drm, limits) for row in rows
             ]
 
+        if stats is not None:
+            # line start regexp plus the inline regexp of each row
+            has_inline = bool(drm["table"].get("inline_named_group_captures"))
+            stats.regexes_executed += 1 + (len(rows) if has_inline else 0)
+            stats.table_rows += len(rows)
+            start = stats.lap("rows", start)
+
     # mutates final dict according to the types informed in the DRM
     logger.info("Performing typing validations...")
     validate_types(extracted_data, drm)
 
+    if stats is not None:
+        stats.lap("types", start)
+
+    if limits is not None and limits.skipped:
+        extracted_data["skipped_sections"] = list(limits.skipped)
+
     logger.info("Checking if there are fields for uniqueness...")
     uniqueness_fields = drm.get("uniqueness_fields")
 
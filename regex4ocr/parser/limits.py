@@ -0,0 +1,443 @@
+"""
+Module with the time limits of the parsing of an OCR document: a deadline
+for the whole document and an optional hard timeout for each regexp that is
+enforced by evaluating the regexps in a helper process.
+"""
+import logging
+import multiprocessing
+import os
+import re
+import threading
+
+from regex4ocr.parser.stats import timer
+
+logger = logging.getLogger(__name__)
+
+
+class RegexTimeoutError(Exception):
+    """
+    Raised when a regexp evaluation takes more than its timeout.
+    """
+
+
+class GuardedMatch:
+    """
+    Match object of a regexp evaluated by the helper process. It is built
+    from the groups spans so the matched text is not sent back, and it has
+    the subset of the re.Match methods used by the extraction functions.
+    """
+
+    __slots__ = ("string", "_spans", "_groupindex")
+
+    def __init__(self, string, spans, groupindex):
+        self.string = string
+        self._spans = spans
+        self._groupindex = groupindex
+
+    def _index(self, group):
+        if isinstance(group, str):
+            return self._groupindex[group]
+
+        return group
+
+    def span(self, group=0):
+        return self._spans[self._index(group)]
+
+    def start(self, group=0):
+        return self.span(group)[0]
+
+    def end(self, group=0):
+        return self.span(group)[1]
+
+    def _group(self, group, default=None):
+        start, end = self.span(group)
+
+        if start < 0:
+            return default
+
+        return self.string[start:end]
+
+    def group(self, *groups):
+        if not groups:
+            return self._group(0)
+
+        if len(groups) == 1:
+            return self._group(groups[0])
+
+        return tuple(self._group(group) for group in groups)
+
+    def groups(self, default=None):
+        return tuple(
+            self._group(index, default) for index in range(1, len(self._spans))
+        )
+
+    def groupdict(self, default=None):
+        return {
+            name: self._group(index, default)
+            for name, index in self._groupindex.items()
+        }
+
+    def __getitem__(self, group):
+        return self._group(group)
+
+    def __repr__(self):
+        return "<GuardedMatch span=%r match=%r>" % (self.span(), self.group())
+
+
+def _match_spans(match):
+    """
+    Returns the spans of all the groups of a match.
+    """
+    return [match.span(index) for index in range(match.re.groups + 1)]
+
+
+def _serve(connection):
+    """
+    Helper process loop: receives the OCR string once and then evaluates
+    the regexps sent by the parent process against it.
+    """
+    text = ""
+
+    while True:
+        try:
+            request = connection.recv()
+        except (EOFError, OSError):
+            return
+
+        if request[0] == "text":
+            text = request[1]
+            continue
+
+        _, pattern, flags, find_all, pos, endpos = request
+
+        try:
+            regexp = re.compile(pattern, flags)
+
+            if find_all:
+                reply = [_match_spans(m) for m in regexp.finditer(text)]
+            else:
+                match = regexp.search(text, pos, endpos)
+                reply = _match_spans(match) if match else None
+
+            connection.send(("ok", reply))
+
+        except Exception as exc:  # pylint: disable=broad-except
+            connection.send(("error", exc))
+
+
+class RegexGuard:
+    """
+    Evaluates regexps in a helper process so that a catastrophic
+    backtracking regexp can be stopped: when a regexp takes more than its
+    timeout, the helper process is killed and RegexTimeoutError is raised.
+    A new helper process is started on the next evaluation.
+
+    The OCR string is sent to the helper process only once for all the
+    regexps evaluated against it. The evaluations of different threads are
+    serialized.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._process = None
+        self._connection = None
+        self._text = None
+
+    def _start(self):
+        self._connection, child_connection = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_serve, args=(child_connection,), daemon=True
+        )
+        self._process.start()
+        child_connection.close()
+        self._text = None
+
+    def close(self):
+        """
+        Stops the helper process.
+        """
+        with self._lock:
+            self._stop()
+
+    def _stop(self):
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+            self._connection.close()
+
+        self._process = None
+        self._connection = None
+        self._text = None
+
+    def _evaluate(self, regexp, string, timeout, find_all, pos=0, endpos=None):
+        with self._lock:
+            if self._process is None or not self._process.is_alive():
+                self._stop()
+                self._start()
+
+            if self._text is not string:
+                self._connection.send(("text", string))
+                self._text = string
+
+            self._connection.send(
+                (
+                    "search",
+                    regexp.pattern,
+                    regexp.flags,
+                    find_all,
+                    pos,
+                    len(string) if endpos is None else endpos,
+                )
+            )
+
+            if not self._connection.poll(timeout):
+                logger.warning(
+                    "Regexp took more than %ss, killing its process: %s",
+                    timeout,
+                    regexp.pattern,
+                )
+                self._stop()
+
+                raise RegexTimeoutError(
+                    "Regexp took more than %ss: %s" % (timeout, regexp.pattern)
+                )
+
+            status, reply = self._connection.recv()
+
+        if status == "error":
+            raise reply
+
+        return reply
+
+    def search(self, regexp, string, timeout=None, pos=0, endpos=None):
+        """
+        Same as re.search but evaluated in the helper process.
+
+        Args:
+            regexp (str): regexp string or compiled regexp;
+            string (str): string to be searched;
+            timeout (float): maximum seconds of the evaluation, None waits
+                             forever;
+            pos (int): position where the search starts;
+            endpos (int): position where the search ends, None for the end
+                          of the string.
+
+        Returns:
+            (GuardedMatch): the match or None if the regexp does not match.
+
+        Raises:
+            RegexTimeoutError: if the evaluation took more than the timeout.
+        """
+        regexp = re.compile(regexp)
+        spans = self._evaluate(regexp, string, timeout, False, pos, endpos)
+
+        if spans is None:
+            return None
+
+        return GuardedMatch(string, spans, regexp.groupindex)
+
+    def finditer(self, regexp, string, timeout=None):
+        """
+        Same as re.finditer but evaluated in the helper process, see search.
+
+        Returns:
+            (list): list of GuardedMatch of all the matches.
+        """
+        regexp = re.compile(regexp)
+
+        return [
+            GuardedMatch(string, spans, regexp.groupindex)
+            for spans in self._evaluate(regexp, string, timeout, True)
+        ]
+
+
+# process wide regexp guard, its helper process is started on demand
+_guard = None
+_guard_lock = threading.Lock()
+
+
+def _reset_regex_guard():
+    """
+    Drops the regexp guard inherited by a forked process, e.g. the workers
+    of parse_many or of a preloaded gunicorn app: its helper process is a
+    child of the parent process, so the forked process starts its own one.
+    """
+    global _guard, _guard_lock  # pylint: disable=global-statement
+
+    _guard = None
+    _guard_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_regex_guard)
+
+
+def get_regex_guard():
+    """
+    Returns the regexp guard of the current process.
+
+    Returns:
+        (RegexGuard): the process wide regexp guard.
+    """
+    global _guard  # pylint: disable=global-statement
+
+    with _guard_lock:
+        if _guard is None:
+            _guard = RegexGuard()
+
+        return _guard
+
+
+class ParseLimits:
+    """
+    Time limits of the data extraction of an OCR document. The extraction
+    functions evaluate their regexps through the search and finditer
+    methods, which return no matches for the sections that are skipped:
+    either because the document deadline has passed or because a regexp
+    took more than the regex_timeout.
+
+    Attributes:
+        deadline (float): timer value after which the remaining sections
+                          are skipped, None for no deadline;
+        regex_timeout (float): maximum seconds of each regexp evaluation,
+                               None evaluates the regexps in the current
+                               thread without any timeout;
+        skipped (list): names of the skipped sections, such as 'fields.coo',
+                        'table' or 'table.rows'.
+    """
+
+    __slots__ = ("deadline", "regex_timeout", "skipped", "_guard")
+
+    def __init__(self, deadline=None, regex_timeout=None):
+        if deadline is not None and deadline < 0:
+            raise ValueError("The deadline must not be negative: %s" % deadline)
+
+        if regex_timeout is not None and regex_timeout <= 0:
+            raise ValueError(
+                "The regex timeout must be positive: %s" % regex_timeout
+            )
+
+        self.deadline = None if deadline is None else timer() + deadline
+        self.regex_timeout = regex_timeout
+        self.skipped = []
+        self._guard = None if regex_timeout is None else get_regex_guard()
+
+    def for_drm(self):
+        """
+        Returns the limits of another DRM of the same document: the same
+        deadline and regex timeout but their own skipped sections, since
+        the sections of different DRMs share their names.
+        """
+        limits = ParseLimits.__new__(ParseLimits)
+        limits.deadline = self.deadline
+        limits.regex_timeout = self.regex_timeout
+        limits.skipped = []
+        limits._guard = self._guard  # pylint: disable=protected-access
+
+        return limits
+
+    def skip(self, section):
+        """
+        Records a skipped section.
+        """
+        if section not in self.skipped:
+            logger.warning("Skipping the %s section of the document", section)
+            self.skipped.append(section)
+
+    def expired(self):
+        """
+        Checks if the deadline has passed.
+        """
+        return self.deadline is not None and timer() >= self.deadline
+
+    def search(self, regexp, string, section, pos=0, endpos=None):
+        """
+        Searches a regexp of a section within the limits.
+
+        Args:
+            regexp (str): regexp string or compiled regexp;
+            string (str): string to be searched;
+            section (str): name of the section the regexp belongs to;
+            pos (int): position where the search starts;
+            endpos (int): position where the search ends, None for the end
+                          of the string.
+
+        Returns:
+            (re.Match): the match or None if the regexp does not match or
+                        the section was skipped, in which case its later
+                        regexps, e.g. of the other table rows, are not
+                        evaluated either.
+        """
+        if section in self.skipped:
+            return None
+
+        if self.expired():
+            self.skip(section)
+            return None
+
+        if self._guard is None:
+            return _search(regexp, string, pos, endpos)
+
+        try:
+            return self._guard.search(
+                regexp, string, self.regex_timeout, pos, endpos
+            )
+        except RegexTimeoutError:
+            self.skip(section)
+            return None
+
+    def finditer(self, regexp, string, section):
+        """
+        Finds all the matches of a regexp of a section within the limits,
+        see search.
+
+        Returns:
+            (iterable): the matches, empty if the section was skipped.
+        """
+        if section in self.skipped:
+            return []
+
+        if self.expired():
+            self.skip(section)
+            return []
+
+        if self._guard is None:
+            return re.finditer(regexp, string)
+
+        try:
+            return self._guard.finditer(regexp, string, self.regex_timeout)
+        except RegexTimeoutError:
+            self.skip(section)
+            return []
+
+
+def _search(regexp, string, pos=0, endpos=None):
+    """
+    Same as re.search with the start and end positions of the search.
+    """
+    if not pos and endpos is None:
+        return re.search(regexp, string)
+
+    return re.compile(regexp).search(
+        string, pos, len(string) if endpos is None else endpos
+    )
+
+
+def search(regexp, string, limits, section, pos=0, endpos=None):
+    """
+    Searches a regexp with the parsing limits, if any.
+    """
+    if limits is None:
+        return _search(regexp, string, pos, endpos)
+
+    return limits.search(regexp, string, section, pos, endpos)
+
+
+def finditer(regexp, string, limits, section):
+    """
+    Finds all the matches of a regexp with the parsing limits, if any.
+    """
+    if limits is None:
+        return re.finditer(regexp, string)
+
+    return limits.finditer(regexp, string, section)
@@ -0,0 +1,358 @@
+"""
+Module with functions that analyze the DRM regexps in order to find their
+literal parts, such as the substrings that any of their matches must contain.
+"""
+import logging
+import re
+
+try:  # python >= 3.11
+    import re._constants as sre_constants
+    import re._parser as sre_parse
+except ImportError:
+    import sre_constants
+    import sre_parse
+
+logger = logging.getLogger(__name__)
+
+# literals shorter than this are not selective enough to be indexed
+MIN_LITERAL_LENGTH = 2
+
+REPEAT_OPCODES = tuple(
+    getattr(sre_constants, opcode)
+    for opcode in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+    if hasattr(sre_constants, opcode)
+)
+
+# non ascii chars that the re.IGNORECASE flag matches with ascii letters
+IGNORECASE_ASCII_EQUIVALENTS = {
+    0x130: "i",  # latin capital letter i with dot above
+    0x131: "i",  # latin small letter dotless i
+    0x17F: "s",  # latin small letter long s
+    0x212A: "k",  # kelvin sign
+}
+
+# lowercases the ascii letters without changing the string length
+CASE_FOLDING_TABLE = dict(IGNORECASE_ASCII_EQUIVALENTS)
+CASE_FOLDING_TABLE.update(
+    {code: chr(code + 32) for code in range(ord("A"), ord("Z") + 1)}
+)
+
+
+def fold_case(text):
+    """
+    Folds the case of a text so that an ascii literal matches the folded text
+    exactly when it would match the original text with the re.IGNORECASE
+    flag. The folded text has the same length of the original one.
+
+    Args:
+        text (str): text to be folded, usually the OCR result string.
+
+    Returns:
+        (str): the folded text.
+    """
+    if text.isascii():
+        return text.lower()
+
+    return text.translate(CASE_FOLDING_TABLE)
+
+
+def parse_regexp(regexp):
+    """
+    Parses a regexp into the re module internal representation.
+
+    Args:
+        regexp (str): regexp string or compiled regexp.
+
+    Returns:
+        (SubPattern): the parsed regexp.
+    """
+    if isinstance(regexp, str):
+        return sre_parse.parse(regexp)
+
+    return sre_parse.parse(regexp.pattern, regexp.flags)
+
+
+def literal_string(regexp):
+    """
+    Returns the string matched by a regexp that has no metacharacters, such
+    as 'c00' or 'total r\\$'. Case insensitive regexps are not literals.
+
+    Args:
+        regexp (str): regexp string or compiled regexp.
+
+    Returns:
+        (str): the literal string of the regexp or None if the regexp is not
+               a plain literal.
+    """
+    try:
+        parsed = parse_regexp(regexp)
+    except (sre_constants.error, TypeError):
+        return None
+
+    # the parser state holds the flags of the regexp, inline ones included
+    state = getattr(parsed, "state", None) or parsed.pattern
+
+    if not len(parsed) or state.flags & re.IGNORECASE:
+        return None
+
+    if any(opcode is not sre_constants.LITERAL for opcode, _ in parsed):
+        return None
+
+    return "".join(chr(value) for _, value in parsed)
+
+
+class LiteralMatch:
+    """
+    Match object of a LiteralPattern, with the subset of the re.Match
+    methods used by the extraction functions.
+    """
+
+    __slots__ = ("string", "_start", "_end")
+
+    def __init__(self, string, start, end):
+        self.string = string
+        self._start = start
+        self._end = end
+
+    def span(self, group=0):
+        return self._start, self._end
+
+    def start(self, group=0):
+        return self._start
+
+    def end(self, group=0):
+        return self._end
+
+    def group(self, group=0):
+        return self.string[self._start : self._end]
+
+    def groups(self, default=None):
+        return ()
+
+    def groupdict(self, default=None):
+        return {}
+
+    def __getitem__(self, group):
+        return self.group(group)
+
+    def __repr__(self):
+        return "<LiteralMatch span=%r match=%r>" % (self.span(), self.group())
+
+
+class LiteralPattern:
+    """
+    Pattern of a regexp without metacharacters, see literal_string, that is
+    searched with str.find instead of the regexp engine. It has the subset
+    of the re.Pattern attributes used by the extraction functions.
+
+    Args:
+        literal (str): the literal string of the regexp.
+    """
+
+    __slots__ = ("pattern", "groups", "groupindex")
+
+    def __init__(self, literal):
+        self.pattern = literal
+        self.groups = 0
+        self.groupindex = {}
+
+    def search(self, string, pos=0, endpos=None):
+        """
+        Same as re.Pattern.search.
+        """
+        start = string.find(self.pattern, pos, endpos)
+
+        if start < 0:
+            return None
+
+        return LiteralMatch(string, start, start + len(self.pattern))
+
+
+def folded_literal_matcher(regexp):
+    """
+    Returns a function that tells if a case insensitive regexp matches a
+    text already case folded with fold_case, using str methods instead of
+    the regexp engine. Only the regexps made of ascii literals, optionally
+    anchored at the beginning and at the end of the string, such as
+    'cupom fiscal' or '^extrato', have such a function.
+
+    Args:
+        regexp (str): regexp string or compiled regexp, evaluated with the
+                      re.IGNORECASE flag.
+
+    Returns:
+        (function): function of the folded text that returns True if the
+                    regexp matches it, or None for the other regexps.
+    """
+    try:
+        parsed = parse_regexp(regexp)
+    except (sre_constants.error, TypeError):
+        return None
+
+    state = getattr(parsed, "state", None) or parsed.pattern
+    flags = state.flags
+
+    # compiled regexps must be case insensitive already and the ascii flag
+    # stops the non ascii equivalents of fold_case from matching
+    if flags & re.ASCII or not (isinstance(regexp, str) or flags & re.I):
+        return None
+
+    items = list(parsed)
+    at_start = at_end = None
+
+    if items and items[0][0] is sre_constants.AT:
+        at_start = items.pop(0)[1]
+
+    if items and items[-1][0] is sre_constants.AT:
+        at_end = items.pop()[1]
+
+    anchored = at_start is not None or at_end is not None
+
+    if anchored and flags & re.MULTILINE:
+        return None
+
+    if at_start not in (
+        None,
+        sre_constants.AT_BEGINNING,
+        sre_constants.AT_BEGINNING_STRING,
+    ) or at_end not in (
+        None,
+        sre_constants.AT_END,
+        sre_constants.AT_END_STRING,
+    ):
+        return None
+
+    if not items or any(
+        opcode is not sre_constants.LITERAL or value >= 128
+        for opcode, value in items
+    ):
+        return None
+
+    literal = fold_case("".join(chr(value) for _, value in items))
+
+    # '$' also matches right before a trailing newline of the string
+    endings = (literal,)
+
+    if at_end is sre_constants.AT_END:
+        endings = (literal, literal + "\n")
+
+    if at_start is not None and at_end is not None:
+        return lambda folded: folded in endings
+
+    if at_start is not None:
+        return lambda folded: folded.startswith(literal)
+
+    if at_end is not None:
+        return lambda folded: folded.endswith(endings)
+
+    return lambda folded: literal in folded
+
+
+def required_literals(regexp):
+    """
+    Finds the ascii literal substrings that every match of the regexp must
+    contain, case folded with the fold_case function.
+
+    Args:
+        regexp (str): regexp string or compiled regexp.
+
+    Returns:
+        (list): list of case folded literal strings. May be empty if the
+                regexp has no required literals.
+    """
+    literals = []
+
+    try:
+        _collect_literals(parse_regexp(regexp), literals)
+    except (sre_constants.error, TypeError):
+        logger.debug("Could not parse regexp: %s", regexp)
+        return []
+
+    return literals
+
+
+def _collect_literals(items, literals):
+    run = []
+
+    for opcode, value in items:
+        if opcode is sre_constants.LITERAL and value < 128:
+            run.append(chr(value))
+            continue
+
+        _flush_literal(run, literals)
+        run = []
+
+        # only the items that must be part of every match are visited
+        if opcode is sre_constants.SUBPATTERN:
+            _collect_literals(value[-1], literals)
+
+        elif opcode in REPEAT_OPCODES and value[0] >= 1:
+            _collect_literals(value[2], literals)
+
+        elif opcode is getattr(sre_constants, "ATOMIC_GROUP", None):
+            _collect_literals(value, literals)
+
+    _flush_literal(run, literals)
+
+
+def _flush_literal(run, literals):
+    if len(run) >= MIN_LITERAL_LENGTH:
+        literals.append(fold_case("".join(run)))
+
+
+def is_position_independent(regexp):
+    """
+    Checks if searching a regexp from a position of a string, right after a
+    newline, matches the same as searching the rest of the string alone.
+    This holds unless the regexp looks behind its start position or anchors
+    at the beginning of the string.
+
+    Args:
+        regexp (str): regexp string or compiled regexp.
+
+    Returns:
+        (bool): True if the regexp can be searched with a start position.
+    """
+    try:
+        return _is_position_independent(parse_regexp(regexp))
+    except (sre_constants.error, TypeError):
+        return False
+
+
+def _is_position_independent(items):
+    for opcode, value in items:
+        if opcode is sre_constants.AT and value in (
+            sre_constants.AT_BEGINNING,
+            sre_constants.AT_BEGINNING_STRING,
+        ):
+            return False
+
+        # lookbehinds have a negative direction
+        if opcode in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            if value[0] < 0:
+                return False
+
+            sub_items = [value[1]]
+
+        elif opcode is sre_constants.SUBPATTERN:
+            sub_items = [value[-1]]
+
+        elif opcode in REPEAT_OPCODES:
+            sub_items = [value[2]]
+
+        elif opcode is sre_constants.BRANCH:
+            sub_items = value[1]
+
+        elif opcode is sre_constants.GROUPREF_EXISTS:
+            sub_items = [branch for branch in value[1:] if branch]
+
+        elif opcode is getattr(sre_constants, "ATOMIC_GROUP", None):
+            sub_items = [value]
+
+        else:
+            continue
+
+        if not all(_is_position_independent(item) for item in sub_items):
+            return False
+
+    return True
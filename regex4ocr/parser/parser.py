@@ -3,27 +3,95 @@ Module with the drm parser.
 """
 import logging
 
-from regex4ocr.parser.drm_scanner import get_all_drms_match
-from regex4ocr.parser.extraction import extract_ocr_data
+from regex4ocr.parser.drm_scanner import (
+    get_all_drms_match,
+    get_first_drm_match,
+)
+from regex4ocr.parser.extraction import (
+    extract_fields,
+    extract_ocr_data,
+    get_uniqueness_fields,
+)
+from regex4ocr.parser.limits import ParseLimits
+from regex4ocr.parser.plan import ExtractionPlan, parse_select, project_data
 from regex4ocr.parser.pre_process import pre_process_result
+from regex4ocr.parser.stats import timer
+from regex4ocr.parser.type_casting import remove_wrong_types
 
 logger = logging.getLogger(__name__)
 
+# DRM selection modes
+FIRST_MATCH = "first_match"
+ALL_MATCHES = "all_matches"
 
-def parse_ocr_result(ocr_result, drms):
+SELECTION_MODES = (FIRST_MATCH, ALL_MATCHES)
+
+
+def parse_ocr_result(
+    ocr_result,
+    drms,
+    selection=FIRST_MATCH,
+    stats=None,
+    deadline=None,
+    regex_timeout=None,
+    spans=False,
+    select=None,
+):
     """
     Parses and extract data from the OCR document result string by
     using a DRM (Document Regexp Model) that matches this OCR string.
 
+    The DRMs are evaluated in the given order. With the 'first_match'
+    selection, the identification stops at the first DRM whose identifiers
+    all match. With the 'all_matches' selection, every DRM is evaluated and
+    the data extracted by each matching DRM is returned.
+
+    When a ParseStats object is given, it is filled with the wall time of
+    each parsing stage, the chosen DRM and the number of DRMs, regexps and
+    table rows evaluated. Nothing is measured otherwise.
+
+    With a deadline, the data extraction degrades gracefully: once the
+    deadline has passed, the remaining fields, table and rows are skipped
+    and the partial result lists them in its 'skipped_sections' key. The
+    regex_timeout evaluates the extraction regexps in a helper process which
+    is killed when a regexp takes longer than it, so one catastrophic
+    backtracking regexp only skips its own section.
+
+    With spans, the table header, all_rows and footer are Span objects and
+    the rows are TableRow objects: offsets into the pre processed OCR result
+    string whose substrings are only created when they are accessed, see
+    regex4ocr.parser.spans. The fields are the same.
+
+    With select, only the selected sections of the data are extracted and
+    returned: 'fields' for all the fields, 'fields.<field>' for single
+    fields, 'table' and 'uniqueness_fields'. The regexps of the sections
+    that are not selected are not evaluated, except for the uniqueness
+    fields which are always checked: the data is still empty when they are
+    not found.
+
     Args:
         ocr_result (str): OCR result string;
-        drms (dict): list of all DRMs dicts found in the DRM directory folder.
+        drms (dict): list of all DRMs dicts found in the DRM directory folder;
+        selection (str): DRM selection mode, 'first_match' or 'all_matches';
+        stats (ParseStats): optional statistics of the parsing;
+        deadline (float): seconds available to parse the document;
+        regex_timeout (float): seconds available to each extraction regexp;
+        spans (bool): returns the table as offsets into the OCR string;
+        select (list): sections of the data to be extracted, e.g.
+                       ['fields.cnpj', 'uniqueness_fields'], None for all.
 
     Returns:
-        (dict): the extracted data from the OCR results.
+        (dict): the extracted data from the OCR results. For the
+                'all_matches' selection, a list with the extracted data of
+                each matching DRM.
+
+    Raises:
+        ValueError: if the selection mode, the deadline or the regex_timeout
+                    are invalid, if a selection is unknown or if spans are
+                    asked with time limits.
 
     Example of the extracted data:
-    
+
         {
             "fields": {
                 "field1": "result1",
@@ -41,24 +109,224 @@ def parse_ocr_result(ocr_result, drms):
             }
         }
     """
+    selections = None if select is None else parse_select(select)
+    limits = make_limits(deadline, regex_timeout, spans)
+    matches = pre_process_matches(ocr_result, drms, selection, stats)
+    data = [
+        extract_pre_processed(
+            pre_processed_result,
+            drm,
+            stats,
+            limits and limits.for_drm(),
+            spans,
+            selections,
+        )
+        for drm, pre_processed_result in matches
+    ]
+
+    if selection == ALL_MATCHES:
+        return data
+
+    return data[0] if data else {}
+
+
+def make_limits(deadline=None, regex_timeout=None, spans=False):
+    """
+    Returns the time limits of the parsing of an OCR document.
+
+    Args:
+        deadline (float): seconds available to parse the document;
+        regex_timeout (float): seconds available to each extraction regexp;
+        spans (bool): returns the table as offsets into the OCR string,
+                      which is not available with the time limits.
+
+    Returns:
+        (ParseLimits): the time limits or None if there are no limits.
+    """
+    if deadline is None and regex_timeout is None:
+        return None
+
+    if spans:
+        raise ValueError("The spans are not available with time limits")
+
+    return ParseLimits(deadline, regex_timeout)
+
+
+def pre_process_matches(ocr_result, drms, selection=FIRST_MATCH, stats=None):
+    """
+    Identifies the DRMs that match the OCR document result string and pre
+    processes it with each of them, so their data can be extracted by
+    extract_pre_processed.
+
+    Args:
+        ocr_result (str): OCR result string;
+        drms (list): list of DRMs dicts, see parse_ocr_result;
+        selection (str): DRM selection mode, see parse_ocr_result;
+        stats (ParseStats): optional statistics of the parsing.
+
+    Returns:
+        (list): (drm, pre_processed_result) tuples of the matching DRMs, at
+                most one with the 'first_match' selection.
+    """
+    if selection not in SELECTION_MODES:
+        raise ValueError("Unknown DRM selection mode: %s" % selection)
+
     logger.info("Verifying DRMs that match with this OCR document string...")
-    drms = get_all_drms_match(ocr_result, drms)
 
-    if not drms:
-        logger.warning("No DRM matches this OCR result. Returning None...")
+    if stats is not None:
+        start = timer()
+
+    if selection == ALL_MATCHES:
+        drms = get_all_drms_match(ocr_result, drms, stats)
+        logger.info("Found %s DRMs that match the OCR result...", len(drms))
+    else:
+        drm = get_first_drm_match(ocr_result, drms, stats)
+        drms = [drm] if drm else []
+
+        if not drm:
+            logger.warning("No DRM matches this OCR result. Returning None...")
+
+    if stats is not None:
+        stats.add_time("identification", timer() - start)
+
+    return [(drm, pre_process_with_drm(ocr_result, drm, stats)) for drm in drms]
+
+
+def extract_with_drm(
+    ocr_result, drm, stats=None, limits=None, spans=False, selections=None
+):
+    """
+    Pre processes the OCR document result string and extracts its data
+    with a DRM that matches it.
+
+    Args:
+        ocr_result (str): OCR result string;
+        drm (dict): DRM dict that matches the OCR document string;
+        stats (ParseStats): optional statistics of the parsing;
+        limits (ParseLimits): optional time limits of the extraction;
+        spans (bool): returns the table as offsets into the OCR string, the
+                      time limits are ignored;
+        selections (frozenset): selected sections of the data, see
+                                parse_select, None for all of them.
+
+    Returns:
+        (dict): the extracted data from the OCR results.
+    """
+    pre_processed_result = pre_process_with_drm(ocr_result, drm, stats)
+
+    return extract_pre_processed(
+        pre_processed_result, drm, stats, limits, spans, selections
+    )
 
-        return {}
 
-    drm = drms[0]
+def pre_process_with_drm(ocr_result, drm, stats=None):
+    """
+    Pre processes the OCR document result string with a DRM that matches
+    it.
+
+    Args:
+        ocr_result (str): OCR result string;
+        drm (dict): DRM dict that matches the OCR document string;
+        stats (ParseStats): optional statistics of the parsing.
+
+    Returns:
+        (str): the pre processed OCR result string.
+    """
     logger.info("Using the following DRM: %s", drm)
 
     logger.info("Pre processing the OCR result according to DRM...")
+
+    if stats is not None:
+        stats.drm = drm
+        start = timer()
+
     pre_processed_result = pre_process_result(ocr_result, drm)
+
+    if stats is not None:
+        stats.add_time("pre_process", timer() - start)
+
     logger.debug(
         "Showing pre processed OCR result...\n%s", pre_processed_result
     )
 
+    return pre_processed_result
+
+
+def extract_pre_processed(
+    pre_processed_result,
+    drm,
+    stats=None,
+    limits=None,
+    spans=False,
+    selections=None,
+):
+    """
+    Extracts the data of an OCR result string already pre processed with a
+    DRM that matches it, see extract_with_drm.
+
+    Args:
+        pre_processed_result (str): OCR result pre processed with the DRM;
+        drm (dict): DRM dict that matches the OCR document string;
+        stats (ParseStats): optional statistics of the parsing;
+        limits (ParseLimits): optional time limits of the extraction;
+        spans (bool): returns the table as offsets into the OCR string;
+        selections (frozenset): selected sections of the data, see
+                                parse_select, None for all of them.
+
+    Returns:
+        (dict): the extracted data from the OCR results.
+    """
     logger.info("Extracting json data from the OCR pre processed result...")
-    data = extract_ocr_data(pre_processed_result, drm)
+
+    # only the extraction plans skip the sections that are not selected,
+    # the time limits require the step by step extraction
+    if spans or (selections is not None and limits is None):
+        plan = getattr(drm, "plan", None) or ExtractionPlan(drm)
+
+        if selections is not None:
+            plan = plan.project(selections)
+
+        return plan.extract(pre_processed_result, stats, spans=spans)
+
+    data = extract_ocr_data(pre_processed_result, drm, stats, limits)
+
+    if selections is not None:
+        data = project_data(data, selections)
 
     return data
+
+
+def extract_uniqueness_fields(pre_processed_result, drm, limits=None):
+    """
+    Extracts only the uniqueness fields of an OCR result string already pre
+    processed with a DRM that matches it. The table is not extracted and,
+    without time limits, only the regexps of the uniqueness fields are
+    evaluated. With time limits, all the fields are extracted, since the
+    step by step extraction does not skip the other fields.
+
+    Args:
+        pre_processed_result (str): OCR result pre processed with the DRM;
+        drm (dict): DRM dict that matches the OCR document string;
+        limits (ParseLimits): optional time limits of the extraction.
+
+    Returns:
+        (dict): the uniqueness fields, an empty dict if the DRM has no
+                uniqueness fields or if any of them is not found.
+    """
+    uniqueness_fields = drm.get("uniqueness_fields")
+
+    if not uniqueness_fields:
+        return {}
+
+    if limits is None:
+        plan = getattr(drm, "plan", None) or ExtractionPlan(drm)
+        data = plan.project(parse_select(["uniqueness_fields"])).extract(
+            pre_processed_result
+        )
+
+        return data.get("uniqueness_fields", {})
+
+    fields = extract_fields(pre_processed_result, drm, limits)
+    remove_wrong_types(fields, drm.get("types", {}).get("fields", {}))
+
+    return get_uniqueness_fields(fields, uniqueness_fields)
@@ -0,0 +1,635 @@
+"""
+Module with the extraction plans: the DRMs data extraction compiled into
+objects that hold the bound regexps methods and type casters, so the
+extraction of each OCR document does not navigate the DRM dicts again.
+"""
+import logging
+import re
+from itertools import chain
+
+from regex4ocr.parser.extraction import get_uniqueness_fields
+from regex4ocr.parser.literals import (
+    LiteralPattern,
+    is_position_independent,
+    literal_string,
+)
+from regex4ocr.parser.regions import region_window, uses_table
+from regex4ocr.parser.spans import Span, TableRow
+from regex4ocr.parser.stats import timer
+from regex4ocr.parser.type_casting import (
+    cast_columns,
+    cast_section,
+    compile_caster,
+    compile_column_caster,
+)
+
+logger = logging.getLogger(__name__)
+
+# sections of the extracted data that may be selected, besides the
+# 'fields.<field>' selections of single fields
+SELECTABLE_SECTIONS = ("fields", "table", "uniqueness_fields")
+
+
+def compile_casters(types_section, compiler=compile_caster):
+    """
+    Compiles the types of a DRM types section.
+
+    Args:
+        types_section (dict): fields as keys and their types as values;
+        compiler (callable): compile_caster or compile_column_caster.
+
+    Returns:
+        (tuple): (field, caster) tuples in the types section order.
+    """
+    if not types_section:
+        return ()
+
+    return tuple(
+        (field, compiler(desired_type))
+        for field, desired_type in types_section.items()
+    )
+
+
+def parse_select(select):
+    """
+    Validates the sections selected from the extracted data.
+
+    Args:
+        select (iterable): 'fields', 'fields.<field>', 'table' and
+                           'uniqueness_fields' selections.
+
+    Returns:
+        (frozenset): the selections.
+
+    Raises:
+        ValueError: if a selection is unknown.
+    """
+    if isinstance(select, str):
+        select = [select]
+
+    selections = frozenset(select)
+
+    for selection in selections:
+        if selection not in SELECTABLE_SECTIONS and not (
+            selection.startswith("fields.") and len(selection) > 7
+        ):
+            raise ValueError("Unknown selection: %s" % selection)
+
+    return selections
+
+
+def selected_fields(selections):
+    """
+    Returns the names of the selected fields, None if all the fields are.
+    """
+    if "fields" in selections:
+        return None
+
+    return frozenset(
+        selection[7:]
+        for selection in selections
+        if selection.startswith("fields.")
+    )
+
+
+def project_data(extracted_data, selections):
+    """
+    Keeps only the selected sections of the extracted data.
+
+    Args:
+        extracted_data (dict): data extracted with a DRM, may be empty when
+                               its uniqueness fields were not found;
+        selections (frozenset): selections returned by parse_select.
+
+    Returns:
+        (dict): the selected sections, an empty dict for empty data.
+    """
+    if not extracted_data:
+        return extracted_data
+
+    projected = {}
+    field_names = selected_fields(selections)
+
+    if field_names is None:
+        projected["fields"] = extracted_data["fields"]
+    elif field_names:
+        projected["fields"] = {
+            field: value
+            for field, value in extracted_data["fields"].items()
+            if field in field_names
+        }
+
+    for section in ("table", "uniqueness_fields"):
+        if section in selections and section in extracted_data:
+            projected[section] = extracted_data[section]
+
+    # the skipped sections are always reported
+    if "skipped_sections" in extracted_data:
+        projected["skipped_sections"] = extracted_data["skipped_sections"]
+
+    return projected
+
+
+class TablePlan:
+    """
+    Extraction plan of the 'table' section of a DRM.
+
+    The rows are split and their inline named groups are extracted in a
+    single pass over the table rows string. A row that only has the newline
+    of its beginning is searched in place, with the positions of the
+    row in the table rows string, when the inline regexp does not depend on
+    its start position (see is_position_independent), so no intermediate
+    row strings are searched.
+
+    Args:
+        table (dict): DRM table section;
+        types_section (dict): DRM types of the inline named groups.
+    """
+
+    __slots__ = (
+        "header",
+        "footer",
+        "line_start",
+        "inline",
+        "inline_in_place",
+        "row_casters",
+        "row_column_casters",
+    )
+
+    def __init__(self, table, types_section):
+        self.header = re.compile(table["header"]).search
+        self.footer = re.compile(table["footer"]).search
+        self.line_start = re.compile(table["line_start"]).finditer
+
+        inline_regexp = table.get("inline_named_group_captures")
+        self.inline = (
+            re.compile(inline_regexp).search if inline_regexp else None
+        )
+        self.inline_in_place = bool(inline_regexp) and is_position_independent(
+            inline_regexp
+        )
+        self.row_casters = compile_casters(types_section)
+        self.row_column_casters = compile_casters(
+            types_section, compile_column_caster
+        )
+
+    def markers(self, ocr_result):
+        """
+        Searches the header and the footer of the table, the footer only
+        after the end of the header match, see find_table_markers.
+
+        Returns:
+            (tuple): (header, footer) matches, each one may be None.
+        """
+        header = self.header(ocr_result)
+
+        if not header:
+            return None, None
+
+        return header, self.footer(ocr_result, header.end())
+
+    def iter_rows(self, all_rows):
+        """
+        Yields the rows of the table lazily, same as calling
+        extract_row_named_groups for each row of get_table_rows.
+
+        Args:
+            all_rows (str): substring containing all rows from the OCR string.
+
+        Yields:
+            (dict): {"row": row, "data": named groups} dict of each row.
+        """
+        if not all_rows:
+            return
+
+        inline = self.inline
+        in_place = self.inline_in_place
+        find = all_rows.find
+        starts = self.line_start(all_rows)
+        first = next(starts, None)
+
+        if first is None:
+            return
+
+        start = first.start()
+
+        # the last row ends at the last but one char of all_rows
+        ends = chain((match.start() for match in starts), (len(all_rows) - 1,))
+
+        for end in ends:
+            # a row that only has its beginning newline is searched in place
+            if (
+                start < end
+                and all_rows[start] == "\n"
+                and find("\n", start + 1, end) == -1
+            ):
+                row = all_rows[start + 1 : end]
+
+                if inline is None:
+                    match = None
+                elif in_place:
+                    match = inline(all_rows, start + 1, end)
+                else:
+                    match = inline(row)
+
+            else:
+                row = all_rows[start:end].replace("\n", "")
+                match = inline(row) if inline is not None else None
+
+            yield {"row": row, "data": match.groupdict() if match else {}}
+
+            start = end
+
+    def iter_row_spans(self, all_rows, offset=0):
+        """
+        Yields the offsets and the inline named groups of the rows of the
+        table, see iter_rows. The offsets exclude the newline that begins
+        a row.
+
+        Args:
+            all_rows (str): substring containing all rows from the OCR string;
+            offset (int): offset of all_rows in the OCR string, added to the
+                          offsets of the rows.
+
+        Yields:
+            (tuple): (start, end, named groups) of each row.
+        """
+        if not all_rows:
+            return
+
+        inline = self.inline
+        in_place = self.inline_in_place
+        find = all_rows.find
+        starts = self.line_start(all_rows)
+        first = next(starts, None)
+
+        if first is None:
+            return
+
+        start = first.start()
+        ends = chain((match.start() for match in starts), (len(all_rows) - 1,))
+
+        for end in ends:
+            row_start = start
+
+            if start < end and all_rows[start] == "\n":
+                row_start = start + 1
+
+            # same in place condition of iter_rows
+            single_line = row_start > start and find("\n", row_start, end) < 0
+
+            if inline is None:
+                match = None
+            elif in_place and single_line:
+                match = inline(all_rows, row_start, end)
+            else:
+                match = inline(all_rows[row_start:end].replace("\n", ""))
+
+            yield offset + row_start, offset + end, (
+                match.groupdict() if match else {}
+            )
+
+            start = end
+
+    def cast_rows(self, rows):
+        """
+        Casts the inline named groups of the rows to the DRM types, each
+        named group of all the rows as a single column, see cast_columns.
+
+        Args:
+            rows (iterable): {"row": row, "data": named groups} dicts.
+        """
+        cast_columns(
+            [row_dict["data"] for row_dict in rows], self.row_column_casters
+        )
+
+
+class ExtractionPlan:
+    """
+    Extraction plan of a valid DRM. Its extract method returns the same
+    data of the extract_ocr_data function.
+
+    Args:
+        drm (dict): valid DRM dict, its regexps may be already compiled
+                    since re.compile returns the compiled regexps as they
+                    are.
+    """
+
+    __slots__ = (
+        "fields",
+        "field_casters",
+        "table",
+        "table_first",
+        "with_table",
+        "sequential",
+        "sequential_fallback",
+        "uniqueness_fields",
+        "selections",
+        "_projections",
+    )
+
+    def __init__(self, drm):
+        types = drm.get("types", {})
+        regions = drm.get("regions") or {}
+
+        fields = []
+
+        for field, regexp in drm["fields"].items():
+            pattern = re.compile(regexp)
+            literal = literal_string(pattern)
+
+            # the literal fields are searched with str.find
+            if literal is not None:
+                pattern = LiteralPattern(literal)
+
+            # the first group is extracted when the regexp has groups
+            fields.append(
+                (field, pattern.search, pattern.groups > 0, regions.get(field))
+            )
+
+        self.fields = tuple(fields)
+        self.field_casters = compile_casters(types.get("fields", {}))
+
+        table = drm.get("table")
+        self.table = (
+            TablePlan(
+                table,
+                types.get("table", {}).get("inline_named_group_captures"),
+            )
+            if table
+            else None
+        )
+
+        # the table regions of the fields need the table markers first
+        self.table_first = self.table is not None and uses_table(regions)
+        self.with_table = self.table is not None
+        self.sequential = bool(drm.get("sequential"))
+        self.sequential_fallback = drm.get("sequential_fallback", True)
+        self.uniqueness_fields = drm.get("uniqueness_fields")
+        self.selections = None
+        self._projections = {}
+
+    def project(self, selections):
+        """
+        Returns the plan that only extracts the selected sections of the
+        data, besides the uniqueness fields which are always checked. The
+        plans are cached by selections.
+
+        The projected plan skips the regexps and the type casts of the
+        fields that are not selected, and the table rows when the table is
+        not selected. Since a sequential field search starts at the end of
+        the previous match, the fields declared before a selected one are
+        still extracted in the sequential mode.
+
+        Args:
+            selections (frozenset): selections returned by parse_select.
+
+        Returns:
+            (ExtractionPlan): the plan of the selections.
+        """
+        projection = self._projections.get(selections)
+
+        if projection is None:
+            projection = self._project(selections)
+            self._projections[selections] = projection
+
+        return projection
+
+    def _project(self, selections):
+        field_names = selected_fields(selections)
+        fields = self.fields
+
+        if field_names is not None:
+            needed = field_names.union(self.uniqueness_fields or ())
+            positions = [
+                position
+                for position, field_plan in enumerate(fields)
+                if field_plan[0] in needed
+            ]
+
+            if self.sequential:
+                fields = fields[: positions[-1] + 1] if positions else ()
+            else:
+                fields = tuple(fields[position] for position in positions)
+
+        field_set = {field_plan[0] for field_plan in fields}
+        regions = {
+            field: region
+            for field, _, _, region in fields
+            if region is not None
+        }
+
+        projection = ExtractionPlan.__new__(ExtractionPlan)
+        projection.fields = fields
+        projection.field_casters = tuple(
+            (field, caster)
+            for field, caster in self.field_casters
+            if field in field_set
+        )
+        projection.with_table = self.with_table and "table" in selections
+        projection.table_first = self.table_first and uses_table(regions)
+        projection.table = (
+            self.table
+            if projection.with_table or projection.table_first
+            else None
+        )
+        projection.sequential = self.sequential
+        projection.sequential_fallback = self.sequential_fallback
+        projection.uniqueness_fields = self.uniqueness_fields
+        projection.selections = selections
+        projection._projections = {}
+
+        return projection
+
+    def iter_rows(self, ocr_result):
+        """
+        Yields the table rows of the pre processed OCR result string lazily,
+        with their named groups already cast to the DRM types, so the rows
+        of very long tables are not all kept in memory. The uniqueness
+        fields are not checked.
+
+        Args:
+            ocr_result (str): already pre processed OCR result string.
+
+        Yields:
+            (dict): {"row": row, "data": named groups} dict of each row, the
+                    same as the rows of the extract method.
+        """
+        table = self.table
+
+        if table is None:
+            return
+
+        header, footer = table.markers(ocr_result)
+
+        if not footer:
+            return
+
+        row_casters = table.row_casters
+
+        for row_dict in table.iter_rows(
+            ocr_result[header.end() : footer.start()]
+        ):
+            if row_casters:
+                cast_section(row_dict["data"], row_casters)
+
+            yield row_dict
+
+    def _extract_sequential(self, ocr_result, header, footer):
+        """
+        Extracts the fields in their declaration order, each search starting
+        at the end of the previous match, see extract_fields.
+        """
+        fallback = self.sequential_fallback
+        fields = {}
+        cursor = 0
+
+        for field, search, grouped, region in self.fields:
+            pos, endpos = region_window(region, ocr_result, header, footer)
+            match = search(ocr_result, max(pos, cursor), endpos)
+
+            if match:
+                cursor = match.end()
+            elif fallback and cursor > pos:
+                match = search(ocr_result, pos, endpos)
+
+            if match:
+                fields[field] = match.group(1) if grouped else match.group()
+
+        return fields
+
+    def extract(self, ocr_result, stats=None, spans=False):
+        """
+        Extracts the data of the pre processed OCR result string.
+
+        Args:
+            ocr_result (str): already pre processed OCR result string;
+            stats (ParseStats): optional statistics of the parsing;
+            spans (bool): returns the table header, all_rows and footer as
+                          Span objects and the rows as TableRow objects,
+                          which are offsets into the OCR result string.
+
+        Returns:
+            (dict): Dict with all the extracted data, see extract_ocr_data.
+        """
+        if stats is not None:
+            start = timer()
+
+        table = self.table
+        header = footer = row_dicts = None
+
+        if self.table_first:
+            header, footer = table.markers(ocr_result)
+
+        if self.sequential:
+            fields = self._extract_sequential(ocr_result, header, footer)
+        else:
+            fields = {}
+
+            for field, search, grouped, region in self.fields:
+                if region is None:
+                    match = search(ocr_result)
+                else:
+                    match = search(
+                        ocr_result,
+                        *region_window(region, ocr_result, header, footer)
+                    )
+
+                if match:
+                    fields[field] = (
+                        match.group(1) if grouped else match.group()
+                    )
+
+        extracted_data = {"fields": fields, "table": {}}
+
+        if stats is not None:
+            stats.regexes_executed += len(self.fields)
+            start = stats.lap("fields", start)
+
+        if self.with_table and not self.table_first:
+            header, footer = table.markers(ocr_result)
+
+        if stats is not None:
+            stats.regexes_executed += 2 if table is not None else 0
+            start = stats.lap("table", start)
+
+        if footer and self.with_table:
+            rows_start, rows_end = header.end(), footer.start()
+            all_rows = ocr_result[rows_start:rows_end]
+
+            if spans:
+                table_data = {
+                    "header": Span(ocr_result, *header.span()),
+                    "all_rows": Span(ocr_result, rows_start, rows_end),
+                    "footer": Span(ocr_result, *footer.span()),
+                }
+                rows = [
+                    TableRow(ocr_result, row_start, row_end, data)
+                    for row_start, row_end, data in table.iter_row_spans(
+                        all_rows, rows_start
+                    )
+                ]
+            else:
+                table_data = {
+                    "header": header.group(),
+                    "all_rows": all_rows,
+                    "footer": footer.group(),
+                }
+                rows = list(table.iter_rows(all_rows))
+
+            extracted_data["table"] = table_data
+
+            if rows:
+                row_dicts = table_data["rows"] = rows
+
+            if stats is not None:
+                inline_count = len(rows) if table.inline else 0
+                stats.regexes_executed += 1 + inline_count
+                stats.table_rows += len(rows)
+                start = stats.lap("rows", start)
+
+        if row_dicts and table.row_casters:
+            if spans:
+                cast_columns(
+                    [row.data for row in row_dicts], table.row_column_casters
+                )
+            else:
+                table.cast_rows(row_dicts)
+
+        if self.field_casters:
+            cast_section(fields, self.field_casters)
+
+        if stats is not None:
+            stats.lap("types", start)
+
+        if self.uniqueness_fields:
+            found_unique_fields = get_uniqueness_fields(
+                fields, self.uniqueness_fields
+            )
+
+            if not found_unique_fields:
+                return {}
+
+            extracted_data["uniqueness_fields"] = found_unique_fields
+
+        if self.selections is not None:
+            return project_data(extracted_data, self.selections)
+
+        return extracted_data
+
+
+def iter_table_rows(ocr_result, drm):
+    """
+    Yields the table rows of a pre processed OCR result string lazily, see
+    ExtractionPlan.iter_rows.
+
+    Args:
+        ocr_result (str): already pre processed OCR result string;
+        drm (dict): DRM dict, the plan of compiled DRMs is reused.
+
+    Returns:
+        (generator): generator of the rows dicts.
+    """
+    plan = getattr(drm, "plan", None) or ExtractionPlan(drm)
+
+    return plan.iter_rows(ocr_result)
@@ -4,11 +4,169 @@ stage of the OCR result string.
 """
 import logging
 import re
+from functools import partial
 
 from unidecode import unidecode
 
+from regex4ocr.parser.literals import literal_string
+
 logger = logging.getLogger(__name__)
 
+WHITESPACE_REGEXP = re.compile(r"\s")
+
+# deletes the ascii chars matched by the whitespace regexp
+ASCII_WHITESPACE_TABLE = {
+    code: None for code in range(128) if WHITESPACE_REGEXP.match(chr(code))
+}
+
+# its lowercase depends on the position of the char in the word
+CAPITAL_SIGMA = "\u03a3"
+
+
+class TranslationTable(dict):
+    """
+    Translation table for str.translate that normalizes each char according
+    to the DRM options: lowercase, then whitespace removal and then ascii
+    transliteration. The table is filled lazily with the chars that are
+    actually seen in the OCR results.
+
+    Args:
+        lowercase (bool): lowercases the chars;
+        remove_whitespace (bool): removes the whitespace chars;
+        force_ascii (bool): transliterates the chars to ascii with unidecode.
+    """
+
+    def __init__(self, lowercase, remove_whitespace, force_ascii):
+        super().__init__()
+
+        self.lowercase = lowercase
+        self.remove_whitespace = remove_whitespace
+        self.force_ascii = force_ascii
+
+    def __missing__(self, code):
+        text = chr(code)
+
+        if self.lowercase:
+            text = text.lower()
+
+        if self.remove_whitespace:
+            text = WHITESPACE_REGEXP.sub("", text)
+
+        if self.force_ascii:
+            text = unidecode(text)
+
+        self[code] = text
+
+        return text
+
+
+# translation tables by (lowercase, remove_whitespace, force_ascii) options
+_translation_tables = {}
+
+
+def _overlaps(text_1, text_2):
+    """
+    Checks if two strings may overlap when both occur in the same string.
+    """
+    if text_1 in text_2 or text_2 in text_1:
+        return True
+
+    return any(
+        text_1.endswith(text_2[:size]) or text_2.endswith(text_1[:size])
+        for size in range(1, min(len(text_1), len(text_2)))
+    )
+
+
+def _can_fuse(literal_replaces, literal, replacement):
+    """
+    Checks if a literal replace can be applied in the same pass of the
+    previous literal replaces without changing the sequential result: its
+    literal cannot overlap the previous literals nor their replacements.
+    """
+    if not isinstance(replacement, str) or not replacement:
+        return False
+
+    if "\\" in replacement:  # group references and escapes
+        return False
+
+    return not any(
+        _overlaps(literal, previous_literal)
+        or _overlaps(literal, previous_replacement)
+        for previous_literal, previous_replacement in literal_replaces
+    )
+
+
+def _replace_literal(replacements, match):
+    """
+    Replacement callback of the fused literal replaces.
+    """
+    return replacements[match.group()]
+
+
+def _fuse_literal_replaces(literal_replaces):
+    """
+    Turns a list of literal replaces into a single (regexp, replacement)
+    replace whose regexp is an alternation of all the literals.
+    """
+    if len(literal_replaces) == 1:
+        literal, replacement = literal_replaces[0]
+
+        return re.compile(re.escape(literal)), replacement
+
+    replacements = dict(literal_replaces)
+    alternation = "|".join(
+        re.escape(literal) for literal in sorted(replacements, key=len)[::-1]
+    )
+
+    return re.compile(alternation), partial(_replace_literal, replacements)
+
+
+def compile_replaces(replaces):
+    """
+    Pre compiles the replaces of a DRM. Consecutive replaces whose regexps
+    are plain literals are fused into a single regexp with a dict lookup
+    replacement whenever it does not change the result of applying them one
+    after the other. The other regexps are just compiled.
+
+    Args:
+        replaces (list): List of tuples in the following format:
+                         [(regexp, replace_str), (regexp, replace_str), ...]
+
+    Returns:
+        (list): List of tuples in the following format:
+                [(compiled_regexp, replacement), ...] where the replacement
+                is a string or a callable that receives the match.
+    """
+    compiled_replaces = []
+    literal_replaces = []
+
+    for regexp, replacement in replaces:
+        literal = literal_string(regexp)
+
+        if literal and _can_fuse(literal_replaces, literal, replacement):
+            literal_replaces.append((literal, replacement))
+            continue
+
+        if literal_replaces:
+            compiled_replaces.append(_fuse_literal_replaces(literal_replaces))
+            literal_replaces = []
+
+        if literal and _can_fuse([], literal, replacement):
+            literal_replaces.append((literal, replacement))
+        else:
+            compiled_replaces.append((re.compile(regexp), replacement))
+
+    if literal_replaces:
+        compiled_replaces.append(_fuse_literal_replaces(literal_replaces))
+
+    logger.debug(
+        "Compiled %s replaces into %s passes...",
+        len(replaces),
+        len(compiled_replaces),
+    )
+
+    return compiled_replaces
+
 
 def process_replaces(pre_process_str, replaces):
     """
@@ -19,6 +177,7 @@ def process_replaces(pre_process_str, replaces):
         pre_process_str (str): OCR document str in the pre process stage;
         replaces (list): List of tuples in the following format:
                          [(regexp, replace_str), (regexp, replace_str), ...]
+                         or the compiled replaces of compile_replaces.
 
     Returns:
         (str): The pre processed OCR result string after the DRM option
@@ -30,6 +189,48 @@ def process_replaces(pre_process_str, replaces):
     return pre_process_str
 
 
+def normalize_text(ocr_result, lowercase, remove_whitespace, force_ascii):
+    """
+    Applies the lowercase, remove_whitespace and force_ascii DRM options
+    in a single pass over the OCR result string with a translation table.
+    The result is the same as applying the options one after the other.
+
+    Args:
+        ocr_result (str): OCR result string;
+        lowercase (bool): lowercases the string;
+        remove_whitespace (bool): removes all the whitespace chars;
+        force_ascii (bool): transliterates the string to ascii.
+
+    Returns:
+        (str): the normalized OCR result string.
+    """
+    if ocr_result.isascii():
+        # ascii strings are not changed by the transliteration
+        if lowercase:
+            ocr_result = ocr_result.lower()
+
+        if remove_whitespace:
+            ocr_result = ocr_result.translate(ASCII_WHITESPACE_TABLE)
+
+        return ocr_result
+
+    if lowercase and CAPITAL_SIGMA in ocr_result:
+        ocr_result = ocr_result.lower()
+        lowercase = False
+
+    key = (bool(lowercase), bool(remove_whitespace), bool(force_ascii))
+
+    if not any(key):
+        return ocr_result
+
+    table = _translation_tables.get(key)
+
+    if table is None:
+        table = _translation_tables.setdefault(key, TranslationTable(*key))
+
+    return ocr_result.translate(table)
+
+
 def apply_options(ocr_result, options):
     """
     Applies the options configus of the matching DRM.
@@ -41,16 +242,12 @@ def apply_options(ocr_result, options):
     Returns:
         (str): The pre processed OCR result string according to the DRM.
     """
-    pre_processed_str = ocr_result
-
-    if options.get("lowercase"):
-        pre_processed_str = pre_processed_str.lower()
-
-    if options.get("remove_whitespace"):
-        pre_processed_str = re.sub(r"\s", "", pre_processed_str)
-
-    if options.get("force_ascii"):
-        pre_processed_str = unidecode(pre_processed_str)
+    pre_processed_str = normalize_text(
+        ocr_result,
+        options.get("lowercase"),
+        options.get("remove_whitespace"),
+        options.get("force_ascii"),
+    )
 
     if options.get("replace"):
         pre_processed_str = process_replaces(
@@ -0,0 +1,126 @@
+"""
+Module with the search regions of the DRM fields. The optional 'regions'
+section of a DRM restricts the search of a field regexp to a window of the
+pre processed OCR result string:
+
+    regions:
+        cnpj: before_table  # from the beginning to the end of the header
+        total: after_table  # from the beginning of the footer to the end
+        store: {lines: [0, 10]}  # the first 10 lines
+        change: {lines: [-3, null]}  # the last 3 lines
+
+The table regions use the whole string when the table is not found. The
+lines follow the python slices semantics over the newline separated lines.
+"""
+BEFORE_TABLE = "before_table"
+AFTER_TABLE = "after_table"
+
+
+def _is_line(line):
+    if isinstance(line, bool):
+        return False
+
+    return line is None or isinstance(line, int)
+
+
+def is_valid_region(region):
+    """
+    Checks if a region of the DRM 'regions' section is valid.
+
+    Args:
+        region: region declared for a field.
+
+    Returns:
+        (bool): True if the region is valid. Otherwise, False.
+    """
+    if region in (BEFORE_TABLE, AFTER_TABLE):
+        return True
+
+    if not isinstance(region, dict) or list(region) != ["lines"]:
+        return False
+
+    lines = region["lines"]
+
+    return (
+        isinstance(lines, list)
+        and len(lines) == 2
+        and all(_is_line(line) for line in lines)
+    )
+
+
+def line_offset(text, line):
+    """
+    Returns the offset of the beginning of a line of the text.
+
+    Args:
+        text (str): the text;
+        line (int): line number, negative numbers count from the last line.
+
+    Returns:
+        (int): offset of the line, clamped to the text bounds.
+    """
+    if line >= 0:
+        offset = 0
+
+        for _ in range(line):
+            offset = text.find("\n", offset) + 1
+
+            if not offset:
+                return len(text)
+
+        return offset
+
+    offset = len(text)
+
+    for _ in range(-line):
+        offset = text.rfind("\n", 0, offset)
+
+        if offset < 0:
+            return 0
+
+    return offset + 1
+
+
+def region_window(region, text, header, footer):
+    """
+    Returns the window of the text where a field is searched.
+
+    Args:
+        region: region declared for the field or None;
+        text (str): pre processed OCR result string;
+        header (re.Match): match of the table header or None;
+        footer (re.Match): match of the table footer or None.
+
+    Returns:
+        (tuple): (pos, endpos) of the window, to be used with the search
+                 method of the compiled regexps.
+    """
+    if region is None:
+        return 0, len(text)
+
+    if region == BEFORE_TABLE:
+        return 0, header.end() if header and footer else len(text)
+
+    if region == AFTER_TABLE:
+        return footer.start() if header and footer else 0, len(text)
+
+    first, last = region["lines"]
+    pos = 0 if first is None else line_offset(text, first)
+    endpos = len(text) if last is None else line_offset(text, last)
+
+    return pos, max(pos, endpos)
+
+
+def uses_table(regions):
+    """
+    Checks if any region depends on the table of the document.
+
+    Args:
+        regions (dict): DRM 'regions' section.
+
+    Returns:
+        (bool): True if the table must be found before the fields.
+    """
+    return any(
+        region in (BEFORE_TABLE, AFTER_TABLE) for region in regions.values()
+    )
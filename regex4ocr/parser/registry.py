@@ -0,0 +1,501 @@
+"""
+Module with the DRM registry which loads the DRM directory folder only
+once and keeps all the DRMs regexps pre compiled in memory.
+"""
+import logging
+import os
+import threading
+
+from regex4ocr.dedup import flag_duplicate, get_uniqueness_values
+from regex4ocr.parser.bundle import default_bundle_path, read_bundle
+from regex4ocr.parser.compiler import compile_drm
+from regex4ocr.parser.drm_index import DrmIndex
+from regex4ocr.parser.drm_scanner import (
+    drms_version,
+    get_first_drm_match,
+    hash_file,
+    load_drm,
+    sort_drms_by_priority,
+    stat_drms_folder,
+)
+from regex4ocr.parser.parser import (
+    FIRST_MATCH,
+    extract_pre_processed,
+    extract_uniqueness_fields,
+    make_limits,
+    parse_ocr_result,
+    pre_process_matches,
+)
+from regex4ocr.parser.plan import iter_table_rows, parse_select
+from regex4ocr.parser.pre_process import pre_process_result
+from regex4ocr.parser.stats import timer
+
+logger = logging.getLogger(__name__)
+
+# seconds between the folder checks of the auto reload registries
+AUTO_RELOAD_INTERVAL = 1.0
+
+# default registries cached by the absolute path of their DRM folders
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+class DrmFile:
+    """
+    State of a single file of the DRM directory folder.
+
+    Args:
+        signature (tuple): (mtime_ns, size) of the file;
+        content_hash (str): hex digest of the file contents;
+        drm (dict): compiled DRM dict or None if the file is not a valid DRM.
+    """
+
+    __slots__ = ("signature", "content_hash", "drm")
+
+    def __init__(self, signature, content_hash, drm):
+        self.signature = signature
+        self.content_hash = content_hash
+        self.drm = drm
+
+
+class DrmRegistry:
+    """
+    Holds all the valid DRMs of a DRM directory folder with their regexps
+    already compiled. The folder is scanned only once when the registry is
+    created, hence the cost of parsing an OCR document does not depend on
+    the number of yml files of the folder.
+
+    The registry can be refreshed to pick up new, edited or deleted DRM
+    files: only the changed files are parsed again and the new DRMs list is
+    swapped at once, so in flight parse calls keep using the previous one.
+
+    The DRMs are kept in a DrmIndex so only the DRMs whose identifiers
+    literals are found in the OCR document have their regexps tested.
+
+    When the folder has a compiled DRMs bundle (see the compile-drms
+    command), the DRMs of the files that did not change since the bundle was
+    written are taken from it instead of parsing their yml files.
+
+    Args:
+        drms_path (str): filesys path to the folder with the
+                         document regexp models (drms);
+        auto_reload (bool or float): checks the folder for changes before a
+                                     parse when the last check is older
+                                     than these seconds, True for
+                                     AUTO_RELOAD_INTERVAL;
+        bundle_path (str): path of the compiled DRMs bundle, defaults to the
+                           bundle file inside the DRM folder.
+    """
+
+    def __init__(self, drms_path, auto_reload=False, bundle_path=None):
+        self.drms_path = drms_path
+        self.auto_reload = auto_reload
+        self.bundle_path = bundle_path or default_bundle_path(drms_path)
+        self._state = (None, DrmIndex([]))
+        self._checked = None
+        self._files = {}
+        self._bundle_files = {}
+        self._lock = threading.Lock()
+        self._poller = None
+        self._stop_polling = threading.Event()
+
+        self.load()
+
+    @property
+    def drms(self):
+        """
+        (DrmIndex): the current DRMs of the registry.
+        """
+        return self._state[1]
+
+    @property
+    def version(self):
+        """
+        (str): hash of the contents of the current DRM files.
+        """
+        return self._state[0]
+
+    def snapshot(self):
+        """
+        Returns the current version and DRMs of the registry at once, which
+        a refresh of another thread swaps together.
+
+        Returns:
+            (tuple): (version, drms) of the registry.
+        """
+        return self._state
+
+    def load(self):
+        """
+        Scans the DRM directory folder and compiles all its valid DRMs.
+        """
+        logger.info("Loading DRMs registry from: %s", self.drms_path)
+
+        bundle = read_bundle(self.bundle_path)
+
+        if bundle:
+            logger.info("Using the DRMs bundle: %s", self.bundle_path)
+            self._bundle_files = bundle["files"]
+
+        try:
+            self.refresh()
+        finally:
+            # the bundle is only useful for the files of the first load
+            self._bundle_files = {}
+
+        logger.info("Loaded %s DRMs into the registry...", len(self.drms))
+
+    def refresh(self, blocking=True):
+        """
+        Checks the DRM directory folder for changes and reloads the changed
+        files only. The DRMs list of the registry is swapped atomically.
+
+        Args:
+            blocking (bool): waits for another thread that is already
+                             refreshing the registry. If False, returns
+                             right away in that case.
+
+        Returns:
+            (bool): True if the registry DRMs were changed.
+        """
+        if not self._lock.acquire(blocking):
+            return False
+
+        try:
+            return self._refresh()
+        finally:
+            self._lock.release()
+
+    def _refresh(self):
+        self._checked = timer()
+        signatures = stat_drms_folder(self.drms_path)
+        current = {name: f.signature for name, f in self._files.items()}
+
+        if self.version is not None and signatures == current:
+            return False
+
+        files = {}
+        changed = set(signatures) != set(self._files)
+
+        for name in sorted(signatures):
+            file_path = os.path.join(self.drms_path, name)
+            drm_file = self._files.get(name)
+
+            if drm_file and drm_file.signature == signatures[name]:
+                files[name] = drm_file
+                continue
+
+            bundled = self._bundle_files.get(name)
+
+            if bundled and tuple(bundled["signature"]) == signatures[name]:
+                content_hash = bundled["content_hash"]
+            else:
+                content_hash = hash_file(file_path)
+
+            if drm_file and drm_file.content_hash == content_hash:
+                drm_file.signature = signatures[name]
+                files[name] = drm_file
+                continue
+
+            if bundled and bundled["content_hash"] == content_hash:
+                drm_dict = bundled["drm"]
+            else:
+                logger.debug("Loading new or changed DRM file: %s", name)
+                drm_dict = load_drm(file_path)
+            drm = compile_drm(drm_dict) if drm_dict else None
+
+            if drm is not None:
+                drm.name = name
+
+            files[name] = DrmFile(signatures[name], content_hash, drm)
+            changed = True
+
+        if not changed and self.version is not None:
+            self._files = files
+            return False
+
+        version = drms_version(
+            {name: f.content_hash for name, f in files.items()}
+        )
+
+        # swaps the whole state at once for the in flight parse calls
+        self._files = files
+        self._state = (
+            version,
+            DrmIndex(
+                sort_drms_by_priority(
+                    f.drm for _, f in sorted(files.items()) if f.drm
+                )
+            ),
+        )
+
+        logger.info("DRMs registry version is now: %s", version)
+
+        return True
+
+    def auto_refresh(self):
+        """
+        Refreshes the auto reload registry when its last folder check is
+        older than its auto_reload interval, so the parse calls do not stat
+        all the DRM files each time.
+
+        Returns:
+            (bool): True if the registry DRMs were changed.
+        """
+        if not self.auto_reload:
+            return False
+
+        interval = self.auto_reload
+
+        if interval is True:
+            interval = AUTO_RELOAD_INTERVAL
+
+        checked = self._checked
+
+        if checked is not None and timer() - checked < interval:
+            return False
+
+        return self.refresh(blocking=False)
+
+    def start_polling(self, interval=5.0):
+        """
+        Starts a background daemon thread that refreshes the registry.
+
+        Args:
+            interval (float): seconds between each folder check.
+        """
+        if self._poller and self._poller.is_alive():
+            return
+
+        self._stop_polling.clear()
+        self._poller = threading.Thread(
+            target=self._poll,
+            args=(interval,),
+            name="regex4ocr-drms-poller",
+            daemon=True,
+        )
+        self._poller.start()
+
+    def stop_polling(self):
+        """
+        Stops the background thread started by start_polling.
+        """
+        self._stop_polling.set()
+
+        if self._poller:
+            self._poller.join()
+            self._poller = None
+
+    def _poll(self, interval):
+        while not self._stop_polling.wait(interval):
+            try:
+                self.refresh()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Failed to refresh the DRMs registry...")
+
+    def parse(
+        self,
+        ocr_result,
+        selection=FIRST_MATCH,
+        stats=None,
+        deadline=None,
+        regex_timeout=None,
+        spans=False,
+        select=None,
+        cache=None,
+        duplicates=None,
+    ):
+        """
+        Parses the OCR result string with the DRMs of this registry.
+
+        With a cache, the results are kept by a hash of the OCR result
+        string, the registry version and the parse options, so the same
+        OCR string is only parsed again after the DRMs change. The stats
+        are not filled for the cached results. The results are cached as
+        they are returned, along with their duplicate flags.
+
+        With a duplicates index, the OCR result strings similar enough to a
+        previously parsed one, e.g. rescans of the same document, are
+        flagged with the {"duplicate": {"similarity": ratio}} key, unless
+        their uniqueness fields differ. With the reuse option, the result of
+        the duplicate is returned when its uniqueness fields are extracted
+        from the OCR result string, see regex4ocr.DuplicateIndex.
+
+        Args:
+            ocr_result (str): OCR result string;
+            selection (str): DRM selection mode, see parse_ocr_result;
+            stats (ParseStats): optional statistics of the parsing;
+            deadline (float): seconds available to parse the document;
+            regex_timeout (float): seconds available to each extraction
+                                   regexp, see parse_ocr_result;
+            spans (bool): returns the table as offsets into the OCR string,
+                          see parse_ocr_result;
+            select (list): sections of the data to be extracted, see
+                           parse_ocr_result;
+            cache (ResultCache): optional cache of the results, see
+                                 regex4ocr.cache;
+            duplicates (DuplicateIndex): optional index of the near
+                                         duplicate documents, see
+                                         regex4ocr.dedup.
+
+        Returns:
+            (dict): the extracted data from the OCR results or an empty
+                    dict if no DRM matches the ocr_result string. A list
+                    with the data of each matching DRM for 'all_matches'.
+        """
+        self.auto_refresh()
+
+        # the cache key and the results of the same DRMs version
+        version, drms = self.snapshot()
+        selections = None if select is None else parse_select(select)
+        options = (
+            selection,
+            spans,
+            None if selections is None else tuple(sorted(selections)),
+        )
+
+        if cache is not None:
+            key = cache.make_key(ocr_result, version, *options)
+            ocr_data = cache.get(key)
+
+            if ocr_data is not None:
+                return ocr_data
+
+        matches = None
+
+        if duplicates is not None:
+            context = (version,) + options
+            fingerprint = duplicates.fingerprint(ocr_result)
+            duplicate = duplicates.find(fingerprint, context)
+
+            if duplicate is not None and duplicates.reuse:
+                similarity, ocr_data = duplicate
+                stored_values = get_uniqueness_values(ocr_data)
+
+                if stored_values is not None:
+                    # the DRMs are identified and the OCR result is pre
+                    # processed once, for the check and for the extraction
+                    limits = make_limits(deadline, regex_timeout, spans)
+                    matches = [
+                        (drm, pre_processed, limits and limits.for_drm())
+                        for drm, pre_processed in pre_process_matches(
+                            ocr_result, drms, selection, stats
+                        )
+                    ]
+                    values = [
+                        extract_uniqueness_fields(pre_processed, drm, limits)
+                        for drm, pre_processed, limits in matches
+                    ]
+
+                    if all(values) and values == stored_values:
+                        ocr_data = flag_duplicate(ocr_data, similarity)
+
+                        if cache is not None:
+                            cache.set(key, ocr_data)
+
+                        return ocr_data
+
+        if matches is None:
+            ocr_data = parse_ocr_result(
+                ocr_result,
+                drms,
+                selection=selection,
+                stats=stats,
+                deadline=deadline,
+                regex_timeout=regex_timeout,
+                spans=spans,
+                select=select,
+            )
+        else:
+            ocr_data = [
+                extract_pre_processed(
+                    pre_processed, drm, stats, limits, spans, selections
+                )
+                for drm, pre_processed, limits in matches
+            ]
+
+            if selection == FIRST_MATCH:
+                ocr_data = ocr_data[0] if ocr_data else {}
+
+        if duplicates is not None:
+            if duplicate is not None:
+                stored_values = get_uniqueness_values(duplicate[1])
+                values = get_uniqueness_values(ocr_data)
+
+                # the similar documents with other uniqueness fields are not
+                # duplicates, e.g. receipts of the same store and items
+                if stored_values is not None and stored_values != values:
+                    duplicate = None
+
+            if duplicate is None:
+                duplicates.add(fingerprint, ocr_data, context)
+            else:
+                flag_duplicate(ocr_data, duplicate[0])
+
+        if cache is not None:
+            cache.set(key, ocr_data)
+
+        return ocr_data
+
+    def iter_rows(self, ocr_result):
+        """
+        Yields the table rows of the OCR result string lazily, extracted
+        with the first DRM that matches it. Handy for documents with very
+        long tables.
+
+        Args:
+            ocr_result (str): OCR result string.
+
+        Returns:
+            (iterator): iterator of the {"row": row, "data": named groups}
+                        dicts, empty if no DRM matches the OCR result.
+        """
+        self.auto_refresh()
+
+        drm = get_first_drm_match(ocr_result, self.drms)
+
+        if not drm:
+            return iter(())
+
+        return iter_table_rows(pre_process_result(ocr_result, drm), drm)
+
+
+def get_registry(drms_path, auto_reload=False):
+    """
+    Returns the default cached registry of a DRM directory folder. The
+    registry is created on the first call for each folder.
+
+    Args:
+        drms_path (str): filesys path to the folder with the
+                         document regexp models (drms);
+        auto_reload (bool or float): checks the folder for changes before a
+                                     parse, at most once per these seconds,
+                                     see DrmRegistry.
+
+    Returns:
+        (DrmRegistry): the cached registry of the folder.
+    """
+    key = os.path.abspath(drms_path)
+
+    with _registries_lock:
+        registry = _registries.get(key)
+
+        if registry is None:
+            registry = DrmRegistry(drms_path, auto_reload=auto_reload)
+            _registries[key] = registry
+
+    registry.auto_reload = registry.auto_reload or auto_reload
+
+    return registry
+
+
+def clear_registries():
+    """
+    Drops all the default cached registries so the DRM folders are scanned
+    again on the next parse call.
+    """
+    with _registries_lock:
+        for registry in _registries.values():
+            registry.stop_polling()
+
+        _registries.clear()
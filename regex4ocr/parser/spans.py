@@ -0,0 +1,128 @@
+"""
+Module with the objects of the span results: the table header, rows and
+footer are kept as offsets into the pre processed OCR result string, whose
+substrings are only created when they are accessed.
+"""
+
+
+class Span:
+    """
+    Substring of the pre processed OCR result string given by its offsets.
+    The string is only sliced when the value is accessed.
+
+    Args:
+        text (str): the pre processed OCR result string;
+        start (int): offset of the first char of the substring;
+        end (int): offset right after the last char of the substring.
+    """
+
+    __slots__ = ("text", "start", "end")
+
+    def __init__(self, text, start, end):
+        self.text = text
+        self.start = start
+        self.end = end
+
+    @property
+    def span(self):
+        return self.start, self.end
+
+    @property
+    def value(self):
+        return self.text[self.start : self.end]
+
+    def __str__(self):
+        return self.value
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __eq__(self, other):
+        if isinstance(other, Span):
+            return self.value == other.value
+
+        return self.value == other
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __repr__(self):
+        return "<Span span=%r value=%r>" % (self.span, self.value)
+
+
+class TableRow(Span):
+    """
+    Table row of the span results, used instead of the {"row": row, "data":
+    named groups} dicts. The span excludes the newline that begins the row
+    and the row string, without any newline, is only created when it is
+    accessed.
+
+    Args:
+        text (str): the pre processed OCR result string;
+        start (int): offset of the beginning of the row;
+        end (int): offset of the end of the row;
+        data (dict): the inline named groups of the row.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, text, start, end, data):
+        # the attributes are set here, rows are created in large numbers
+        self.text = text
+        self.start = start
+        self.end = end
+        self.data = data
+
+    @property
+    def row(self):
+        return self.value.replace("\n", "")
+
+    def as_dict(self):
+        """
+        Returns the row as the dict of the default results.
+        """
+        return {"row": self.row, "data": self.data}
+
+    def __eq__(self, other):
+        if isinstance(other, TableRow):
+            return self.row == other.row and self.data == other.data
+
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "<TableRow span=%r row=%r data=%r>" % (
+            self.span,
+            self.row,
+            self.data,
+        )
+
+
+def materialize(extracted_data):
+    """
+    Converts span results into the default results, with the substrings and
+    the rows dicts, e.g. before serializing them to JSON.
+
+    Args:
+        extracted_data (dict): extracted data of the span results, or a list
+                               of them for the 'all_matches' selection.
+
+    Returns:
+        (dict): the same extracted data with strings instead of the spans.
+    """
+    if isinstance(extracted_data, list):
+        return [materialize(data) for data in extracted_data]
+
+    if not extracted_data.get("table"):
+        return extracted_data
+
+    table = dict(extracted_data["table"])
+
+    for key in ("header", "all_rows", "footer"):
+        table[key] = str(table[key])
+
+    if "rows" in table:
+        table["rows"] = [row.as_dict() for row in table["rows"]]
+
+    return dict(extracted_data, table=table)
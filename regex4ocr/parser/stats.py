@@ -0,0 +1,97 @@
+"""
+Module with the parse statistics object used to instrument the parsing
+stages of an OCR document.
+"""
+import time
+
+# clock used to measure the stages wall times
+timer = time.perf_counter
+
+# parsing stages in the order they are executed
+STAGES = (
+    "identification",
+    "pre_process",
+    "fields",
+    "table",
+    "rows",
+    "types",
+)
+
+
+class ParseStats:
+    """
+    Collects the statistics of the parsing of OCR documents. It is filled
+    by the parser functions only when it is passed to them, so the parsing
+    has no instrumentation cost otherwise. The same object may be reused
+    to accumulate the statistics of many documents.
+
+    Attributes:
+        stage_times (dict): wall time in seconds of each parsing stage;
+        drm (dict): the DRM used to extract the data of the last document;
+        drms_tested (int): number of DRMs whose identifiers were tested;
+        regexes_executed (int): number of regexps searched in the document;
+        table_rows (int): number of table rows found.
+    """
+
+    __slots__ = (
+        "stage_times",
+        "drm",
+        "drms_tested",
+        "regexes_executed",
+        "table_rows",
+    )
+
+    def __init__(self):
+        self.stage_times = {}
+        self.drm = None
+        self.drms_tested = 0
+        self.regexes_executed = 0
+        self.table_rows = 0
+
+    def add_time(self, stage, seconds):
+        """
+        Adds the wall time of a parsing stage.
+
+        Args:
+            stage (str): name of the stage, see STAGES;
+            seconds (float): wall time of the stage.
+        """
+        self.stage_times[stage] = self.stage_times.get(stage, 0.0) + seconds
+
+    def lap(self, stage, start):
+        """
+        Adds the wall time elapsed since start to a parsing stage.
+
+        Args:
+            stage (str): name of the stage, see STAGES;
+            start (float): timer value of the beginning of the stage.
+
+        Returns:
+            (float): the current timer value, the start of the next stage.
+        """
+        now = timer()
+        self.add_time(stage, now - start)
+
+        return now
+
+    def as_dict(self):
+        """
+        Returns the statistics as a dict.
+
+        Returns:
+            (dict): dict with the statistics.
+        """
+        return {
+            "stage_times": dict(self.stage_times),
+            "drm": self.drm,
+            "drms_tested": self.drms_tested,
+            "regexes_executed": self.regexes_executed,
+            "table_rows": self.table_rows,
+        }
+
+    def __repr__(self):
+        return "ParseStats(%s)" % ", ".join(
+            "%s=%r" % (key, value)
+            for key, value in self.as_dict().items()
+            if key != "drm"
+        )
@@ -2,10 +2,44 @@
 Module with type-casting related functions.
 """
 import logging
+import re
 from datetime import datetime
+from functools import lru_cache, partial
+from itertools import repeat
+
+try:  # optional, casts the long int and float columns at once
+    import numpy
+except ImportError:
+    numpy = None
 
 logger = logging.getLogger(__name__)
 
+# cast functions of the DRM types without metadata
+TYPES_MAPPING = {"int": int, "float": float, "str": str}
+
+# regexps of the datetime directives of the fast parsers, the same ones of
+# datetime.strptime, so the parsers accept and reject the same strings
+DATETIME_DIRECTIVES = {
+    "d": r"(?P<d>3[0-1]|[1-2]\d|0[1-9]|[1-9]| [1-9])",
+    "m": r"(?P<m>1[0-2]|0[1-9]|[1-9])",
+    "y": r"(?P<y>\d\d)",
+    "Y": r"(?P<Y>\d\d\d\d)",
+    "H": r"(?P<H>2[0-3]|[0-1]\d|\d)",
+    "M": r"(?P<M>[0-5]\d|\d)",
+    "S": r"(?P<S>6[0-1]|[0-5]\d|\d)",
+    "%": "%",
+}
+
+# maximum number of raw values memoized by each compiled datetime caster
+CAST_MEMO_SIZE = 512
+
+# minimum number of values of a column cast with numpy, below it the numpy
+# arrays cost more than the builtin casts
+NUMPY_MIN_COLUMN = 64
+
+# maximum number of digits of the int values cast with numpy int64
+NUMPY_MAX_DIGITS = 18
+
 
 def validate_types(extracted_data, drm):
     """
@@ -23,15 +57,20 @@ def validate_types(extracted_data, drm):
     logger.info("Performing inline captured groups type casting...")
 
     if rows and inline_groups_types_section:
-        # removes named groups if type casting fails
-        for row_dict in rows:
-            logger.debug(
-                "Validating row data: %s, with the types: %s",
-                row_dict["data"],
-                inline_groups_types_section,
-            )
+        logger.debug(
+            "Validating %s rows with the types: %s",
+            len(rows),
+            inline_groups_types_section,
+        )
 
-            remove_wrong_types(row_dict["data"], inline_groups_types_section)
+        # removes named groups if type casting fails, column by column
+        cast_columns(
+            [row_dict["data"] for row_dict in rows],
+            tuple(
+                (field, compile_column_caster(desired_type))
+                for field, desired_type in inline_groups_types_section.items()
+            ),
+        )
 
     # fields is always required
     if fields_types_section:
@@ -100,14 +139,12 @@ def cast_type(extracted_field, desired_type):
     if isinstance(desired_type, list):
         return _cast_type_list(extracted_field, desired_type)
 
-    types_mapping = {"int": int, "float": float, "str": str}
-
-    if desired_type not in types_mapping.keys():
+    if desired_type not in TYPES_MAPPING.keys():
         raise BaseException(
             "Unknown specified type at the DRM: %s", desired_type
         )
 
-    type_function = types_mapping[desired_type]
+    type_function = TYPES_MAPPING[desired_type]
 
     try:
         return type_function(extracted_field)
@@ -157,9 +194,7 @@ def _cast_type_list(extracted_field, desired_type):
     if desired_type[0] == "datetime":
         try:
 
-            return datetime.strptime(
-                extracted_field, desired_type[1]
-            ).isoformat()
+            return datetime_parser(desired_type[1])(extracted_field).isoformat()
 
         except ValueError:
             logger.info(
@@ -168,3 +203,256 @@ def _cast_type_list(extracted_field, desired_type):
                 desired_type,
             )
             return None
+
+
+def _datetime_pattern(datetime_format):
+    """
+    Translates a datetime format into the regexp of datetime.strptime, or
+    returns None if the format has directives without a fast parser or
+    repeated years or directives.
+    """
+    pattern = re.sub(r"([\\.^$*+?\(\){}\[\]|])", r"\\\1", datetime_format)
+    pattern = re.sub(r"\s+", r"\\s+", pattern)
+    processed_pattern = ""
+    found = set()
+
+    while "%" in pattern:
+        index = pattern.index("%") + 1
+        directive = pattern[index : index + 1]
+
+        if directive not in DATETIME_DIRECTIVES or directive in found:
+            return None
+
+        if directive != "%":
+            found.add(directive)
+
+        processed_pattern += pattern[: index - 1]
+        processed_pattern += DATETIME_DIRECTIVES[directive]
+        pattern = pattern[index + 1 :]
+
+    # strptime takes the last of the %y and %Y years
+    if {"y", "Y"} <= found:
+        return None
+
+    return processed_pattern + pattern
+
+
+@lru_cache(maxsize=128)
+def datetime_parser(datetime_format):
+    """
+    Creates the parse function of a datetime format. The formats made of
+    the %d, %m, %y, %Y, %H, %M and %S directives are parsed by a single
+    regexp match, without the module lock and the per call work of
+    datetime.strptime, which parses the other formats.
+
+    Args:
+        datetime_format (str): datetime format string of datetime.strptime.
+
+    Returns:
+        (callable): function that receives a string and returns the same
+                    datetime of datetime.strptime or raises ValueError.
+    """
+    pattern = _datetime_pattern(datetime_format)
+
+    if pattern is None:
+        return partial(_strptime, datetime_format=datetime_format)
+
+    regexp = re.compile(pattern, re.IGNORECASE)
+
+    def parse_datetime(date_string):
+        found = regexp.match(date_string)
+
+        if not found or found.end() != len(date_string):
+            raise ValueError(
+                "time data %r does not match format %r"
+                % (date_string, datetime_format)
+            )
+
+        groups = found.groupdict()
+
+        if "Y" in groups:
+            year = int(groups["Y"])
+        elif "y" in groups:
+            year = int(groups["y"])
+            year += 2000 if year <= 68 else 1900
+        else:
+            year = 1900
+
+        return datetime(
+            year,
+            int(groups.get("m", 1)),
+            int(groups.get("d", 1)),
+            int(groups.get("H", 0)),
+            int(groups.get("M", 0)),
+            int(groups.get("S", 0)),
+        )
+
+    return parse_datetime
+
+
+def _strptime(date_string, datetime_format):
+    return datetime.strptime(date_string, datetime_format)
+
+
+def compile_caster(desired_type):
+    """
+    Creates the cast function of a DRM type, which is equivalent to calling
+    cast_type with this desired_type but without its per call type lookups.
+    The datetime casters memoize the last CAST_MEMO_SIZE raw values, which
+    often repeat across the rows of a table.
+
+    Args:
+        desired_type (str): the type, see cast_type.
+
+    Returns:
+        (callable): function that receives the extracted field and returns
+                    it coerced to the desired_type or None if there was a
+                    coercion error. Unknown types raise when the function is
+                    called, as cast_type does.
+    """
+    if isinstance(desired_type, list):
+        if len(desired_type) < 2 or desired_type[0] != "datetime":
+            return partial(cast_type, desired_type=desired_type)
+
+        parse_datetime = datetime_parser(desired_type[1])
+
+        @lru_cache(maxsize=CAST_MEMO_SIZE)
+        def cast_datetime(extracted_field):
+            try:
+                return parse_datetime(extracted_field).isoformat()
+            except ValueError:
+                return None
+
+        return cast_datetime
+
+    type_function = (
+        TYPES_MAPPING.get(desired_type)
+        if isinstance(desired_type, str)
+        else None
+    )
+
+    if type_function is None:
+        return partial(cast_type, desired_type=desired_type)
+
+    def cast(extracted_field):
+        try:
+            return type_function(extracted_field)
+        except ValueError:
+            return None
+
+    return cast
+
+
+def cast_section(extracted_data_section, casters):
+    """
+    Same as remove_wrong_types but with the compiled casters of the types.
+
+    Args:
+        extracted_data_section (dict): portion of the parsed data;
+        casters (tuple): (field, caster) tuples, see compile_caster.
+    """
+    for desired_field, caster in casters:
+        extracted_field = extracted_data_section.get(desired_field)
+
+        if extracted_field:
+            cast_rslt = caster(extracted_field)
+
+            if cast_rslt:
+                extracted_data_section[desired_field] = cast_rslt
+            else:
+                extracted_data_section.pop(desired_field)
+
+
+def _plain_numbers(values, decimal):
+    """
+    Checks that all the values are plain ascii numbers, whose builtin and
+    numpy casts are the same and never fail. The checks run on the joined
+    values, without a python loop.
+    """
+    try:
+        joined = "".join(values)
+    except TypeError:  # values already cast, e.g. validated twice
+        return False
+
+    if decimal:
+        if "." in values or max(map(str.count, values, repeat("."))) > 1:
+            return False
+
+        joined = joined.replace(".", "")
+
+    return joined.isascii() and joined.isdigit()
+
+
+def compile_column_caster(desired_type):
+    """
+    Creates the cast function of a whole column of values of a DRM type.
+    The int and float columns of plain numbers are cast at once, with numpy
+    for the long columns when it is installed, while the other columns and
+    the columns with any other value are cast value by value.
+
+    Args:
+        desired_type (str): the type, see cast_type.
+
+    Returns:
+        (callable): function that receives a list of extracted fields and
+                    returns the list of their casts, the same ones of the
+                    compile_caster function.
+    """
+    caster = compile_caster(desired_type)
+
+    def cast_values(values):
+        return [caster(value) for value in values]
+
+    if desired_type not in ("int", "float"):
+        return cast_values
+
+    decimal = desired_type == "float"
+    type_function = TYPES_MAPPING[desired_type]
+    numpy_type = None
+
+    if numpy is not None:
+        numpy_type = numpy.float64 if decimal else numpy.int64
+
+    def cast_column(values):
+        if not _plain_numbers(values, decimal):
+            return cast_values(values)
+
+        if (
+            numpy_type is not None
+            and len(values) >= NUMPY_MIN_COLUMN
+            and (decimal or max(map(len, values)) <= NUMPY_MAX_DIGITS)
+        ):
+            return numpy.array(values).astype(numpy_type).tolist()
+
+        return list(map(type_function, values))
+
+    return cast_column
+
+
+def cast_columns(sections, column_casters):
+    """
+    Same as cast_section for many sections at once, e.g. the inline named
+    groups of all the rows of a table. The values of each field are cast as
+    a single column and the values whose cast fails are removed from their
+    sections, as remove_wrong_types does.
+
+    Args:
+        sections (list): portions of the parsed data with the same types;
+        column_casters (tuple): (field, column caster) tuples, see
+                                compile_column_caster.
+    """
+    for desired_field, column_caster in column_casters:
+        found = [section for section in sections if section.get(desired_field)]
+
+        if not found:
+            continue
+
+        cast_rslts = column_caster(
+            [section[desired_field] for section in found]
+        )
+
+        for section, cast_rslt in zip(found, cast_rslts):
+            if cast_rslt:
+                section[desired_field] = cast_rslt
+            else:
+                section.pop(desired_field)
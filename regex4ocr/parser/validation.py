@@ -2,11 +2,14 @@
 Module with a miscellania of validation functions used throughout
 the application.
 """
+from regex4ocr.parser.regions import is_valid_region
 
 
 def is_valid_drm(drm):
     """
-    Verifies if a parsed DRM dict has the minimum required fields.
+    Verifies if a parsed DRM dict has the minimum required fields,
+    a numeric priority, valid fields regions and boolean sequential options,
+    if any.
 
     Args:
         drm (dict): the DRM dict to be validated.
@@ -16,4 +19,25 @@ def is_valid_drm(drm):
     """
     required_keys = ("identifiers", "fields")
 
-    return all(key in drm for key in required_keys)
+    if not all(key in drm for key in required_keys):
+        return False
+
+    priority = drm.get("priority", 0)
+
+    if not isinstance(priority, (int, float)) or isinstance(priority, bool):
+        return False
+
+    sequential_keys = ("sequential", "sequential_fallback")
+
+    if not all(
+        isinstance(drm.get(key, False), bool) for key in sequential_keys
+    ):
+        return False
+
+    regions = drm.get("regions", {})
+
+    return (
+        isinstance(regions, dict)
+        and set(regions).issubset(drm["fields"])
+        and all(is_valid_region(region) for region in regions.values())
+    )
@@ -3,6 +3,9 @@ import logging
 
 import yaml
 
+# libyaml based loader is much faster than the pure python one
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 def parse_yml(file_path):
     """ Parses Yml file to python dict. """
@@ -10,7 +13,7 @@ def parse_yml(file_path):
     with open(file_path, "r") as stream:
         try:
 
-            config_dict = yaml.load(stream)
+            config_dict = yaml.load(stream, Loader=YAML_LOADER)
 
             return config_dict
 
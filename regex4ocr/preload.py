@@ -0,0 +1,99 @@
+"""
+Module to preload the DRMs registries in a parent process before it forks
+its workers (gunicorn preload_app, celery prefork, batch parsing), so that
+all the workers share the memory pages of the compiled DRMs instead of
+loading their own copies.
+"""
+import gc
+import logging
+import os
+
+from regex4ocr.parser.registry import get_registry
+
+logger = logging.getLogger(__name__)
+
+# /proc/<pid>/smaps fields of the memory report, in kB
+SMAPS_FIELDS = {
+    "Rss": "rss",
+    "Pss": "pss",
+    "Shared_Clean": "shared_clean",
+    "Shared_Dirty": "shared_dirty",
+    "Private_Clean": "private_clean",
+    "Private_Dirty": "private_dirty",
+}
+
+
+def preload(drms_paths="./drms", freeze=True):
+    """
+    Loads the default cached registries of the DRMs folders in the current
+    process. Forked processes inherit them, so their parse calls do not
+    load the folders again.
+
+    The garbage collector writes to the header of every object it visits,
+    which makes the forked processes copy the memory pages of the DRMs. By
+    default, all the objects that are alive after the preload are moved to
+    the permanent generation with gc.freeze so they are never visited.
+
+    The polling threads of the registries are not inherited by the forked
+    processes, so they must be started by each worker, if needed.
+
+    Args:
+        drms_paths (str): DRMs folder path or list of DRMs folders paths;
+        freeze (bool): freezes all the objects alive after the preload.
+
+    Returns:
+        (list): the cached registries of the folders.
+    """
+    if isinstance(drms_paths, str):
+        drms_paths = [drms_paths]
+
+    registries = [get_registry(drms_path) for drms_path in drms_paths]
+
+    if freeze:
+        # collects the garbage first so it is not frozen too
+        gc.collect()
+        gc.freeze()
+
+        logger.info("Froze %s objects after the preload", gc.get_freeze_count())
+
+    return registries
+
+
+def memory_report(pid=None):
+    """
+    Reports the memory of a process from its /proc smaps, which shows how
+    much of it is shared with the other forked workers. Only available on
+    Linux.
+
+    Args:
+        pid (int): process id, defaults to the current process.
+
+    Returns:
+        (dict): pid and rss, pss, shared, private and their clean and dirty
+                parts in bytes or None if /proc is not available.
+    """
+    pid = pid or os.getpid()
+    report = dict.fromkeys(SMAPS_FIELDS.values(), 0)
+
+    # smaps_rollup has the totals of smaps and is much faster to read
+    for file_name in ("smaps_rollup", "smaps"):
+        try:
+            with open("/proc/%s/%s" % (pid, file_name)) as stream:
+                lines = stream.readlines()
+            break
+        except OSError:
+            continue
+    else:
+        return None
+
+    for line in lines:
+        field, _, value = line.partition(":")
+
+        if field in SMAPS_FIELDS:
+            report[SMAPS_FIELDS[field]] += int(value.split()[0]) * 1024
+
+    report["shared"] = report["shared_clean"] + report["shared_dirty"]
+    report["private"] = report["private_clean"] + report["private_dirty"]
+    report["pid"] = pid
+
+    return report
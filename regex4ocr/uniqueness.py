@@ -0,0 +1,216 @@
+"""
+Module with the store of the parse results keyed by their DRM and their
+uniqueness fields, e.g. the COO and CCF of a tax coupon. Batch reprocessing
+jobs use it to skip the documents that were already parsed, even when their
+OCR strings differ.
+The store is a local SQLite file, so it runs without any external service.
+"""
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+# maximum number of keys of each bulk lookup query, below the SQLite limit
+# of host parameters of the old versions
+MAX_QUERY_KEYS = 900
+
+# stores opened by their process, path and timeout, see get_store
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+class UniquenessStore:
+    """
+    Store of the parse results by their DRM and uniqueness fields, since the
+    uniqueness fields such as the COO are only unique within the documents
+    of the same DRM, e.g. of the same store. The first result
+    stored for a key is kept. The results of the documents whose sections
+    were skipped because of the time limits are not stored.
+
+    The store is sent to the worker processes of parse_many by its path,
+    each worker opens its own connection once, see get_store, so the in
+    memory store is only available in the current process.
+
+    Args:
+        path (str): path of the SQLite database file, ':memory:' keeps the
+                    store in the current process memory;
+        timeout (float): seconds to wait for the database locks.
+    """
+
+    def __init__(self, path=":memory:", timeout=5.0):
+        self.path = path
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, timeout=timeout, check_same_thread=False
+        )
+
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL)"
+            )
+
+    @staticmethod
+    def make_key(drm_name, ocr_data):
+        """
+        Returns the key of the uniqueness fields of a parse result.
+
+        Args:
+            drm_name (str): identity of the DRM that parsed the document,
+                            e.g. the name attribute of the registry DRMs;
+            ocr_data (dict): the parse result of a document.
+
+        Returns:
+            (str): JSON of the DRM name and the uniqueness fields names and
+                   values, or None if the DRM is unknown or the result has
+                   no uniqueness fields.
+        """
+        if drm_name is None or not isinstance(ocr_data, dict):
+            return None
+
+        uniqueness_fields = ocr_data.get("uniqueness_fields")
+
+        if not uniqueness_fields:
+            return None
+
+        return json.dumps(
+            [drm_name, uniqueness_fields], sort_keys=True, default=str
+        )
+
+    def get_many(self, keys):
+        """
+        Looks up the stored results of many keys at once.
+
+        Args:
+            keys (iterable): keys returned by make_key.
+
+        Returns:
+            (dict): the stored results by their keys, the keys that are not
+                    stored are missing.
+        """
+        keys = list(keys)
+        results = {}
+
+        with self._lock:
+            for start in range(0, len(keys), MAX_QUERY_KEYS):
+                batch = keys[start : start + MAX_QUERY_KEYS]
+                rows = self._connection.execute(
+                    "SELECT key, value FROM documents WHERE key IN (%s)"
+                    % ", ".join("?" * len(batch)),
+                    batch,
+                )
+                results.update(rows)
+
+        return {key: pickle.loads(value) for key, value in results.items()}
+
+    def get(self, key):
+        """
+        Returns the stored result of a key.
+
+        Args:
+            key (str): key returned by make_key.
+
+        Returns:
+            the parse result or None if it is not stored.
+        """
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items):
+        """
+        Stores many results at once, in a single transaction.
+
+        Args:
+            items (iterable): (key, result) tuples, the keys returned by
+                              make_key.
+        """
+        rows = []
+
+        for key, result in items:
+            if "skipped_sections" in result:
+                logger.debug("Partial result is not stored: %s", key)
+                continue
+
+            rows.append((key, pickle.dumps(result, pickle.HIGHEST_PROTOCOL)))
+
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO documents VALUES (?, ?)", rows
+            )
+
+    def put(self, key, result):
+        """
+        Stores the result of a key.
+
+        Args:
+            key (str): key returned by make_key;
+            result (dict): the parse result.
+        """
+        self.put_many([(key, result)])
+
+    def clear(self):
+        """
+        Removes all the stored results.
+        """
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM documents")
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        with self._lock:
+            self._connection.close()
+
+    def __contains__(self, key):
+        with self._lock:
+            return (
+                self._connection.execute(
+                    "SELECT 1 FROM documents WHERE key = ?", (key,)
+                ).fetchone()
+                is not None
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM documents"
+            ).fetchone()[0]
+
+    def __reduce__(self):
+        return get_store, (self.path, self.timeout)
+
+    def __repr__(self):
+        return "UniquenessStore(path=%r, size=%s)" % (self.path, len(self))
+
+
+def get_store(path, timeout=5.0):
+    """
+    Returns the store of a SQLite file opened by the current process. The
+    store is opened on the first call for each path, so the chunks sent to
+    a worker process share its connection. The stores are kept by the
+    process id since the connections must not be used by forked processes.
+
+    Args:
+        path (str): path of the SQLite database file;
+        timeout (float): seconds to wait for the database locks.
+
+    Returns:
+        (UniquenessStore): the store of the current process.
+    """
+    key = (os.getpid(), path, timeout)
+
+    with _stores_lock:
+        store = _stores.get(key)
+
+        if store is None:
+            store = UniquenessStore(path, timeout)
+            _stores[key] = store
+
+    return store
@@ -13,6 +13,8 @@ setup(
     description="Extract data from OCR string results based on Document Regexp Models (DRMs).",
     packages=["regex4ocr", "regex4ocr.logger", "regex4ocr.parser"],
     install_requires=["PyYAML==4.2b1", "Unidecode==1.0.23"],
+    extras_require={"numpy": ["numpy"]},
+    entry_points={"console_scripts": ["regex4ocr=regex4ocr.cli:main"]},
     long_description=open("README.md").read(),
     zip_safe=False,
 )
@@ -2,11 +2,18 @@
 Module with unit tests for the data type casting functions
 """
 import copy
+from datetime import datetime
 from unittest import mock
 
 import pytest
 
+from regex4ocr.parser import type_casting
+from regex4ocr.parser.type_casting import cast_columns
+from regex4ocr.parser.type_casting import cast_section
 from regex4ocr.parser.type_casting import cast_type
+from regex4ocr.parser.type_casting import compile_caster
+from regex4ocr.parser.type_casting import compile_column_caster
+from regex4ocr.parser.type_casting import datetime_parser
 from regex4ocr.parser.type_casting import remove_wrong_types
 from regex4ocr.parser.type_casting import validate_types
 from regex4ocr.parser.yml_parser import parse_yml
@@ -193,6 +200,141 @@ def test_cast_type_datetime_no_timestamp():
     assert cast_type("10/08/1991", ["datetime", "%d/%m/%Y %H:%M:%S"]) is None
 
 
+@pytest.mark.parametrize(
+    "datetime_format",
+    ["%d/%m/%Y %H:%M:%S", "%d/%m/%y", "%Y-%m-%d", "%d/%m", "(%d) %% %m.%Y"],
+)
+@pytest.mark.parametrize(
+    "date_string",
+    [
+        "10/08/1991 12:30:45",
+        "1/8/91",
+        "1991-08-10",
+        "29/02",
+        " 1/2",
+        "31/04/1991 1:2:3",
+        "10/08/1991 12:30:60",
+        "(10) % 08.1991",
+        "(10)  %  08.1991",
+        "10/08/1991x",
+        "",
+    ],
+)
+def test_datetime_parser_same_as_strptime(datetime_format, date_string):
+    """
+    Unit: tests that the fast datetime parsers return the same datetimes
+          and reject the same strings of datetime.strptime.
+    """
+    try:
+        expected = datetime.strptime(date_string, datetime_format)
+    except ValueError:
+        with pytest.raises(ValueError):
+            datetime_parser(datetime_format)(date_string)
+    else:
+        assert datetime_parser(datetime_format)(date_string) == expected
+
+
+def test_datetime_parser_other_formats():
+    """
+    Unit: tests that the formats without a fast parser use strptime.
+    """
+    assert datetime_parser("%b %Y")("aug 1991") == datetime(1991, 8, 1)
+    assert datetime_parser("%y %Y")("91 1992") == datetime(1992, 1, 1)
+
+    with pytest.raises(ValueError):
+        datetime_parser("%d %")("10 %")
+
+
+def test_compile_caster_datetime_memo():
+    """
+    Unit: tests that the datetime casters memoize the repeated raw values,
+          including the wrong ones.
+    """
+    caster = compile_caster(["datetime", "%d/%m/%Y"])
+
+    assert caster("10/08/1991") == "1991-08-10T00:00:00"
+    assert caster("10/08/1991") == "1991-08-10T00:00:00"
+    assert caster("99/08/1991") is None
+    assert caster("99/08/1991") is None
+    assert caster.cache_info()[:2] == (2, 2)
+
+
+@pytest.mark.parametrize(
+    "desired_type", ["int", "float", "str", ["datetime", "%d/%m/%Y"]]
+)
+@pytest.mark.parametrize(
+    "values",
+    [
+        ["1", "20", "0", "007"],
+        ["1.5", "2.", ".5", "3"],
+        ["1", "+2", " 3", "1_0", "x", ".", "1.2.3", "\u0663", "1e3"],
+        ["10/08/1991", "99/08/1991"],
+        ["123456789012345678901234567890"] * 3,
+    ],
+)
+def test_compile_column_caster(desired_type, values):
+    """
+    Unit: tests that the column casts are the same of the value casts.
+    """
+    caster = compile_caster(desired_type)
+    expected = [caster(value) for value in values]
+    column_caster = compile_column_caster(desired_type)
+
+    assert column_caster(values) == expected
+    assert column_caster(values * 50) == expected * 50
+
+
+def test_compile_column_caster_numpy(monkeypatch):
+    """
+    Unit: tests that the numpy column casts return the builtin numbers.
+    """
+    pytest.importorskip("numpy")
+    monkeypatch.setattr(type_casting, "NUMPY_MIN_COLUMN", 1)
+    ints = compile_column_caster("int")(["1", "007", "123456789012345678"])
+    floats = compile_column_caster("float")(["1.5", "2.", ".5", "3"])
+
+    assert ints == [1, 7, 123456789012345678]
+    assert floats == [1.5, 2.0, 0.5, 3.0]
+    assert all(type(value) is int for value in ints)
+    assert all(type(value) is float for value in floats)
+
+
+def test_cast_columns():
+    """
+    Unit: tests that the column casts remove the same values of the
+          section casts.
+    """
+    types_section = {"qty": "int", "price": "float", "unit": "str"}
+    rows = [
+        {"qty": "2", "price": "1.5", "unit": "un"},
+        {"qty": "x", "price": "0", "unit": ""},
+        {"qty": "0", "other": "1"},
+    ]
+    expected = copy.deepcopy(rows)
+    casters = tuple(
+        (field, compile_caster(desired_type))
+        for field, desired_type in types_section.items()
+    )
+
+    for section in expected:
+        cast_section(section, casters)
+
+    cast_columns(
+        rows,
+        tuple(
+            (field, compile_column_caster(desired_type))
+            for field, desired_type in types_section.items()
+        ),
+    )
+
+    assert rows == expected
+    assert rows == [
+        {"qty": 2, "price": 1.5, "unit": "un"},
+        {"unit": ""},
+        {"other": "1"},
+    ]
+
+
 def test_cast_type_metadata_unknown():
     """
     Unit: tests cast_type when the desired type is a list with unknown type.
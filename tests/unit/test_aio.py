@@ -0,0 +1,187 @@
+"""
+Module with unit tests for the asyncio parsing API.
+"""
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest import mock
+
+import pytest
+
+from regex4ocr import ResultCache
+from regex4ocr.aio import aload_registry, aparse, aparse_many
+from regex4ocr.parser.registry import get_registry
+from tests.data.aux import open_file
+
+
+@pytest.fixture(scope="module")
+def ocr_results():
+    """ OCR test data of many documents. """
+    OCR_TEST_RESULT_FOLDER = "./tests/data/ocr_results/"
+
+    return [
+        open_file(OCR_TEST_RESULT_FOLDER + "tax_coupon_1.txt"),
+        open_file(OCR_TEST_RESULT_FOLDER + "no_match_1.txt"),
+        open_file(OCR_TEST_RESULT_FOLDER + "sat_coupon_1.txt"),
+    ] * 3
+
+
+@pytest.fixture(scope="module")
+def drms_path():
+    """ DRMs folder of the test data. """
+    return "./tests/data/drms/"
+
+
+def test_aload_registry(drms_path):
+    """
+    Unit: tests that the awaited registry is the cached registry.
+    """
+    registry = asyncio.run(aload_registry(drms_path))
+
+    assert registry is get_registry(drms_path)
+
+
+def test_aparse(ocr_results, drms_path):
+    """
+    Unit: tests that the async parsing is the same as the sync one.
+    """
+    expected_data = get_registry(drms_path).parse(ocr_results[0])
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        data = asyncio.run(aparse(ocr_results[0], drms_path, executor))
+
+    assert data == expected_data
+
+
+def test_aparse_options(ocr_results, drms_path):
+    """
+    Unit: tests that the parse options are passed to the registry.
+    """
+    options = {"deadline": 10.0, "select": ["fields.cnpj"]}
+    expected_data = get_registry(drms_path).parse(ocr_results[0], **options)
+
+    data = asyncio.run(aparse(ocr_results[0], drms_path, **options))
+
+    assert data == expected_data
+    assert set(data) == {"fields"}
+
+
+def test_aparse_timeout(drms_path):
+    """
+    Unit: tests the per call timeout.
+    """
+    registry = get_registry(drms_path)
+
+    with mock.patch.object(
+        registry, "parse", side_effect=lambda *a, **k: time.sleep(0.2)
+    ):
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(aparse("ocr result", drms_path, timeout=0.01))
+
+
+def test_aparse_many(ocr_results, drms_path):
+    """
+    Unit: tests the async batch parsing of sync and async iterables.
+    """
+    registry = get_registry(drms_path)
+    expected_data = [registry.parse(ocr_result) for ocr_result in ocr_results]
+
+    async def async_ocr_results():
+        for ocr_result in ocr_results:
+            yield ocr_result
+
+    async def collect(inputs):
+        return [
+            result
+            async for result in aparse_many(inputs, drms_path, concurrency=2)
+        ]
+
+    for inputs in (ocr_results, async_ocr_results()):
+        results = asyncio.run(collect(inputs))
+        results.sort(key=lambda result: result.index)
+
+        assert [result.index for result in results] == list(range(9))
+        assert [result.data for result in results] == expected_data
+        assert all(result.error is None for result in results)
+
+
+def test_aparse_many_errors(drms_path):
+    """
+    Unit: tests that errors and timeouts are returned for each document.
+    """
+    registry = get_registry(drms_path)
+
+    def parse(ocr_result, selection, **options):
+        if ocr_result == "slow":
+            time.sleep(0.2)
+
+        if ocr_result == "broken":
+            raise BaseException("Unknown specified type at the DRM")
+
+        return {"fields": {}}
+
+    async def collect():
+        return [
+            result
+            async for result in aparse_many(
+                ["ok", "slow", "broken"], drms_path, timeout=0.05
+            )
+        ]
+
+    with mock.patch.object(registry, "parse", side_effect=parse):
+        results = sorted(asyncio.run(collect()))
+
+    assert results[0].data == {"fields": {}}
+    assert results[1].error.startswith("TimeoutError")
+    assert results[2].error == (
+        "BaseException: Unknown specified type at the DRM"
+    )
+
+
+def test_aparse_many_backpressure(drms_path):
+    """
+    Unit: tests that a slow consumer of the results stops the parsing.
+    """
+    registry = get_registry(drms_path)
+
+    async def consume_slowly():
+        async for _ in aparse_many(
+            ["ocr result"] * 20, drms_path, concurrency=2
+        ):
+            await asyncio.sleep(0.2)
+            return
+
+    with mock.patch.object(
+        registry, "parse", return_value={"fields": {}}
+    ) as mocked_parse:
+        asyncio.run(consume_slowly())
+
+    # the yielded result, the queued ones and the ones waiting to be queued
+    assert mocked_parse.call_count <= 5
+
+
+def test_aparse_invalid_options(drms_path):
+    """
+    Unit: tests that the results cache is refused with process executors
+          and that the concurrency must be positive.
+    """
+
+    cache = ResultCache()
+
+    async def collect(**options):
+        return [
+            result
+            async for result in aparse_many(
+                ["ocr result"], drms_path, **options
+            )
+        ]
+
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        with pytest.raises(ValueError):
+            asyncio.run(aparse("ocr result", drms_path, executor, cache=cache))
+
+        with pytest.raises(ValueError):
+            asyncio.run(collect(executor=executor, cache=cache))
+
+    with pytest.raises(ValueError):
+        asyncio.run(collect(concurrency=0))
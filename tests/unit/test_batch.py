@@ -0,0 +1,83 @@
+"""
+Module with unit tests for the batch parsing functions.
+"""
+from unittest import mock
+
+import pytest
+
+from regex4ocr.batch import BatchResult, parse_chunk, parse_many
+from regex4ocr.parser.registry import get_registry
+from tests.data.aux import open_file
+
+
+@pytest.fixture(scope="module")
+def ocr_results():
+    """ OCR test data of many documents. """
+    OCR_TEST_RESULT_FOLDER = "./tests/data/ocr_results/"
+
+    return [
+        open_file(OCR_TEST_RESULT_FOLDER + "tax_coupon_1.txt"),
+        open_file(OCR_TEST_RESULT_FOLDER + "no_match_1.txt"),
+        open_file(OCR_TEST_RESULT_FOLDER + "sat_coupon_1.txt"),
+    ] * 5
+
+
+@pytest.fixture(scope="module")
+def drms_path():
+    """ DRMs folder of the test data. """
+    return "./tests/data/drms/"
+
+
+def test_parse_chunk_returns_errors(drms_path):
+    """
+    Unit: tests that the errors of a document do not stop the chunk.
+    """
+    registry = get_registry(drms_path)
+
+    with mock.patch.object(
+        registry, "parse", side_effect=[{"fields": {}}, KeyError("test")]
+    ):
+        assert parse_chunk([(7, "doc 1"), (8, "doc 2")], drms_path) == [
+            BatchResult(7, {"fields": {}}, None),
+            BatchResult(8, None, "KeyError: 'test'"),
+        ]
+
+
+def test_parse_many_single_worker(ocr_results, drms_path):
+    """
+    Unit: tests that a single worker parses the documents in order in the
+          current process.
+    """
+    registry = get_registry(drms_path)
+    results = list(
+        parse_many(iter(ocr_results), drms_path, workers=1, chunksize=4)
+    )
+
+    assert [result.index for result in results] == list(range(15))
+    assert [result.data for result in results] == [
+        registry.parse(ocr_result) for ocr_result in ocr_results
+    ]
+    assert all(result.error is None for result in results)
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_parse_many_process_pool(ocr_results, drms_path, ordered):
+    """
+    Unit: tests that the worker processes results are the same of the single
+          document parsing.
+    """
+    registry = get_registry(drms_path)
+    results = list(
+        parse_many(
+            ocr_results, drms_path, workers=2, chunksize=2, ordered=ordered
+        )
+    )
+
+    if ordered:
+        assert [result.index for result in results] == list(range(15))
+
+    results.sort(key=lambda result: result.index)
+
+    assert [result.data for result in results] == [
+        registry.parse(ocr_result) for ocr_result in ocr_results
+    ]
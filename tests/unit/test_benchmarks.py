@@ -0,0 +1,40 @@
+"""
+Module with smoke tests for the benchmark suite.
+"""
+from benchmarks.run import parse_args, percentile, run_scenario
+
+
+def test_percentile():
+    """
+    Unit: tests the nearest rank percentiles.
+    """
+    values = list(range(1, 101))
+
+    assert percentile(values, 0.50) == 50
+    assert percentile(values, 0.99) == 99
+    assert percentile([3], 0.95) == 3
+    assert percentile([1, 2, 3, 4, 5], 0.50) == 3
+    assert percentile([1, 2, 3, 4, 5], 0.95) == 5
+    assert percentile(values, 0.07) == 7
+    assert percentile([], 0.5) is None
+
+
+def test_run_scenario_parses_the_synthetic_corpus(tmp_path):
+    """
+    Unit: tests that every synthetic receipt is matched and extracted by its
+          synthetic DRM, so the benchmark measures the full parsing path.
+    """
+    args = parse_args(["--docs", "5"])
+
+    result = run_scenario(
+        drm_count=3,
+        rows=4,
+        docs=args.docs,
+        noise=args.noise,
+        accents=True,
+        work_dir=str(tmp_path),
+    )
+
+    assert result["valid_drms"] == 3
+    assert result["matched_docs"] == 5
+    assert result["stages"]["parse"]["count"] == 5
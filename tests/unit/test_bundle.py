@@ -0,0 +1,155 @@
+"""
+Module with unit tests for the compiled DRMs bundle.
+"""
+import shutil
+from unittest import mock
+
+import pytest
+
+from regex4ocr.cli import main
+from regex4ocr.parser.bundle import (
+    BUNDLE_FORMAT,
+    compile_drms,
+    default_bundle_path,
+    read_bundle,
+)
+from regex4ocr.parser.drm_scanner import load_drm, scan_drms_folder
+from regex4ocr.parser.registry import DrmRegistry
+from tests.data.aux import open_file
+from tests.unit.test_registry import write_drm
+
+
+@pytest.fixture(scope="module")
+def ocr_result_tax_coupon_1():
+    """ OCR test data for tax coupon 1."""
+    OCR_TEST_RESULT_FOLDER = "./tests/data/ocr_results/"
+
+    ocr_result = open_file(OCR_TEST_RESULT_FOLDER + "tax_coupon_1.txt")
+
+    return ocr_result
+
+
+@pytest.fixture
+def drms_path(tmp_path):
+    """ Copy of the DRMs test folder."""
+    path = tmp_path / "drms"
+    shutil.copytree("./tests/data/drms/", str(path))
+
+    return str(path)
+
+
+def test_compile_drms_reports_invalid_files(drms_path):
+    """
+    Unit: tests that the bundle has all the files and reports the invalid
+          ones.
+    """
+    bundle, invalid = compile_drms(drms_path)
+
+    assert read_bundle(default_bundle_path(drms_path)) == bundle
+    assert bundle["format"] == BUNDLE_FORMAT
+    assert set(invalid) == {"__init__.py", "drm_yml_parser_broken.yml"}
+    assert bundle["files"]["drm_tax_coupon_1.yml"]["drm"] == load_drm(
+        drms_path + "/drm_tax_coupon_1.yml"
+    )
+
+    # the bundle itself is not a DRM file
+    assert len(scan_drms_folder(drms_path)) == len(bundle["files"]) - 2
+
+
+def test_registry_prefers_fresh_bundle(drms_path, ocr_result_tax_coupon_1):
+    """
+    Unit: tests that the registry loads the DRMs from a fresh bundle
+          without parsing the yml files.
+    """
+    expected = DrmRegistry(drms_path)
+    compile_drms(drms_path)
+
+    with mock.patch("regex4ocr.parser.registry.load_drm") as mocked_load_drm:
+        registry = DrmRegistry(drms_path)
+        mocked_load_drm.assert_not_called()
+
+    assert registry.version == expected.version
+    assert registry.parse(ocr_result_tax_coupon_1) == expected.parse(
+        ocr_result_tax_coupon_1
+    )
+
+    # no changes since the bundle
+    assert not registry.refresh()
+
+
+def test_registry_falls_back_to_yml_for_stale_files(tmp_path):
+    """
+    Unit: tests that the files changed after the bundle was written are
+          parsed from their yml files.
+    """
+    write_drm(tmp_path, "drm_a.yml", "store a")
+    write_drm(tmp_path, "drm_b.yml", "store b")
+    compile_drms(str(tmp_path))
+    write_drm(tmp_path, "drm_b.yml", "store c")
+
+    with mock.patch(
+        "regex4ocr.parser.registry.load_drm", wraps=load_drm
+    ) as mocked_load_drm:
+        registry = DrmRegistry(str(tmp_path))
+        mocked_load_drm.assert_called_once_with(str(tmp_path / "drm_b.yml"))
+
+    assert registry.parse("store a code: 1")["fields"] == {"code": "1"}
+    assert registry.parse("store b code: 1") == {}
+    assert registry.parse("store c code: 1")["fields"] == {"code": "1"}
+
+
+def test_compile_drms_leaves_out_dates(tmp_path):
+    """
+    Unit: tests that the DRMs with yml dates are left out of the bundle and
+          loaded from their yml files.
+    """
+    write_drm(tmp_path, "drm_a.yml", "store a")
+    (tmp_path / "drm_b.yml").write_text(
+        "identifiers:\n"
+        "  - store b\n"
+        "fields:\n"
+        "  code: 'code:\\s*(\\d+)'\n"
+        "created: 2020-01-01\n"
+    )
+
+    bundle, invalid = compile_drms(str(tmp_path))
+
+    assert invalid == {}
+    assert set(bundle["files"]) == {"drm_a.yml"}
+    assert read_bundle(default_bundle_path(str(tmp_path))) == bundle
+
+    registry = DrmRegistry(str(tmp_path))
+
+    assert registry.parse("store b code: 2")["fields"] == {"code": "2"}
+    assert registry.version == bundle["version"]
+
+
+def test_read_bundle_ignores_broken_files(tmp_path):
+    """
+    Unit: tests that missing, broken and other format bundles are ignored.
+    """
+    bundle_file = tmp_path / "bundle.json"
+
+    assert read_bundle(str(bundle_file)) is None
+
+    bundle_file.write_text("{broken")
+    assert read_bundle(str(bundle_file)) is None
+
+    bundle_file.write_text('{"format": 0, "files": {}}')
+    assert read_bundle(str(bundle_file)) is None
+
+
+def test_cli_compile_drms(drms_path, tmp_path, capsys):
+    """
+    Unit: tests the compile-drms command.
+    """
+    output = str(tmp_path / "out.json")
+
+    assert (
+        main(["compile-drms", drms_path, "--strict", "--output", output]) == 1
+    )
+    assert read_bundle(output) is None
+    assert "drm_yml_parser_broken.yml" in capsys.readouterr().err
+
+    assert main(["compile-drms", drms_path, "--output", output]) == 0
+    assert read_bundle(output)["files"]
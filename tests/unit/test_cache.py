@@ -0,0 +1,252 @@
+"""
+Module with unit tests for the results cache.
+"""
+from unittest import mock
+
+import pytest
+
+from regex4ocr import DuplicateIndex
+from regex4ocr import cache as cache_module
+from regex4ocr import parse
+from regex4ocr.cache import MemoryBackend, ResultCache, SqliteBackend
+from regex4ocr.parser.parser import FIRST_MATCH, parse_ocr_result
+from regex4ocr.parser.registry import DrmRegistry
+from tests.data.aux import open_file
+from tests.unit.test_registry import write_drm
+
+DRMS_PATH = "./tests/data/drms/"
+
+
+@pytest.fixture
+def tax_coupon():
+    """ OCR result of a tax coupon. """
+    return open_file("./tests/data/ocr_results/tax_coupon_1.txt")
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend_factory(request, tmp_path):
+    """ Factory of each cache backend type. """
+
+    def factory(**kwargs):
+        if request.param == "memory":
+            return MemoryBackend(**kwargs)
+
+        return SqliteBackend(str(tmp_path / "cache.sqlite3"), **kwargs)
+
+    return factory
+
+
+def test_backend_lru_eviction(backend_factory, monkeypatch):
+    """
+    Unit: tests that the least recently used results are evicted.
+    """
+    now = [0.0]
+    monkeypatch.setattr(cache_module, "clock", lambda: now[0])
+    backend = backend_factory(max_size=2)
+
+    for key in ("a", "b"):
+        now[0] += 1
+        backend.set(key, key.encode())
+
+    now[0] += 1
+    assert backend.get("a") == b"a"
+
+    now[0] += 1
+    backend.set("c", b"c")
+
+    assert len(backend) == 2
+    assert backend.get("b") is None
+    assert backend.get("a") == b"a"
+    assert backend.get("c") == b"c"
+
+    backend.clear()
+
+    assert len(backend) == 0
+
+
+def test_backend_ttl_eviction(backend_factory, monkeypatch):
+    """
+    Unit: tests that the expired results are evicted.
+    """
+    now = [100.0]
+    monkeypatch.setattr(cache_module, "clock", lambda: now[0])
+    backend = backend_factory(ttl=10)
+    backend.set("a", b"a")
+
+    now[0] += 9
+    assert backend.get("a") == b"a"
+
+    now[0] += 1
+    assert backend.get("a") is None
+
+
+def test_backend_invalid_size(backend_factory):
+    """
+    Unit: tests that the backends must have a positive size.
+    """
+    with pytest.raises(ValueError):
+        backend_factory(max_size=0)
+
+
+def test_sqlite_backend_batch_eviction(tmp_path, monkeypatch):
+    """
+    Unit: tests that the SQLite backend evicts the least recently used
+          results in batches, once they exceed its max size by a tenth.
+    """
+    now = [0.0]
+    monkeypatch.setattr(cache_module, "clock", lambda: now[0])
+    backend = SqliteBackend(str(tmp_path / "cache.sqlite3"), max_size=100)
+
+    for number in range(110):
+        now[0] += 1
+        backend.set(str(number), b"value")
+
+    assert len(backend) == 110
+
+    backend.set("110", b"value")
+
+    assert len(backend) == 100
+    assert backend.get("10") is None
+    assert backend.get("11") == b"value"
+
+    # a new connection starts from the count of the stored results
+    other = SqliteBackend(backend.path, max_size=100)
+
+    for number in range(111, 121):
+        now[0] += 1
+        other.set(str(number), b"value")
+
+    assert len(other) == 110
+
+    other.set("121", b"value")
+
+    assert len(other) == 100
+
+
+def test_sqlite_backend_shared(tmp_path):
+    """
+    Unit: tests that the SQLite backend is shared by its connections.
+    """
+    path = str(tmp_path / "cache.sqlite3")
+    SqliteBackend(path).set("a", b"a")
+
+    assert SqliteBackend(path).get("a") == b"a"
+
+
+def test_make_key():
+    """
+    Unit: tests that the keys depend on the OCR string, the registry version
+          and the options.
+    """
+    key = ResultCache.make_key("ocr", "v1", "first_match")
+
+    assert key == ResultCache.make_key("ocr", "v1", "first_match")
+    assert len(key) == 32
+    assert key != ResultCache.make_key("ocr", "v2", "first_match")
+    assert key != ResultCache.make_key("ocr", "v1", "all_matches")
+    assert key != ResultCache.make_key("ocr ", "v1", "first_match")
+
+
+def test_parse_with_cache(backend_factory, tax_coupon):
+    """
+    Unit: tests the cached results of the parse function and the hits and
+          misses counters.
+    """
+    cache = ResultCache(backend_factory())
+    expected = parse(tax_coupon, DRMS_PATH)
+
+    assert parse(tax_coupon, DRMS_PATH, cache=cache) == expected
+    assert parse(tax_coupon, DRMS_PATH, cache=cache) == expected
+    assert (cache.hits, cache.misses, len(cache)) == (1, 1, 1)
+
+    # the cached results are copies
+    parse(tax_coupon, DRMS_PATH, cache=cache)["fields"]["cnpj"] = "changed"
+
+    assert parse(tax_coupon, DRMS_PATH, cache=cache) == expected
+
+    parse(tax_coupon, DRMS_PATH, cache=cache, select=["table"])
+    parse(tax_coupon, DRMS_PATH, cache=cache, selection="all_matches")
+
+    assert (cache.misses, len(cache)) == (3, 3)
+
+    cache.clear()
+
+    assert (cache.hits, cache.misses, len(cache)) == (0, 0, 0)
+
+
+def test_cache_registry_version(tmp_path):
+    """
+    Unit: tests that the results are parsed again after the DRMs change.
+    """
+    write_drm(tmp_path, "drm.yml", "store")
+    registry = DrmRegistry(str(tmp_path))
+    cache = ResultCache()
+
+    assert registry.parse("store code: 1", cache=cache)["fields"] == {
+        "code": "1"
+    }
+
+    write_drm(tmp_path, "drm.yml", "shop, changed")
+    registry.refresh()
+
+    assert registry.parse("store code: 1", cache=cache) == {}
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_cache_refresh_during_parse(tmp_path):
+    """
+    Unit: tests that a result is cached with the version of the DRMs that
+          parsed it when the registry is refreshed during the parsing.
+    """
+    registry = DrmRegistry(str(tmp_path))
+    cache = ResultCache()
+    version = registry.version
+
+    def refresh_and_parse(ocr_result, drms, **options):
+        write_drm(tmp_path, "drm.yml", "store")
+        registry.refresh()
+
+        return parse_ocr_result(ocr_result, drms, **options)
+
+    with mock.patch(
+        "regex4ocr.parser.registry.parse_ocr_result",
+        side_effect=refresh_and_parse,
+    ):
+        assert registry.parse("store code: 1", cache=cache) == {}
+
+    assert registry.version != version
+    key = cache.make_key("store code: 1", version, FIRST_MATCH, False, None)
+
+    assert cache.get(key) == {}
+    assert registry.parse("store code: 1", cache=cache)["fields"] == {
+        "code": "1"
+    }
+
+
+def test_cache_duplicate_flags(tax_coupon):
+    """
+    Unit: tests that the results are cached along with their duplicate
+          flags, as they are returned.
+    """
+    cache = ResultCache()
+    duplicates = DuplicateIndex()
+    rescan = tax_coupon.replace("pedra", "pedro")
+    parse(tax_coupon, DRMS_PATH, cache=cache, duplicates=duplicates)
+
+    result = parse(rescan, DRMS_PATH, cache=cache, duplicates=duplicates)
+
+    assert "duplicate" in result
+    assert parse(rescan, DRMS_PATH, cache=cache) == result
+    assert cache.hits == 1
+
+
+def test_partial_results_not_cached(tax_coupon):
+    """
+    Unit: tests that the results with skipped sections are not cached.
+    """
+    cache = ResultCache()
+    cache.set("key", {"fields": {}, "skipped_sections": ["table"]})
+    cache.set("list", [{"fields": {}, "skipped_sections": ["table"]}])
+
+    assert len(cache) == 0
+    assert cache.get("key") is None
@@ -0,0 +1,44 @@
+"""
+Module with unit tests for the DRM regexps compiler.
+"""
+import re
+
+from regex4ocr.parser.compiler import compile_drm, compile_regexp
+from regex4ocr.parser.yml_parser import parse_yml
+
+
+def test_compile_regexp():
+    """
+    Unit: tests that strings are compiled and patterns are kept as they are.
+    """
+    pattern = compile_regexp("cupom fiscal", re.IGNORECASE)
+
+    assert pattern.pattern == "cupom fiscal"
+    assert pattern.flags & re.IGNORECASE
+    assert compile_regexp(pattern, re.IGNORECASE) is pattern
+
+
+def test_compile_drm():
+    """
+    Unit: tests that all the DRM regexps get compiled without changing the
+          original DRM dict.
+    """
+    DRM_TEST_YML_FOLDER = "./tests/data/drms/"
+
+    drm = parse_yml(DRM_TEST_YML_FOLDER + "drm_inline_named_groups_1.yml")
+    compiled_drm = compile_drm(drm)
+
+    assert [p.pattern for p in compiled_drm["identifiers"]] == ["cupom fiscal"]
+    assert compiled_drm["identifiers"][0].flags & re.IGNORECASE
+    assert {k: p.pattern for k, p in compiled_drm["fields"].items()} == (
+        drm["fields"]
+    )
+    assert len(compiled_drm["options"]["replace"]) == 3  # fused literals
+    assert compiled_drm["options"]["lowercase"]
+    assert compiled_drm["table"]["header"].pattern == drm["table"]["header"]
+    assert compiled_drm["types"] == drm["types"]
+
+    # the original DRM still holds the regexps strings
+    assert isinstance(drm["fields"]["cnpj"], str)
+    assert isinstance(drm["options"]["replace"][0][0], str)
+    assert isinstance(drm["table"]["footer"], str)
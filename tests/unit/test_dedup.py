@@ -0,0 +1,242 @@
+"""
+Module with unit tests for the near duplicate documents index.
+"""
+from unittest import mock
+
+import pytest
+
+from regex4ocr import DuplicateIndex, parse
+from regex4ocr.dedup import EMPTY_BIN
+from regex4ocr.parser.pre_process import pre_process_result
+from tests.data.aux import open_file
+
+DRMS_PATH = "./tests/data/drms/"
+
+DRM = (
+    "identifiers:\n"
+    "  - mercado\n"
+    "fields:\n"
+    "  coo: 'coo:\\s*(\\d+)'\n"
+    "  total: 'total:\\s*(\\d+)'\n"
+    "uniqueness_fields: ['coo']\n"
+)
+
+RECEIPT = (
+    "mercado central ltda\nrua das flores 100 centro\ncnpj: 12.345.678/0001\n"
+    "coo: 1001\ncupom fiscal\n1 arroz tipo um 5kg 2un x 20,00\n"
+    "2 feijao carioca 1kg 3un x 8,00\n3 oleo de soja 900ml 1un x 7,00\n"
+    "4 acucar refinado 1kg 2un x 4,00\n5 cafe torrado moido 500g 1un\n"
+    "total: 10\nobrigado volte sempre"
+)
+
+# rescan of the receipt with an OCR error in its total
+RESCAN = RECEIPT.replace("total: 10", "total: 19")
+
+
+@pytest.fixture
+def drms_path(tmp_path):
+    """ DRMs folder with a DRM of the uniqueness field coo. """
+    (tmp_path / "drm.yml").write_text(DRM)
+
+    return str(tmp_path)
+
+
+@pytest.fixture
+def tax_coupon():
+    """ OCR result of a tax coupon. """
+    return open_file("./tests/data/ocr_results/tax_coupon_1.txt")
+
+
+@pytest.fixture
+def rescan(tax_coupon):
+    """ Rescan of the tax coupon with an OCR error out of its fields. """
+    return tax_coupon.replace("pedra", "pedro")
+
+
+def test_fingerprint():
+    """
+    Unit: tests that the fingerprints only depend on the set of case folded
+          words of the OCR strings.
+    """
+    index = DuplicateIndex(bands=4, rows=2)
+    fingerprint = index.fingerprint("Cupom fiscal: 123")
+
+    assert len(fingerprint) == 8
+    assert fingerprint == index.fingerprint("123, cupom  FISCAL\n123")
+    assert index.fingerprint("") == (EMPTY_BIN,) * 8
+
+
+def test_similarity(tax_coupon, rescan):
+    """
+    Unit: tests the similarity of rescans and different documents.
+    """
+    index = DuplicateIndex()
+    fingerprint = index.fingerprint(tax_coupon)
+    other = "cupom fiscal sat\ncnpj: 98.765.432/0001-10\ntotal r$ 10,00"
+
+    assert index.similarity(fingerprint, fingerprint) == 1.0
+    assert index.similarity(fingerprint, index.fingerprint(rescan)) >= 0.8
+    assert index.similarity(fingerprint, index.fingerprint(other)) < 0.5
+    assert index.similarity((EMPTY_BIN,) * 2, (EMPTY_BIN,) * 2) == 0.0
+
+
+def test_find(tax_coupon, rescan):
+    """
+    Unit: tests that only the documents of the same context are found.
+    """
+    index = DuplicateIndex()
+    index.add(index.fingerprint(tax_coupon), {"fields": {}}, "v1")
+
+    similarity, result = index.find(index.fingerprint(rescan), "v1")
+
+    assert similarity >= 0.8
+    assert result == {"fields": {}}
+    assert index.find(index.fingerprint(rescan), "v2") is None
+    assert index.find(index.fingerprint("other document"), "v1") is None
+    assert (index.lookups, index.duplicates) == (3, 1)
+
+
+def test_lru_eviction():
+    """
+    Unit: tests that the least recently used documents are evicted.
+    """
+    index = DuplicateIndex(max_size=2)
+    documents = ["first document", "second document", "third document"]
+
+    for number, document in enumerate(documents[:2]):
+        index.add(index.fingerprint(document), {"number": number})
+
+    assert index.find(index.fingerprint(documents[0])) == (1.0, {"number": 0})
+
+    index.add(index.fingerprint(documents[2]), {"number": 2})
+
+    assert len(index) == 2
+    assert index.find(index.fingerprint(documents[1])) is None
+    assert index.find(index.fingerprint(documents[0])) == (1.0, {"number": 0})
+
+    index.clear()
+
+    assert (index.lookups, index.duplicates, len(index)) == (0, 0, 0)
+
+
+def test_invalid_index():
+    """
+    Unit: tests the validation of the index options.
+    """
+    with pytest.raises(ValueError):
+        DuplicateIndex(threshold=0)
+
+    with pytest.raises(ValueError):
+        DuplicateIndex(max_size=0)
+
+
+def test_partial_results_not_indexed():
+    """
+    Unit: tests that the results with skipped sections are not indexed.
+    """
+    index = DuplicateIndex()
+    index.add(index.fingerprint("a"), {"skipped_sections": ["table"]})
+    index.add(index.fingerprint("b"), [{"skipped_sections": ["table"]}])
+
+    assert len(index) == 0
+
+
+def test_parse_reuses_duplicates(drms_path):
+    """
+    Unit: tests that the rescans reuse the result of the parsed document.
+    """
+    duplicates = DuplicateIndex(reuse=True)
+    expected = parse(RECEIPT, drms_path, duplicates=duplicates)
+
+    assert "duplicate" not in expected
+
+    result = parse(RESCAN, drms_path, duplicates=duplicates)
+    similarity = result.pop("duplicate")["similarity"]
+
+    assert result == expected
+    assert result["fields"]["total"] == "10"
+    assert similarity >= 0.8
+    assert len(duplicates) == 1
+
+    # the results of another selection are not reused
+    results = parse(
+        RESCAN, drms_path, selection="all_matches", duplicates=duplicates
+    )
+
+    assert all("duplicate" not in data for data in results)
+    assert len(duplicates) == 2
+
+
+@pytest.mark.parametrize("reuse", [True, False])
+def test_parse_other_uniqueness_fields(drms_path, reuse):
+    """
+    Unit: tests that a similar document with other uniqueness fields, e.g.
+          another receipt of the same store and items, is parsed and not
+          flagged as a duplicate.
+    """
+    duplicates = DuplicateIndex(reuse=reuse)
+    parse(RECEIPT, drms_path, duplicates=duplicates)
+    other = RECEIPT.replace("coo: 1001", "coo: 1002")
+    index = DuplicateIndex()
+
+    assert index.similarity(
+        index.fingerprint(RECEIPT), index.fingerprint(other)
+    ) >= 0.8
+    assert parse(other, drms_path, duplicates=duplicates) == parse(
+        other, drms_path
+    )
+    assert len(duplicates) == 2
+
+
+@pytest.mark.parametrize("deadline", [None, 10.0])
+def test_parse_reuse_pre_processes_once(drms_path, deadline):
+    """
+    Unit: tests that a similar document with other uniqueness fields is
+          identified and pre processed once, for the check of its
+          uniqueness fields and for its extraction.
+    """
+    duplicates = DuplicateIndex(reuse=True)
+    parse(RECEIPT, drms_path, duplicates=duplicates)
+    other = RECEIPT.replace("coo: 1001", "coo: 1002")
+
+    with mock.patch(
+        "regex4ocr.parser.parser.pre_process_result",
+        wraps=pre_process_result,
+    ) as pre_process:
+        result = parse(
+            other, drms_path, deadline=deadline, duplicates=duplicates
+        )
+
+    assert pre_process.call_count == 1
+    assert result == parse(other, drms_path, deadline=deadline)
+    assert result["fields"]["coo"] == "1002"
+
+
+def test_parse_flags_duplicates(drms_path):
+    """
+    Unit: tests that the rescans are parsed again and only flagged by
+          default, without reusing the results.
+    """
+    duplicates = DuplicateIndex()
+    parse(RECEIPT, drms_path, duplicates=duplicates)
+
+    result = parse(RESCAN, drms_path, duplicates=duplicates)
+
+    assert result.pop("duplicate")["similarity"] >= 0.8
+    assert result == parse(RESCAN, drms_path)
+    assert result["fields"]["total"] == "19"
+    assert len(duplicates) == 1
+
+
+def test_parse_without_uniqueness_fields(tax_coupon, rescan):
+    """
+    Unit: tests that the results without uniqueness fields are not reused,
+          but their duplicates are flagged.
+    """
+    duplicates = DuplicateIndex(reuse=True)
+    parse(tax_coupon, DRMS_PATH, duplicates=duplicates)
+
+    result = parse(rescan, DRMS_PATH, duplicates=duplicates)
+
+    assert result.pop("duplicate")["similarity"] >= 0.8
+    assert result == parse(rescan, DRMS_PATH)
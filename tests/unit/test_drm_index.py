@@ -0,0 +1,101 @@
+"""
+Module with unit tests for the DRM identification index.
+"""
+import random
+
+import pytest
+
+from regex4ocr.parser import drm_index
+from regex4ocr.parser.compiler import compile_drm
+from regex4ocr.parser.drm_index import AhoCorasick, DrmIndex
+from regex4ocr.parser.drm_scanner import get_all_drms_match
+
+
+def test_aho_corasick_find_all():
+    """
+    Unit: tests that all the words are found with one scan, including
+          overlapping ones.
+    """
+    automaton = AhoCorasick(["he", "she", "his", "hers", "xyz"])
+
+    assert automaton.find_all("ushers") == {0, 1, 3}
+    assert automaton.find_all("this") == {2}
+    assert automaton.find_all("nothing here") == {0}
+    assert AhoCorasick([]).find_all("text") == set()
+
+
+@pytest.mark.parametrize("scan_literals_limit", [0, 64])
+def test_drm_index_candidates(monkeypatch, scan_literals_limit):
+    """
+    Unit: tests the candidate DRMs of an OCR string keep the DRMs order,
+          with and without the Aho-Corasick automaton.
+    """
+    monkeypatch.setattr(
+        drm_index, "SCAN_LITERALS_LIMIT", scan_literals_limit
+    )
+
+    drm_sat = {"identifiers": ["cupom fiscal", r"s\s*a\s*t"], "fields": {}}
+    drm_nfce = {"identifiers": [r"nfc-?e", "consumidor"], "fields": {}}
+    drm_tax = {"identifiers": ["CUPOM FISCAL"], "fields": {}}
+    drm_any = {"identifiers": [r"\d+"], "fields": {}}
+
+    index = DrmIndex([drm_sat, drm_nfce, drm_tax, drm_any])
+
+    assert len(index) == 4
+    assert list(index) == [drm_sat, drm_nfce, drm_tax, drm_any]
+    assert index.candidates("Cupom Fiscal 123") == [drm_sat, drm_tax, drm_any]
+    assert index.candidates("nfc consumidor") == [drm_nfce, drm_any]
+    assert index.candidates("") == [drm_any]
+
+
+@pytest.mark.parametrize("scan_literals_limit", [0, 64])
+def test_drm_index_same_matches_as_linear_scan(
+    monkeypatch, scan_literals_limit
+):
+    """
+    Unit: tests that the index identification results are identical to the
+          linear scan of all the DRMs, and that the literal identifiers of
+          the compiled DRMs match the same as their regexps.
+    """
+    monkeypatch.setattr(
+        drm_index, "SCAN_LITERALS_LIMIT", scan_literals_limit
+    )
+    rand = random.Random(42)
+    words = ["cupom", "fiscal", "sat", "nota", "extrato", "ſat", "KG", "ção"]
+    regexps = [
+        "{} {}",
+        r"{}\s*{}",
+        "({})+{}",
+        "(?:{})?{}",
+        "{}|{}",
+        "[{}]{}",
+        "^{}.*{}$",
+        "^{} {}",
+        "{}{}$",
+    ]
+
+    dict_drms, drms = [], []
+
+    for _ in range(200):
+        identifiers = [
+            rand.choice(regexps).format(rand.choice(words), rand.choice(words))
+            for _ in range(rand.randint(1, 2))
+        ]
+        dict_drms.append({"identifiers": identifiers, "fields": {}})
+        drms.append(compile_drm(dict_drms[-1]))
+
+    index = DrmIndex(drms)
+
+    for _ in range(200):
+        ocr_result = " ".join(
+            rand.choice(words + ["\n", "Cupom", "SAT", "x"])
+            for _ in range(rand.randint(0, 6))
+        )
+
+        matches = get_all_drms_match(ocr_result, drms)
+
+        assert get_all_drms_match(ocr_result, index) == matches
+        assert [drms.index(drm) for drm in matches] == [
+            dict_drms.index(drm)
+            for drm in get_all_drms_match(ocr_result, dict_drms)
+        ]
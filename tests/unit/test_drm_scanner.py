@@ -7,8 +7,10 @@ import pytest
 
 from regex4ocr.parser.drm_scanner import (
     get_all_drms_match,
+    get_first_drm_match,
     has_drm_match,
     scan_drms_folder,
+    sort_drms_by_priority,
 )
 from regex4ocr.parser.yml_parser import parse_yml
 from tests.data.aux import open_file
@@ -152,3 +154,51 @@ def test_scan_drms_folder(
     expected_drms = [expected_drm_1, expected_drm_2]
 
     assert all_drms == expected_drms
+
+
+def test_get_first_drm_match(
+    ocr_result_sat_coupon_1,
+    drm_model_tax_coupon_1,
+    drm_model_sat_coupon_1,
+    drm_model_no_match_1,
+):
+    """
+    Unit: tests that the first matching DRM is returned and the following
+          DRMs identifiers are not evaluated.
+    """
+    drms = [
+        drm_model_no_match_1,
+        drm_model_sat_coupon_1,
+        drm_model_tax_coupon_1,
+    ]
+
+    with mock.patch(
+        "regex4ocr.parser.drm_scanner.has_drm_match", wraps=has_drm_match
+    ) as mocked_has_drm_match:
+        assert (
+            get_first_drm_match(ocr_result_sat_coupon_1, drms)
+            == drm_model_sat_coupon_1
+        )
+        assert mocked_has_drm_match.call_count == 2
+
+    assert get_first_drm_match(ocr_result_sat_coupon_1, drms[:1]) is None
+
+
+def test_sort_drms_by_priority():
+    """
+    Unit: tests that higher priorities come first and DRMs without priority
+          keep their order.
+    """
+    drm_1 = {"id": 1}
+    drm_2 = {"id": 2, "priority": 10}
+    drm_3 = {"id": 3, "priority": -1}
+    drm_4 = {"id": 4}
+    drm_5 = {"id": 5, "priority": 10}
+
+    assert sort_drms_by_priority([drm_1, drm_2, drm_3, drm_4, drm_5]) == [
+        drm_2,
+        drm_5,
+        drm_1,
+        drm_4,
+        drm_3,
+    ]
@@ -222,12 +222,12 @@ def test_extract_ocr_data_table_match_rows_match(
     assert extract_ocr_data("ocr result", drm) == expected_extracted_data
 
     # mock assertions
-    mocked_extract_fields.assert_called_once_with("ocr result", drm)
+    mocked_extract_fields.assert_called_once_with("ocr result", drm, None)
 
     mocked_extract_table_data.return_assert_called_once_with("ocr result", drm)
 
     mocked_get_table_rows.assert_called_once_with(
-        mocked_table_data["all_rows"], drm
+        mocked_table_data["all_rows"], drm, None
     )
 
     mocked_extract_row_named_groups.return_value.assert_has_calls = [
@@ -277,7 +277,7 @@ def test_extract_ocr_data_table_match_rows_no_match(
 
     # mock assertions
     mocked_extract_fields.assert_called_once_with(
-        "ocr result", {"test": "test"}
+        "ocr result", {"test": "test"}, None
     )
 
     mocked_extract_table_data.return_assert_called_once_with(
@@ -285,7 +285,7 @@ def test_extract_ocr_data_table_match_rows_no_match(
     )
 
     mocked_get_table_rows.assert_called_once_with(
-        mocked_table_data["all_rows"], {"test": "test"}
+        mocked_table_data["all_rows"], {"test": "test"}, None
     )
 
 
@@ -320,7 +320,7 @@ def test_extract_ocr_data_no_table_match(
 
     # mock assertions
     mocked_extract_fields.assert_called_once_with(
-        "ocr result", {"test": "test"}
+        "ocr result", {"test": "test"}, None
     )
 
     mocked_extract_table_data.return_assert_called_once_with(
@@ -446,12 +446,12 @@ def test_extract_ocr_data_table_match_rows_match_uniqueness(
     assert extract_ocr_data("ocr result", drm) == expected_extracted_data
 
     # mock assertions
-    mocked_extract_fields.assert_called_once_with("ocr result", drm)
+    mocked_extract_fields.assert_called_once_with("ocr result", drm, None)
 
     mocked_extract_table_data.return_assert_called_once_with("ocr result", drm)
 
     mocked_get_table_rows.assert_called_once_with(
-        mocked_table_data["all_rows"], drm
+        mocked_table_data["all_rows"], drm, None
     )
 
     mocked_extract_row_named_groups.return_value.assert_has_calls = [
@@ -509,12 +509,12 @@ def test_extract_ocr_data_uniqueness_not_found(
     assert extract_ocr_data("ocr result", drm) == {}  # uniqueness fields fail
 
     # mock assertions
-    mocked_extract_fields.assert_called_once_with("ocr result", drm)
+    mocked_extract_fields.assert_called_once_with("ocr result", drm, None)
 
     mocked_extract_table_data.return_assert_called_once_with("ocr result", drm)
 
     mocked_get_table_rows.assert_called_once_with(
-        mocked_table_data["all_rows"], drm
+        mocked_table_data["all_rows"], drm, None
     )
 
     mocked_extract_row_named_groups.return_value.assert_has_calls = [
@@ -0,0 +1,203 @@
+"""
+Module with unit tests for the parsing time limits.
+"""
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from regex4ocr.parser.drm_scanner import load_drm
+from regex4ocr.parser.limits import (
+    ParseLimits,
+    RegexGuard,
+    RegexTimeoutError,
+    get_regex_guard,
+)
+from regex4ocr.parser.parser import parse_ocr_result
+from tests.data.aux import open_file
+
+# catastrophic backtracking regexp and a string that triggers it
+SLOW_REGEXP = r"(a+)+$"
+SLOW_STRING = "a" * 32 + "!"
+
+
+@pytest.fixture(scope="module")
+def ocr_result_tax_coupon_1():
+    """ OCR test data for tax coupon 1."""
+    OCR_TEST_RESULT_FOLDER = "./tests/data/ocr_results/"
+
+    ocr_result = open_file(OCR_TEST_RESULT_FOLDER + "tax_coupon_1.txt")
+
+    return ocr_result
+
+
+@pytest.fixture(scope="module")
+def drm():
+    """ DRM of the tax coupon 1."""
+    return load_drm("./tests/data/drms/drm_tax_coupon_1.yml")
+
+
+@pytest.fixture
+def guard():
+    """ Regexp guard with its own helper process."""
+    guard = RegexGuard()
+
+    yield guard
+
+    guard.close()
+
+
+def test_regex_guard_match_same_as_re(guard):
+    """
+    Unit: tests that the guarded matches have the same groups of re ones.
+    """
+    regexp = r"(?P<qty>\d+)\s*x\s*(?P<price>\d+,\d{2})(\s*un)?"
+    string = "item 3 x 10,50 total"
+
+    match = guard.search(regexp, string)
+    expected = re.search(regexp, string)
+
+    assert match.span() == expected.span()
+    assert match[0] == match.group() == expected[0]
+    assert match.group("qty", 2) == expected.group("qty", 2)
+    assert match.groups() == expected.groups()
+    assert match.groupdict() == expected.groupdict()
+    assert guard.search(r"\d{5}", string) is None
+    assert [m.span() for m in guard.finditer(r"\d+", string)] == [
+        m.span() for m in re.finditer(r"\d+", string)
+    ]
+
+
+def test_regex_guard_timeout_restarts_helper(guard):
+    """
+    Unit: tests that a catastrophic backtracking regexp times out and that
+          the next regexps are evaluated by a new helper process.
+    """
+    with pytest.raises(RegexTimeoutError):
+        guard.search(SLOW_REGEXP, SLOW_STRING, timeout=0.2)
+
+    assert guard.search(r"a+", SLOW_STRING, timeout=5).span() == (0, 32)
+
+
+def guarded_search(string):
+    """ Searches a digit with the regexp guard of the current process. """
+    return get_regex_guard().search(r"\d", string, timeout=5).span()
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="fork is not available",
+)
+def test_regex_guard_reset_after_fork():
+    """
+    Unit: tests that the forked processes do not use the regexp guard of
+          their parent process, whose helper process is not their child.
+    """
+    assert guarded_search("a1") == (1, 2)
+
+    with ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context("fork")
+    ) as executor:
+        assert list(executor.map(guarded_search, ["ab2", "3"])) == [
+            (2, 3),
+            (0, 1),
+        ]
+
+
+def test_regex_guard_raises_regexp_errors(guard):
+    """
+    Unit: tests that invalid regexps raise the re module error.
+    """
+    with pytest.raises(re.error):
+        guard.search(r"(", "text")
+
+
+def test_parse_limits_invalid_arguments():
+    """
+    Unit: tests that negative limits are refused.
+    """
+    with pytest.raises(ValueError):
+        ParseLimits(deadline=-1)
+
+    with pytest.raises(ValueError):
+        ParseLimits(regex_timeout=0)
+
+
+def test_parse_ocr_result_within_limits(drm, ocr_result_tax_coupon_1):
+    """
+    Unit: tests that the limits do not change the extracted data of a
+          document parsed in time.
+    """
+    expected = parse_ocr_result(ocr_result_tax_coupon_1, [drm])
+
+    assert (
+        parse_ocr_result(
+            ocr_result_tax_coupon_1, [drm], deadline=60, regex_timeout=5
+        )
+        == expected
+    )
+
+
+def test_parse_ocr_result_deadline_skips_sections(drm, ocr_result_tax_coupon_1):
+    """
+    Unit: tests that the sections after an expired deadline are skipped.
+    """
+    data = parse_ocr_result(ocr_result_tax_coupon_1, [drm], deadline=0)
+
+    assert data["fields"] == {}
+    assert data["table"] == {}
+    assert data["skipped_sections"] == [
+        "fields.cnpj",
+        "fields.coo",
+        "fields.date",
+        "table",
+    ]
+
+
+def test_parse_ocr_result_regex_timeout_skips_field(
+    drm, ocr_result_tax_coupon_1
+):
+    """
+    Unit: tests that a catastrophic backtracking field regexp only skips
+          its own field.
+    """
+    slow_drm = dict(drm, fields=dict(drm["fields"], slow=SLOW_REGEXP))
+    ocr_result = ocr_result_tax_coupon_1 + "\n" + SLOW_STRING
+
+    expected = parse_ocr_result(ocr_result, [drm])
+    data = parse_ocr_result(ocr_result, [slow_drm], regex_timeout=0.2)
+
+    assert data.pop("skipped_sections") == ["fields.slow"]
+    assert data == expected
+
+
+def test_parse_limits_skipped_section_not_searched():
+    """
+    Unit: tests that the regexps of a section that timed out, e.g. of the
+          other table rows, are not evaluated again.
+    """
+    limits = ParseLimits(regex_timeout=0.2)
+
+    assert limits.search(SLOW_REGEXP, SLOW_STRING, "table.rows") is None
+    assert limits.search(r"a+", SLOW_STRING, "table.rows") is None
+    assert limits.finditer(r"a+", SLOW_STRING, "table.rows") == []
+    assert limits.search(r"a+", SLOW_STRING, "fields.coo").span() == (0, 32)
+    assert limits.skipped == ["table.rows"]
+
+
+def test_parse_limits_for_drm():
+    """
+    Unit: tests that the limits of another DRM of the same document keep
+          the deadline but not the skipped sections.
+    """
+    limits = ParseLimits(deadline=10, regex_timeout=1.0)
+    limits.skip("fields.coo")
+    other = limits.for_drm()
+
+    assert (other.deadline, other.regex_timeout) == (
+        limits.deadline,
+        limits.regex_timeout,
+    )
+    assert other.skipped == []
+    assert limits.skipped == ["fields.coo"]
@@ -0,0 +1,144 @@
+"""
+Module with unit tests for the regexps literals analysis functions.
+"""
+import re
+
+import pytest
+
+from regex4ocr.parser.literals import (
+    LiteralPattern,
+    fold_case,
+    folded_literal_matcher,
+    is_position_independent,
+    required_literals,
+)
+
+
+@pytest.mark.parametrize(
+    "regexp,expected_literals",
+    [
+        ("cupom fiscal", ["cupom fiscal"]),
+        (r"CUPOM\s+fiscal", ["cupom", "fiscal"]),
+        (r"(?i)(extrato)\s*(sat)+", ["extrato", "sat"]),
+        (r"n(ota|f)\s*fiscal", ["fiscal"]),
+        (r"(cupom)?\s*fiscal", ["fiscal"]),
+        (r"(?!nfe)cupom", ["cupom"]),
+        (r"cnpj|cpf", []),
+        (r"s[aã]t", []),
+        (r"recibo ção", ["recibo "]),
+        (re.compile("Total R\\$", re.IGNORECASE), ["total r$"]),
+    ],
+)
+def test_required_literals(regexp, expected_literals):
+    """
+    Unit: tests the required literals found in regexps.
+    """
+    assert required_literals(regexp) == expected_literals
+
+
+def test_required_literals_broken_regexp():
+    """
+    Unit: tests that broken regexps have no required literals.
+    """
+    assert required_literals("cupom (fiscal") == []
+
+
+def test_fold_case():
+    """
+    Unit: tests that the folded text keeps the re.IGNORECASE semantics of
+          ascii literals.
+    """
+    text = "CUPOM FIſCAL KG İtem ção"
+    folded = fold_case(text)
+
+    assert len(folded) == len(text)
+    assert folded == "cupom fiscal kg item ção"
+
+    for literal in ("fiscal", "kg", "item", "ção"):
+        assert bool(re.search(literal, text, re.IGNORECASE)) == (
+            fold_case(literal) in folded
+        )
+
+
+@pytest.mark.parametrize(
+    "regexp,expected",
+    [
+        (r"(?P<qty>\d+)\s*x\s*(?P<price>\d+)$", True),
+        (r"(?=\w+)\b(?P<name>.+)", True),
+        (r"^(?P<code>\d+)", False),
+        (r"\A\d+", False),
+        (r"(?<=\d)\s(?P<name>\w+)", False),
+        (r"a|(?:b|(?<!c)d)", False),
+        (r"(a)?(?(1)b|^c)", False),
+        (r"cupom (fiscal", False),
+    ],
+)
+def test_is_position_independent(regexp, expected):
+    """
+    Unit: tests the regexps that can be searched from a start position.
+    """
+    assert is_position_independent(regexp) is expected
+
+
+@pytest.mark.parametrize(
+    "regexp,has_matcher",
+    [
+        ("cupom fiscal", True),
+        ("^extrato", True),
+        ("total$", True),
+        (r"\Asat\Z", True),
+        (r"total r\$", True),
+        (re.compile("cupom", re.IGNORECASE), True),
+        (re.compile("cupom"), False),
+        ("(?m)^extrato", False),
+        ("(?a)cupom", False),
+        ("cupom fiscal ção", False),
+        (r"cupom\s+fiscal", False),
+        ("cupom|fiscal", False),
+    ],
+)
+def test_folded_literal_matcher(regexp, has_matcher):
+    """
+    Unit: tests that the literal identifiers matchers match the same texts
+          as their case insensitive regexps.
+    """
+    matcher = folded_literal_matcher(regexp)
+
+    assert (matcher is not None) == has_matcher
+
+    if matcher is None:
+        return
+
+    pattern = re.compile(getattr(regexp, "pattern", regexp), re.IGNORECASE)
+    texts = [
+        "CUPOM FISCAL",
+        "extrato\ncupom",
+        "o total\n",
+        "total\n\n",
+        "SAT",
+        "ſat",
+        "Total R$ 10",
+        "",
+    ]
+
+    for text in texts:
+        assert matcher(fold_case(text)) == bool(pattern.search(text))
+
+
+def test_literal_pattern():
+    """
+    Unit: tests that the literal patterns match the same as the regexps.
+    """
+    pattern = LiteralPattern("total")
+    text = "total: 1\ntotal: 2"
+
+    for pos, endpos in [(0, None), (1, None), (1, 14), (1, 13)]:
+        match = pattern.search(text, pos, endpos)
+        expected = re.compile("total").search(text, pos, endpos or len(text))
+
+        assert bool(match) == bool(expected)
+
+        if expected:
+            assert match.span() == expected.span()
+            assert match.group() == match[0] == expected.group()
+            assert match.groups() == expected.groups()
@@ -17,26 +17,30 @@ def ocr_test_rslt_folder():
     return OCR_TEST_RESULT_FOLDER
 
 
-@mock.patch("regex4ocr.main.parse_ocr_result")
-@mock.patch("regex4ocr.main.scan_drms_folder")
-def test_regex4ocr_function(
-    mocked_scan_drms_folder, mocked_parse_ocr_result, ocr_test_rslt_folder
-):
+@mock.patch("regex4ocr.main.get_registry")
+def test_regex4ocr_function(mocked_get_registry, ocr_test_rslt_folder):
     """
     Unit: Tests regex4ocr function logic.
     """
     ocr_result = open_file(ocr_test_rslt_folder + "tax_coupon_1.txt")
     drms_path = "./drms"
 
-    mocked_drms_1 = {"test": 1}
-    mocked_drms_2 = {"test": 2}
-
-    mocked_scan_drms_folder.return_value = [mocked_drms_1, mocked_drms_2]
-    mocked_parse_ocr_result.return_value = "test_parsed_ocr_result"
+    mocked_registry = mocked_get_registry.return_value
+    mocked_registry.parse.return_value = "test_parsed_ocr_result"
 
     assert parse(ocr_result, drms_path) == "test_parsed_ocr_result"
 
-    mocked_scan_drms_folder.assert_called_once_with(drms_path)
-    mocked_parse_ocr_result.assert_called_once_with(
-        ocr_result, [mocked_drms_1, mocked_drms_2]
+    mocked_get_registry.assert_called_once_with(
+        drms_path, auto_reload=False
+    )
+    mocked_registry.parse.assert_called_once_with(
+        ocr_result,
+        selection="first_match",
+        stats=None,
+        deadline=None,
+        regex_timeout=None,
+        spans=False,
+        select=None,
+        cache=None,
+        duplicates=None,
     )
@@ -3,14 +3,16 @@ Module with unit tests for the parser module.
 """
 from unittest import mock
 
+import pytest
+
 from regex4ocr.parser.parser import parse_ocr_result
 
 
 @mock.patch("regex4ocr.parser.parser.extract_ocr_data")
 @mock.patch("regex4ocr.parser.parser.pre_process_result")
-@mock.patch("regex4ocr.parser.parser.get_all_drms_match")
+@mock.patch("regex4ocr.parser.parser.get_first_drm_match")
 def test_parse_ocr_result_with_drms(
-    mocked_get_all_drms_match,
+    mocked_get_first_drm_match,
     mocked_pre_process_result,
     mocked_extract_ocr_data,
 ):
@@ -26,7 +28,7 @@ def test_parse_ocr_result_with_drms(
     extracted_data = {"fields": {"field1": "value1"}}
 
     # mock returns
-    mocked_get_all_drms_match.return_value = drms
+    mocked_get_first_drm_match.return_value = drm1
     mocked_pre_process_result.return_value = "pre processed result"
     mocked_extract_ocr_data.return_value = extracted_data
 
@@ -34,20 +36,20 @@ def test_parse_ocr_result_with_drms(
     assert parse_ocr_result("ocr result", drms) == extracted_data
 
     # mock assertions
-    mocked_get_all_drms_match.assert_called_once_with("ocr result", drms)
+    mocked_get_first_drm_match.assert_called_once_with("ocr result", drms, None)
     mocked_pre_process_result.assert_called_once_with(
         "ocr result", drm1
     )  # first drm
     mocked_extract_ocr_data.assert_called_once_with(
-        "pre processed result", drm1
+        "pre processed result", drm1, None, None
     )
 
 
 @mock.patch("regex4ocr.parser.parser.extract_ocr_data")
 @mock.patch("regex4ocr.parser.parser.pre_process_result")
-@mock.patch("regex4ocr.parser.parser.get_all_drms_match")
+@mock.patch("regex4ocr.parser.parser.get_first_drm_match")
 def test_parse_ocr_result_no_drm_match(
-    mocked_get_all_drms_match,
+    mocked_get_first_drm_match,
     mocked_pre_process_result,
     mocked_extract_ocr_data,
 ):
@@ -62,12 +64,68 @@ def test_parse_ocr_result_no_drm_match(
     drms = [drm1, drm2]
 
     # mock returns
-    mocked_get_all_drms_match.return_value = []  # no DRMs match
+    mocked_get_first_drm_match.return_value = None  # no DRMs match
 
     # method invocation
     assert parse_ocr_result("ocr result", drms) == {}
 
     # mock assertions
-    mocked_get_all_drms_match.assert_called_once_with("ocr result", drms)
+    mocked_get_first_drm_match.assert_called_once_with("ocr result", drms, None)
     mocked_pre_process_result.assert_not_called()
     mocked_extract_ocr_data.assert_not_called()
+
+
+@mock.patch("regex4ocr.parser.parser.extract_ocr_data")
+@mock.patch("regex4ocr.parser.parser.pre_process_result")
+@mock.patch("regex4ocr.parser.parser.get_all_drms_match")
+def test_parse_ocr_result_all_matches(
+    mocked_get_all_drms_match,
+    mocked_pre_process_result,
+    mocked_extract_ocr_data,
+):
+    """
+    Unit: tests parsing function with the data of every matching DRM.
+    """
+    drm1 = {"test1": "value1"}
+
+    drm2 = {"test2": "value2"}
+
+    drms = [drm1, drm2]
+
+    # mock returns
+    mocked_get_all_drms_match.return_value = drms
+    mocked_pre_process_result.side_effect = ["pre 1", "pre 2"]
+    mocked_extract_ocr_data.side_effect = [{"data": 1}, {"data": 2}]
+
+    # method invocation
+    assert parse_ocr_result("ocr result", drms, selection="all_matches") == [
+        {"data": 1},
+        {"data": 2},
+    ]
+
+    # mock assertions
+    mocked_get_all_drms_match.assert_called_once_with("ocr result", drms, None)
+    mocked_extract_ocr_data.assert_has_calls(
+        [
+            mock.call("pre 1", drm1, None, None),
+            mock.call("pre 2", drm2, None, None),
+        ]
+    )
+
+
+@mock.patch("regex4ocr.parser.parser.get_all_drms_match")
+def test_parse_ocr_result_all_matches_no_drm_match(mocked_get_all_drms_match):
+    """
+    Unit: tests parsing function with all the matches when no DRM matches.
+    """
+    mocked_get_all_drms_match.return_value = []
+
+    assert parse_ocr_result("ocr result", [], selection="all_matches") == []
+
+
+def test_parse_ocr_result_unknown_selection():
+    """
+    Unit: tests that unknown selection modes are not accepted.
+    """
+    with pytest.raises(ValueError):
+        parse_ocr_result("ocr result", [], selection="best_match")
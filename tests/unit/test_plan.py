@@ -0,0 +1,178 @@
+"""
+Module with unit tests for the DRM extraction plans.
+"""
+import json
+import os
+import pickle
+
+import pytest
+
+from benchmarks.corpus import generate_corpus, write_drms_folder
+from regex4ocr.parser.compiler import compile_drm
+from regex4ocr.parser.drm_scanner import scan_drms_folder
+from regex4ocr.parser.extraction import extract_ocr_data
+from regex4ocr.parser.pre_process import pre_process_result
+from regex4ocr.parser.registry import DrmRegistry
+from regex4ocr.parser.stats import ParseStats
+from tests.data.aux import open_file
+
+OCR_TEST_RESULT_FOLDER = "./tests/data/ocr_results/"
+
+
+@pytest.fixture(scope="module")
+def drms():
+    """ Valid DRMs of the test data. """
+    return scan_drms_folder("./tests/data/drms/")
+
+
+@pytest.fixture(scope="module")
+def ocr_results():
+    """ All the OCR test data. """
+    return [
+        open_file(OCR_TEST_RESULT_FOLDER + name)
+        for name in sorted(os.listdir(OCR_TEST_RESULT_FOLDER))
+        if name.endswith(".txt")
+    ]
+
+
+def assert_same_extraction(ocr_result, drm):
+    """ Asserts that the plan extracts the same data of the dict DRM. """
+    pre_processed = pre_process_result(ocr_result, drm)
+    expected = extract_ocr_data(pre_processed, drm)
+    extracted = compile_drm(drm).plan.extract(pre_processed)
+
+    assert extracted == expected
+    assert json.dumps(extracted) == json.dumps(expected)
+
+
+def test_plan_same_data_as_extract_ocr_data(drms, ocr_results):
+    """
+    Unit: tests that the plans of all the test DRMs extract the same data
+          of extract_ocr_data, keys order included.
+    """
+    for drm in drms:
+        for ocr_result in ocr_results:
+            assert_same_extraction(ocr_result, drm)
+
+
+def test_plan_same_data_on_noisy_corpus(tmp_path):
+    """
+    Unit: tests the plans with noisy synthetic receipts.
+    """
+    write_drms_folder(str(tmp_path), 5)
+    drms = scan_drms_folder(str(tmp_path))
+
+    for ocr_result in generate_corpus(5, 20, 15, noise=0.3, seed=3):
+        for drm in drms:
+            assert_same_extraction(ocr_result, drm)
+
+
+def test_plan_without_table_section():
+    """
+    Unit: tests the plan of a DRM without a table section.
+    """
+    drm = {
+        "identifiers": ["store"],
+        "fields": {"code": r"code:\s*(\d+)", "store": "store"},
+        "types": {"fields": {"code": "int"}},
+    }
+
+    assert_same_extraction("store code: 12", drm)
+    assert compile_drm(drm).plan.extract("store code: 12") == {
+        "fields": {"code": 12, "store": "store"},
+        "table": {},
+    }
+
+
+def test_extract_ocr_data_uses_plan(drms, ocr_results):
+    """
+    Unit: tests that extract_ocr_data uses the plan of compiled DRMs and
+          that both paths have the same stats.
+    """
+    drm = drms[0]
+    compiled_drm = compile_drm(drm)
+    pre_processed = pre_process_result(ocr_results[-1], drm)
+    stats, plan_stats = ParseStats(), ParseStats()
+
+    assert extract_ocr_data(
+        pre_processed, compiled_drm, plan_stats
+    ) == extract_ocr_data(pre_processed, drm, stats)
+    assert set(plan_stats.stage_times) == set(stats.stage_times)
+    assert plan_stats.regexes_executed == stats.regexes_executed
+    assert plan_stats.table_rows == stats.table_rows
+
+
+def test_compiled_drm_pickles_as_dict(drms):
+    """
+    Unit: tests that the compiled DRMs can be pickled without their plans.
+    """
+    compiled_drm = compile_drm(drms[0])
+    unpickled = pickle.loads(pickle.dumps(compiled_drm))
+
+    assert list(unpickled) == list(compiled_drm)
+    assert unpickled["fields"] == compiled_drm["fields"]
+    assert type(unpickled) is dict
+
+
+@pytest.mark.parametrize(
+    "inline_regexp",
+    [
+        r"(?P<code>\d+)\s+(?P<name>[a-z ]+)",
+        r"^(?P<code>\d+)",
+        r"(?<=\d)\s(?P<name>[a-z]+)",
+        r"\b(?P<name>[a-z]+)$",
+    ],
+)
+def test_plan_rows_same_as_row_strings(inline_regexp):
+    """
+    Unit: tests that the rows searched in place have the same named groups
+          of the rows strings, including rows with many newlines.
+    """
+    drm = {
+        "identifiers": ["store"],
+        "fields": {"store": "store"},
+        "table": {
+            "header": "items",
+            "line_start": r"\n\d+",
+            "inline_named_group_captures": inline_regexp,
+            "footer": "total",
+        },
+    }
+    ocr_result = (
+        "store items\n1 rice 2kg\n22 beans\nblack\n333 oil\n\n4 salt total"
+    )
+
+    assert_same_extraction(ocr_result, drm)
+
+
+def test_iter_rows_same_as_extract(drms, ocr_results):
+    """
+    Unit: tests that the lazy rows are the same rows of the extracted data.
+    """
+    for drm in drms:
+        plan = compile_drm(drm).plan
+
+        for ocr_result in ocr_results:
+            pre_processed = pre_process_result(ocr_result, drm)
+            data = plan.extract(pre_processed)
+
+            # the lazy rows do not check the uniqueness fields
+            if not data:
+                continue
+
+            assert list(plan.iter_rows(pre_processed)) == data.get(
+                "table", {}
+            ).get("rows", [])
+
+
+def test_registry_iter_rows(ocr_results):
+    """
+    Unit: tests the lazy rows of the first DRM that matches an OCR result.
+    """
+    registry = DrmRegistry("./tests/data/drms/")
+    tax_coupon = open_file(OCR_TEST_RESULT_FOLDER + "tax_coupon_1.txt")
+    rows = registry.iter_rows(tax_coupon)
+
+    assert not isinstance(rows, list)
+    assert list(rows) == registry.parse(tax_coupon)["table"]["rows"]
+    assert list(registry.iter_rows("no drm matches")) == []
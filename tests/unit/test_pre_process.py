@@ -1,12 +1,18 @@
 """
 Module with unit tests for the pre processing functions.
 """
+import itertools
+import random
+import re
 from unittest import mock
 
 import pytest
+from unidecode import unidecode
 
 from regex4ocr.parser.pre_process import (
     apply_options,
+    compile_replaces,
+    normalize_text,
     pre_process_result,
     process_replaces,
 )
@@ -138,3 +144,105 @@ def test_pre_process_result(mocked_apply_options, pre_process_str):
 
     # method invocation
     assert pre_process_result(pre_process_str, drm) == "pre_processed_str"
+
+
+def test_compile_replaces_fuses_literals(pre_process_str):
+    """
+    Unit: tests that consecutive literal replaces are fused into one pass
+          and the regexp replaces are kept in their positions.
+    """
+    replaces = [
+        ["c00", "coo"],
+        ["c10", "coo"],
+        ["-+", ""],
+        ["bun", "3un"],
+        ["boun", "30un"],
+        ["b0un", "30un"],
+    ]
+
+    compiled_replaces = compile_replaces(replaces)
+
+    assert len(compiled_replaces) == 3
+    assert compiled_replaces[1] == (mock.ANY, "")
+    assert compiled_replaces[1][0].pattern == "-+"
+    assert process_replaces(pre_process_str, compiled_replaces) == (
+        process_replaces(pre_process_str, replaces)
+    )
+
+
+@pytest.mark.parametrize(
+    "replaces",
+    [
+        [["c00", "coo"], ["coo", "c0o"]],  # replacement matched later
+        [["ab", "x"], ["bc", "y"]],  # overlapping literals
+        [["ab", "x"], ["ab", "y"]],  # same literals
+        [["a", ""], ["bc", "y"]],  # removals may join literals
+        [["ab", "x"], ["cd", r"\\1"]],  # escaped replacements
+        [["(?i)ab", "x"], ["cd", "y"]],  # case insensitive regexp
+    ],
+)
+def test_compile_replaces_not_fused(replaces):
+    """
+    Unit: tests the literal replaces that can't be fused.
+    """
+    assert len(compile_replaces(replaces)) == 2
+
+
+def test_compile_replaces_same_result_as_sequential_replaces():
+    """
+    Unit: tests that the compiled replaces keep the sequential semantics.
+    """
+    rand = random.Random(7)
+    alphabet = "abc0"
+
+    def random_text(max_size):
+        size = rand.randint(1, max_size)
+        return "".join(rand.choice(alphabet) for _ in range(size))
+
+    for _ in range(500):
+        replaces = [
+            [random_text(3), random_text(2)] for _ in range(rand.randint(1, 5))
+        ]
+        text = random_text(30)
+
+        assert process_replaces(text, compile_replaces(replaces)) == (
+            process_replaces(text, replaces)
+        )
+
+
+@pytest.mark.parametrize(
+    "options", list(itertools.product([False, True], repeat=3))
+)
+def test_normalize_text_same_result_as_sequential_options(options):
+    """
+    Unit: tests that the single pass normalization is the same as applying
+          the lowercase, remove_whitespace and force_ascii options in order.
+    """
+    lowercase, remove_whitespace, force_ascii = options
+    rand = random.Random(3)
+    chars = (
+        "Aa Zz09\t\n\r\x0b\x0c\x1c\u00a0\u2003\u3000"
+        "\u00c7\u00e7\u00e3\u00c9\u00df\u0130\u0131\u017f\u212a"
+        "\u03a3\u03c3\u03c2\u5317\u00c6\ufb01\u2167"
+    )
+
+    def sequential_options(text):
+        if lowercase:
+            text = text.lower()
+
+        if remove_whitespace:
+            text = re.sub(r"\s", "", text)
+
+        if force_ascii:
+            text = unidecode(text)
+
+        return text
+
+    texts = ["", "CUPOM Fiscal\n  coo: 123", "\u03a3\u03a3 \u03a3A"]
+    texts += [
+        "".join(rand.choice(chars) for _ in range(rand.randint(1, 20)))
+        for _ in range(300)
+    ]
+
+    for text in texts:
+        assert normalize_text(text, *options) == sequential_options(text)
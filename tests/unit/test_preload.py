@@ -0,0 +1,78 @@
+"""
+Module with unit tests for the registries preload.
+"""
+import gc
+import multiprocessing
+import os
+
+import pytest
+
+from regex4ocr.parser.registry import clear_registries, get_registry
+from regex4ocr.preload import memory_report, preload
+
+
+@pytest.fixture
+def drms_path():
+    """ DRMs folder of the test data. """
+    clear_registries()
+
+    yield "./tests/data/drms/"
+
+    gc.unfreeze()
+    clear_registries()
+
+
+def _registry_id(drms_path):
+    return id(get_registry(drms_path))
+
+
+def test_preload_freezes_registries(drms_path):
+    """
+    Unit: tests that the preloaded registries are cached and frozen.
+    """
+    registries = preload(drms_path)
+
+    assert registries == [get_registry(drms_path)]
+    assert gc.get_freeze_count() > 0
+
+
+def test_preload_without_freeze(drms_path):
+    """
+    Unit: tests that the preload may keep the garbage collector as it is.
+    """
+    preload([drms_path], freeze=False)
+
+    assert gc.get_freeze_count() == 0
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="requires the fork start method",
+)
+def test_forked_workers_inherit_registries(drms_path):
+    """
+    Unit: tests that the forked processes reuse the preloaded registries.
+    """
+    (registry,) = preload(drms_path)
+
+    context = multiprocessing.get_context("fork")
+
+    with context.Pool(2) as pool:
+        ids = pool.map(_registry_id, [drms_path] * 2)
+
+    assert ids == [id(registry)] * 2
+
+
+@pytest.mark.skipif(
+    not os.path.exists("/proc/self/smaps"), reason="requires /proc smaps"
+)
+def test_memory_report():
+    """
+    Unit: tests the memory report of the current process.
+    """
+    report = memory_report()
+
+    assert report["pid"] == os.getpid()
+    assert report["rss"] > 0
+    assert report["rss"] == report["shared"] + report["private"]
+    assert memory_report(pid=-1) is None
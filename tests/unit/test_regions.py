@@ -0,0 +1,118 @@
+"""
+Module with unit tests for the search regions of the DRM fields.
+"""
+import re
+
+import pytest
+
+from regex4ocr.parser.compiler import compile_drm
+from regex4ocr.parser.extraction import extract_ocr_data, extract_table_data
+from regex4ocr.parser.limits import ParseLimits
+from regex4ocr.parser.regions import line_offset, region_window
+
+TEXT = "line 0\nline 1\nline 2\nline 3"
+
+DRM = {
+    "identifiers": ["store"],
+    "fields": {
+        "first_code": r"code:\s*(\d+)",
+        "header_code": r"code:\s*(\d+)",
+        "footer_code": r"code:\s*(\d+)",
+        "first_line": r"\w+",
+        "last_line": r"\w+",
+    },
+    "regions": {
+        "header_code": "before_table",
+        "footer_code": "after_table",
+        "first_line": {"lines": [0, 1]},
+        "last_line": {"lines": [-1, None]},
+    },
+    "table": {
+        "header": "items",
+        "line_start": r"\n\d+",
+        "footer": "total",
+    },
+}
+
+OCR_RESULT = "store code: 1\nitems code: 2\n1 rice\n2 beans\ntotal code: 3\nend"
+
+
+@pytest.mark.parametrize(
+    "line, expected",
+    [(0, 0), (1, 7), (3, 21), (10, 27), (-1, 21), (-3, 7), (-10, 0)],
+)
+def test_line_offset(line, expected):
+    """
+    Unit: tests the offsets of the lines, negative lines from the end.
+    """
+    assert line_offset(TEXT, line) == expected
+
+
+def test_region_window():
+    """
+    Unit: tests the windows of each kind of region.
+    """
+    header = re.search("line 1", TEXT)
+    footer = re.search("line 3", TEXT)
+
+    assert region_window(None, TEXT, header, footer) == (0, 27)
+    assert region_window("before_table", TEXT, header, footer) == (0, 13)
+    assert region_window("after_table", TEXT, header, footer) == (21, 27)
+    assert region_window("after_table", TEXT, header, None) == (0, 27)
+    assert region_window({"lines": [1, 3]}, TEXT, None, None) == (7, 21)
+    assert region_window({"lines": [None, -1]}, TEXT, None, None) == (0, 21)
+    assert region_window({"lines": [3, 1]}, TEXT, None, None) == (21, 21)
+
+
+def test_fields_regions():
+    """
+    Unit: tests that the fields are only searched within their regions,
+          with and without the extraction plans.
+    """
+    expected = {
+        "first_code": "1",
+        "header_code": "1",
+        "footer_code": "3",
+        "first_line": "store",
+        "last_line": "end",
+    }
+
+    assert extract_ocr_data(OCR_RESULT, DRM)["fields"] == expected
+    assert compile_drm(DRM).plan.extract(OCR_RESULT)["fields"] == expected
+    assert (
+        extract_ocr_data(OCR_RESULT, DRM, limits=ParseLimits(deadline=10))[
+            "fields"
+        ]
+        == expected
+    )
+
+
+def test_fields_table_regions_without_table():
+    """
+    Unit: tests that the table regions are the whole string when the table
+          is not found.
+    """
+    ocr_result = "store\ncode: 7"
+    fields = compile_drm(DRM).plan.extract(ocr_result)["fields"]
+
+    assert fields["header_code"] == fields["footer_code"] == "7"
+    assert extract_ocr_data(ocr_result, DRM)["fields"] == fields
+
+
+def test_footer_searched_after_header():
+    """
+    Unit: tests that a footer match before the header is not used.
+    """
+    ocr_result = "total 0\nitems\n1 rice\ntotal 1"
+    table_data = extract_table_data(ocr_result, DRM)
+
+    assert table_data["all_rows"] == "\n1 rice\n"
+    assert table_data["footer"] == "total"
+    assert compile_drm(DRM).plan.extract(ocr_result)["table"] == {
+        "header": "items",
+        "all_rows": "\n1 rice\n",
+        "footer": "total",
+        "rows": [{"row": "1 rice", "data": {}}],
+    }
+    assert extract_table_data("items total", DRM)["all_rows"] == " "
+    assert extract_table_data("total items", DRM) is None
@@ -0,0 +1,178 @@
+"""
+Module with unit tests for the DRM registry.
+"""
+import os
+import time
+from unittest import mock
+
+import pytest
+
+from regex4ocr.parser.drm_scanner import load_drm, scan_drms_folder
+from regex4ocr.parser.parser import parse_ocr_result
+from regex4ocr.parser.registry import (
+    DrmRegistry,
+    clear_registries,
+    get_registry,
+)
+from tests.data.aux import open_file
+
+
+@pytest.fixture(scope="module")
+def ocr_result_tax_coupon_1():
+    """ OCR test data for tax coupon 1."""
+    OCR_TEST_RESULT_FOLDER = "./tests/data/ocr_results/"
+
+    ocr_result = open_file(OCR_TEST_RESULT_FOLDER + "tax_coupon_1.txt")
+
+    return ocr_result
+
+
+def test_registry_parse_same_as_scanned_drms(ocr_result_tax_coupon_1):
+    """
+    Unit: tests that the compiled DRMs of the registry extract the same data
+          as the scanned DRMs dicts.
+    """
+    DRM_TEST_YML_FOLDER = "./tests/data/drms/"
+
+    registry = DrmRegistry(DRM_TEST_YML_FOLDER)
+    drms = scan_drms_folder(DRM_TEST_YML_FOLDER)
+
+    assert len(registry.drms) == len(drms)
+    assert registry.parse(ocr_result_tax_coupon_1) == parse_ocr_result(
+        ocr_result_tax_coupon_1, drms
+    )
+    assert registry.parse(ocr_result_tax_coupon_1)["table"]["rows"]
+
+
+@mock.patch("regex4ocr.parser.registry.DrmRegistry.load")
+def test_get_registry_scans_folder_once(mocked_load):
+    """
+    Unit: tests that the default registry of a folder is cached.
+    """
+    clear_registries()
+
+    registry = get_registry("./drms")
+
+    assert get_registry("./drms/") is registry
+    mocked_load.assert_called_once_with()
+
+    clear_registries()
+
+    assert get_registry("./drms") is not registry
+
+
+def write_drm(folder, name, identifier):
+    """ Writes a minimal DRM yml file to the folder. """
+    drm_file = folder / name
+    drm_file.write_text(
+        "identifiers:\n"
+        "  - {}\n"
+        "fields:\n"
+        "  code: 'code:\\s*(\\d+)'\n"
+        "table:\n"
+        "  header: items\n"
+        "  line_start: \\n\\d+\n"
+        "  footer: total\n".format(identifier)
+    )
+
+    return drm_file
+
+
+def test_registry_refresh_reloads_changed_files_only(tmp_path):
+    """
+    Unit: tests that the registry refresh parses only new or changed files
+          and swaps the DRMs list.
+    """
+    write_drm(tmp_path, "drm_a.yml", "store a")
+    write_drm(tmp_path, "drm_b.yml", "store b")
+
+    registry = DrmRegistry(str(tmp_path))
+    drms = registry.drms
+    version = registry.version
+
+    assert registry.parse("store b code: 12") == {
+        "fields": {"code": "12"},
+        "table": {},
+    }
+
+    # nothing changed
+    assert not registry.refresh()
+    assert registry.drms is drms
+
+    # same contents with a new mtime do not parse the file again
+    os.utime(str(tmp_path / "drm_a.yml"), (1, 1))
+
+    with mock.patch("regex4ocr.parser.registry.load_drm") as mocked_load_drm:
+        assert not registry.refresh()
+        mocked_load_drm.assert_not_called()
+
+    write_drm(tmp_path, "drm_b.yml", "store c")
+    write_drm(tmp_path, "drm_c.yml", "store d")
+
+    with mock.patch(
+        "regex4ocr.parser.registry.load_drm", wraps=load_drm
+    ) as mocked_load_drm:
+        assert registry.refresh()
+        assert mocked_load_drm.call_count == 2
+
+    assert registry.version != version
+    assert registry.drms is not drms
+    assert len(drms) == 2  # the previous list is not mutated
+    assert len(registry.drms) == 3
+    assert registry.parse("store b code: 12") == {}
+    assert registry.parse("store c code: 12")["fields"] == {"code": "12"}
+
+    (tmp_path / "drm_c.yml").unlink()
+
+    assert registry.refresh()
+    assert len(registry.drms) == 2
+
+
+def test_registry_auto_reload(tmp_path):
+    """
+    Unit: tests that the auto reload registry picks up new DRM files.
+    """
+    registry = DrmRegistry(str(tmp_path), auto_reload=0.01)
+
+    assert registry.parse("store a code: 1") == {}
+
+    write_drm(tmp_path, "drm_a.yml", "store a")
+    time.sleep(0.02)
+
+    assert registry.parse("store a code: 1")["fields"] == {"code": "1"}
+
+
+def test_registry_auto_reload_interval(tmp_path):
+    """
+    Unit: tests that the auto reload registry checks the folder at most
+          once per its interval.
+    """
+    registry = DrmRegistry(str(tmp_path), auto_reload=True)
+
+    with mock.patch.object(registry, "refresh") as mocked_refresh:
+        for _ in range(3):
+            registry.parse("store a code: 1")
+            list(registry.iter_rows("store a code: 1"))
+
+        assert not mocked_refresh.called
+
+        registry.auto_reload = 0.01
+        time.sleep(0.02)
+        registry.parse("store a code: 1")
+
+    mocked_refresh.assert_called_once_with(blocking=False)
+
+
+def test_registry_polling(tmp_path):
+    """
+    Unit: tests the background thread that refreshes the registry.
+    """
+    registry = DrmRegistry(str(tmp_path))
+
+    with mock.patch.object(registry, "refresh") as mocked_refresh:
+        registry.start_polling(interval=0.01)
+        time.sleep(0.1)
+        registry.stop_polling()
+
+    assert mocked_refresh.called
+    assert registry._poller is None
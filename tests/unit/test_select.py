@@ -0,0 +1,150 @@
+"""
+Module with unit tests for the selection of the extracted sections.
+"""
+import os
+
+import pytest
+
+from regex4ocr import parse
+from regex4ocr.parser.compiler import compile_drm
+from regex4ocr.parser.drm_scanner import scan_drms_folder
+from regex4ocr.parser.plan import parse_select, project_data
+from regex4ocr.parser.pre_process import pre_process_result
+from regex4ocr.parser.stats import ParseStats
+from tests.data.aux import open_file
+
+OCR_TEST_RESULT_FOLDER = "./tests/data/ocr_results/"
+
+SELECTIONS = [
+    ["fields"],
+    ["table"],
+    ["uniqueness_fields"],
+    ["fields.cnpj", "fields.coo"],
+    ["fields.date", "table", "uniqueness_fields"],
+    ["fields.unknown"],
+]
+
+DRM = {
+    "identifiers": ["store"],
+    "fields": {
+        "store": r"store (\w+)",
+        "code": r"code: (\d+)",
+        "total": r"total: (\d+)",
+    },
+    "types": {"fields": {"code": "int", "total": "int"}},
+    "uniqueness_fields": ["code"],
+    "table": {
+        "header": "items",
+        "line_start": r"\n\d+",
+        "inline_named_group_captures": r"(?P<code>\d+)",
+        "footer": "end",
+    },
+}
+
+
+@pytest.mark.parametrize(
+    "select, expected",
+    [
+        ("table", {"table"}),
+        (["fields.cnpj", "table"], {"fields.cnpj", "table"}),
+        ([], set()),
+    ],
+)
+def test_parse_select(select, expected):
+    """
+    Unit: tests the valid selections.
+    """
+    assert parse_select(select) == expected
+
+
+@pytest.mark.parametrize("select", [["tables"], ["fields."], ["rows"]])
+def test_parse_select_unknown(select):
+    """
+    Unit: tests that the unknown selections are rejected.
+    """
+    with pytest.raises(ValueError):
+        parse_select(select)
+
+
+def test_projected_plans_same_data():
+    """
+    Unit: tests that the projected plans of all the test DRMs extract the
+          selected sections of the whole data.
+    """
+    ocr_results = [
+        open_file(OCR_TEST_RESULT_FOLDER + name)
+        for name in os.listdir(OCR_TEST_RESULT_FOLDER)
+        if name.endswith(".txt")
+    ]
+
+    for drm in scan_drms_folder("./tests/data/drms/"):
+        plan = compile_drm(drm).plan
+
+        for ocr_result in ocr_results:
+            pre_processed = pre_process_result(ocr_result, drm)
+
+            for select in SELECTIONS:
+                selections = parse_select(select)
+
+                assert plan.project(selections).extract(
+                    pre_processed
+                ) == project_data(plan.extract(pre_processed), selections)
+
+
+def test_projected_plan_skips_sections():
+    """
+    Unit: tests that the sections that are not selected are not extracted
+          and that the uniqueness fields are still checked.
+    """
+    plan = compile_drm(DRM).plan
+    ocr_result = "store abc code: 1 items\n1\n2 end total: 3"
+    selections = parse_select(["fields.store"])
+    projection = plan.project(selections)
+    stats = ParseStats()
+
+    assert projection is plan.project(selections)
+    assert projection.extract(ocr_result, stats) == {
+        "fields": {"store": "abc"}
+    }
+    assert stats.regexes_executed == 2
+    assert stats.table_rows == 0
+    assert projection.extract("store abc items\n1 end") == {}
+    assert plan.project(parse_select(["table"])).extract(ocr_result) == {
+        "table": plan.extract(ocr_result)["table"]
+    }
+
+
+def test_projected_sequential_plan():
+    """
+    Unit: tests that the sequential plans still search the fields declared
+          before the selected ones.
+    """
+    drm = dict(DRM, sequential=True, uniqueness_fields=None)
+    drm["fields"] = {"first": r"\d+", "second": r"\d+"}
+    plan = compile_drm(drm).plan
+
+    assert plan.project(parse_select(["fields.second"])).extract(
+        "1 2"
+    ) == {"fields": {"second": "2"}}
+
+
+def test_parse_with_select():
+    """
+    Unit: tests the selections of the parse function, with and without
+          time limits.
+    """
+    tax_coupon = open_file(OCR_TEST_RESULT_FOLDER + "tax_coupon_1.txt")
+    drms_path = "./tests/data/drms/"
+    data = parse(tax_coupon, drms_path)
+    select = ["fields.coo", "table"]
+    expected = {
+        "fields": {
+            field: value
+            for field, value in data["fields"].items()
+            if field == "coo"
+        },
+        "table": data["table"],
+    }
+
+    assert parse(tax_coupon, drms_path, select=select) == expected
+    assert parse(tax_coupon, drms_path, select=select, deadline=10) == expected
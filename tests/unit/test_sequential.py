@@ -0,0 +1,98 @@
+"""
+Module with unit tests for the sequential fields extraction.
+"""
+import pytest
+
+from regex4ocr.parser.compiler import compile_drm
+from regex4ocr.parser.extraction import extract_fields
+from regex4ocr.parser.limits import ParseLimits
+
+OCR_RESULT = "cnpj: 11 coo: 22 date: 01/02 coo: 33 total: 44"
+
+
+def make_drm(**options):
+    """ Sequential DRM with a field declared out of the document order. """
+    drm = {
+        "identifiers": ["cnpj"],
+        "fields": {
+            "cnpj": r"cnpj: (\d+)",
+            "date": r"date: (\S+)",
+            "coo": r"coo: (\d+)",
+            "total": r"total: (\d+)",
+        },
+        "sequential": True,
+    }
+    drm.update(options)
+
+    return drm
+
+
+def extract_all(drm):
+    """ Extracted fields of the legacy, limited and plan extractions. """
+    return [
+        extract_fields(OCR_RESULT, drm),
+        extract_fields(OCR_RESULT, drm, ParseLimits(deadline=10)),
+        compile_drm(drm).plan.extract(OCR_RESULT)["fields"],
+    ]
+
+
+@pytest.mark.parametrize(
+    "options, expected",
+    [
+        (
+            {},
+            {"cnpj": "11", "date": "01/02", "coo": "33", "total": "44"},
+        ),
+        (
+            {"sequential_fallback": True},
+            {"cnpj": "11", "date": "01/02", "coo": "33", "total": "44"},
+        ),
+        (
+            {"sequential": False},
+            {"cnpj": "11", "date": "01/02", "coo": "22", "total": "44"},
+        ),
+    ],
+)
+def test_sequential_fields(options, expected):
+    """
+    Unit: tests that each field is searched after the previous match.
+    """
+    for fields in extract_all(make_drm(**options)):
+        assert fields == expected
+
+
+def test_sequential_fallback():
+    """
+    Unit: tests that the fields not found after the previous match are
+          searched in the whole document, which does not move the cursor.
+    """
+    drm = make_drm()
+    drm["fields"] = {
+        "date": r"date: (\S+)",
+        "cnpj": r"cnpj: (\d+)",
+        "coo": r"coo: (\d+)",
+    }
+
+    for fields in extract_all(drm):
+        assert fields == {"date": "01/02", "cnpj": "11", "coo": "33"}
+
+    drm["sequential_fallback"] = False
+
+    for fields in extract_all(drm):
+        assert fields == {"date": "01/02", "coo": "33"}
+
+
+def test_sequential_with_regions():
+    """
+    Unit: tests that the sequential search stays within the field regions.
+    """
+    drm = make_drm()
+    drm["fields"] = {"cnpj": r"\d+", "coo": r"\d+"}
+    drm["regions"] = {"coo": {"lines": [1, None]}}
+    ocr_result = "cnpj 1 2\ncoo 3"
+
+    assert extract_fields(ocr_result, drm) == {"cnpj": "1", "coo": "3"}
+    assert compile_drm(drm).plan.extract(ocr_result)["fields"] == {
+        "cnpj": "1",
+        "coo": "3",
+    }
@@ -0,0 +1,117 @@
+"""
+Module with unit tests for the span results.
+"""
+import os
+import pickle
+
+import pytest
+
+from regex4ocr import materialize, parse
+from regex4ocr.parser.compiler import compile_drm
+from regex4ocr.parser.drm_scanner import scan_drms_folder
+from regex4ocr.parser.parser import parse_ocr_result
+from regex4ocr.parser.pre_process import pre_process_result
+from regex4ocr.parser.spans import Span, TableRow
+from tests.data.aux import open_file
+
+OCR_TEST_RESULT_FOLDER = "./tests/data/ocr_results/"
+
+
+def test_span():
+    """
+    Unit: tests that the spans slice the text only when accessed.
+    """
+    span = Span("store items total", 6, 11)
+
+    assert span.span == (6, 11)
+    assert len(span) == 5
+    assert str(span) == span.value == "items"
+    assert span == "items" == Span("items", 0, 5)
+
+
+def test_table_row():
+    """
+    Unit: tests that the rows strings have no newlines.
+    """
+    row = TableRow("x\n1 rice\n2kg\n", 2, 12, {"code": "1"})
+
+    assert row.row == "1 rice2kg"
+    assert row.as_dict() == {"row": "1 rice2kg", "data": {"code": "1"}}
+    assert not hasattr(row, "__dict__")
+
+
+def test_span_results_materialize_to_default_results():
+    """
+    Unit: tests that the span results of all the test DRMs have the same
+          data of the default results.
+    """
+    ocr_results = [
+        open_file(OCR_TEST_RESULT_FOLDER + name)
+        for name in os.listdir(OCR_TEST_RESULT_FOLDER)
+        if name.endswith(".txt")
+    ]
+
+    for drm in scan_drms_folder("./tests/data/drms/"):
+        plan = compile_drm(drm).plan
+
+        for ocr_result in ocr_results:
+            pre_processed = pre_process_result(ocr_result, drm)
+            span_data = plan.extract(pre_processed, spans=True)
+
+            assert materialize(span_data) == plan.extract(pre_processed)
+
+
+@pytest.mark.parametrize(
+    "inline_regexp",
+    [r"(?P<code>\d+)\s+(?P<name>[a-z ]+)", r"^(?P<code>\d+)", None],
+)
+def test_span_rows_offsets(inline_regexp):
+    """
+    Unit: tests the rows offsets into the OCR result string.
+    """
+    drm = {
+        "identifiers": ["store"],
+        "fields": {"store": "store"},
+        "table": {
+            "header": "items",
+            "line_start": r"\n\d+",
+            "inline_named_group_captures": inline_regexp,
+            "footer": "total",
+        },
+    }
+    ocr_result = "store items\n1 rice\n22 beans\nblack\n333 oil total"
+    plan = compile_drm(drm).plan
+    table = plan.extract(ocr_result, spans=True)["table"]
+
+    rows = table["rows"]
+
+    assert [row.span for row in rows] == [(12, 18), (19, 33), (34, 41)]
+    assert [row.row for row in rows] == [
+        "1 rice",
+        "22 beansblack",
+        "333 oil",
+    ]
+    assert table["all_rows"].span == (11, 42)
+    assert materialize(plan.extract(ocr_result, spans=True)) == plan.extract(
+        ocr_result
+    )
+
+
+def test_parse_spans():
+    """
+    Unit: tests the span results of the parse function and that they are
+          pickled with a single copy of the OCR result string.
+    """
+    tax_coupon = open_file(OCR_TEST_RESULT_FOLDER + "tax_coupon_1.txt")
+    drms_path = "./tests/data/drms/"
+    span_data = parse(tax_coupon, drms_path, spans=True)
+    rows = span_data["table"]["rows"]
+
+    assert isinstance(rows[0], TableRow)
+    assert materialize(span_data) == parse(tax_coupon, drms_path)
+    assert materialize(pickle.loads(pickle.dumps(span_data))) == materialize(
+        span_data
+    )
+
+    with pytest.raises(ValueError):
+        parse_ocr_result(tax_coupon, [], deadline=1, spans=True)
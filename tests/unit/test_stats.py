@@ -0,0 +1,71 @@
+"""
+Module with unit tests for the parse statistics.
+"""
+import pytest
+
+from regex4ocr.parser.parser import parse_ocr_result
+from regex4ocr.parser.registry import DrmRegistry
+from regex4ocr.parser.stats import STAGES, ParseStats
+from tests.data.aux import open_file
+
+
+@pytest.fixture(scope="module")
+def ocr_result_tax_coupon_1():
+    """ OCR test data for tax coupon 1."""
+    OCR_TEST_RESULT_FOLDER = "./tests/data/ocr_results/"
+
+    ocr_result = open_file(OCR_TEST_RESULT_FOLDER + "tax_coupon_1.txt")
+
+    return ocr_result
+
+
+@pytest.fixture(scope="module")
+def registry():
+    """ Registry of the DRMs test folder."""
+    return DrmRegistry("./tests/data/drms/")
+
+
+def test_parse_stats_records_all_stages(registry, ocr_result_tax_coupon_1):
+    """
+    Unit: tests that the stats of a parsed OCR result has the timings of
+          all the stages, the chosen DRM and the evaluation counters.
+    """
+    stats = ParseStats()
+
+    data = registry.parse(ocr_result_tax_coupon_1, stats=stats)
+
+    assert data == registry.parse(ocr_result_tax_coupon_1)
+    assert set(stats.stage_times) == set(STAGES)
+    assert all(seconds >= 0 for seconds in stats.stage_times.values())
+    assert stats.drm in list(registry.drms)
+    assert 1 <= stats.drms_tested <= len(registry.drms)
+    assert stats.table_rows == len(data["table"]["rows"])
+    assert stats.regexes_executed >= stats.drms_tested + stats.table_rows
+
+
+def test_parse_stats_no_drm_match(registry):
+    """
+    Unit: tests the stats of an OCR result that no DRM matches.
+    """
+    stats = ParseStats()
+
+    assert parse_ocr_result("no drm matches", registry.drms, stats=stats) == {}
+    assert list(stats.stage_times) == ["identification"]
+    assert stats.drm is None
+    assert stats.table_rows == 0
+
+
+def test_parse_stats_accumulates(registry, ocr_result_tax_coupon_1):
+    """
+    Unit: tests that the stats accumulate when reused.
+    """
+    stats = ParseStats()
+
+    registry.parse(ocr_result_tax_coupon_1, stats=stats)
+    first = stats.as_dict()
+    registry.parse(ocr_result_tax_coupon_1, stats=stats)
+
+    assert stats.table_rows == 2 * first["table_rows"]
+    assert stats.regexes_executed == 2 * first["regexes_executed"]
+    assert stats.stage_times["fields"] >= first["stage_times"]["fields"]
+    assert "table_rows=" in repr(stats)
@@ -0,0 +1,290 @@
+"""
+Module with unit tests for the uniqueness store and its batch parsing.
+"""
+import pickle
+import time
+from unittest import mock
+
+import pytest
+
+from regex4ocr import UniquenessStore, parse_many
+from regex4ocr.parser.drm_scanner import get_first_drm_match
+from regex4ocr.parser.parser import extract_pre_processed
+from regex4ocr.parser.pre_process import pre_process_result
+
+DRM = (
+    "identifiers:\n"
+    "  - store\n"
+    "fields:\n"
+    "  coo: 'coo:\\s*(\\d+)'\n"
+    "  total: 'total:\\s*(\\d+)'\n"
+    "uniqueness_fields: ['coo']\n"
+)
+
+
+@pytest.fixture
+def drms_path(tmp_path):
+    """ DRMs folder with a DRM of the uniqueness field coo. """
+    drms_folder = tmp_path / "drms"
+    drms_folder.mkdir()
+    (drms_folder / "drm.yml").write_text(DRM)
+
+    return str(drms_folder)
+
+
+def make_result(coo):
+    """ Parse result with the uniqueness field coo. """
+    return {"fields": {"coo": coo}, "uniqueness_fields": {"coo": coo}}
+
+
+def test_make_key():
+    """
+    Unit: tests the keys of the uniqueness fields of the results.
+    """
+    make_key = UniquenessStore.make_key
+    key = make_key("drm.yml", {"uniqueness_fields": {"coo": "1", "ccf": "2"}})
+
+    assert key == make_key(
+        "drm.yml", {"uniqueness_fields": {"ccf": "2", "coo": "1"}}
+    )
+    assert key != make_key(
+        "drm.yml", {"uniqueness_fields": {"coo": "1", "ccf": "3"}}
+    )
+    assert key != make_key(
+        "other.yml", {"uniqueness_fields": {"coo": "1", "ccf": "2"}}
+    )
+    assert make_key(None, make_result("1")) is None
+    assert make_key("drm.yml", {"fields": {"coo": "1"}}) is None
+    assert make_key("drm.yml", {}) is None
+    assert make_key("drm.yml", [make_result("1")]) is None
+
+
+def test_store_bulk_lookup():
+    """
+    Unit: tests that many keys are looked up at once and that the first
+          stored result of a key is kept.
+    """
+    store = UniquenessStore()
+    keys = [
+        UniquenessStore.make_key("drm.yml", make_result(str(i)))
+        for i in range(3)
+    ]
+    store.put_many([(keys[0], make_result("0")), (keys[1], make_result("1"))])
+    store.put(keys[0], {"fields": {}})
+
+    assert store.get_many(keys) == {
+        keys[0]: make_result("0"),
+        keys[1]: make_result("1"),
+    }
+    assert store.get(keys[2]) is None
+    assert keys[1] in store and keys[2] not in store
+    assert len(store) == 2
+
+    store.clear()
+
+    assert len(store) == 0
+
+
+def test_store_many_keys():
+    """
+    Unit: tests the lookup of more keys than a single query takes.
+    """
+    store = UniquenessStore()
+    store.put_many((str(i), {"number": i}) for i in range(2000))
+
+    assert len(store.get_many(str(i) for i in range(0, 4000, 2))) == 1000
+
+
+def test_store_skips_partial_results():
+    """
+    Unit: tests that the results with skipped sections are not stored.
+    """
+    store = UniquenessStore()
+    store.put("key", {"fields": {}, "skipped_sections": ["table"]})
+
+    assert len(store) == 0
+
+
+def test_store_shared_by_path(tmp_path):
+    """
+    Unit: tests that the pickled store opens the same SQLite file once.
+    """
+    store = UniquenessStore(str(tmp_path / "store.sqlite3"))
+    store.put("key", {"fields": {}})
+    other = pickle.loads(pickle.dumps(store))
+
+    assert other.path == store.path
+    assert other.get("key") == {"fields": {}}
+
+    # the connection is opened once per process
+    assert pickle.loads(pickle.dumps(store)) is other
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parse_many_reuses_stored_results(tmp_path, drms_path, workers):
+    """
+    Unit: tests that the documents with stored uniqueness fields are not
+          parsed again, also within the same chunk.
+    """
+    store = UniquenessStore(str(tmp_path / "store.sqlite3"))
+    store.put(
+        UniquenessStore.make_key("drm.yml", make_result("1")), make_result("1")
+    )
+    ocr_results = [
+        "store coo: 1 total: 10",
+        "store coo: 2 total: 20",
+        "store coo: 2 total: 99",
+        "store total: 30",
+    ]
+    results = list(
+        parse_many(
+            ocr_results, drms_path, workers=workers, uniqueness_store=store
+        )
+    )
+
+    parsed = {
+        "fields": {"coo": "2", "total": "20"},
+        "table": {},
+        "uniqueness_fields": {"coo": "2"},
+    }
+
+    assert [result.data for result in results] == [
+        make_result("1"),
+        parsed,
+        parsed,
+        {},
+    ]
+    assert len(store) == 2
+
+
+def test_parse_many_keys_by_drm(tmp_path):
+    """
+    Unit: tests that the same uniqueness fields of documents of different
+          DRMs, e.g. the COO of two stores, are not duplicates.
+    """
+    for store_number in ("1", "2"):
+        (tmp_path / ("drm_%s.yml" % store_number)).write_text(
+            DRM.replace("- store", "- loja " + store_number)
+        )
+
+    results = list(
+        parse_many(
+            ["loja 1 coo: 7 total: 10", "loja 2 coo: 7 total: 20"],
+            str(tmp_path),
+            workers=1,
+            uniqueness_store=UniquenessStore(),
+        )
+    )
+
+    assert [result.data["fields"]["total"] for result in results] == [
+        "10",
+        "20",
+    ]
+
+
+def test_parse_many_skips_duplicates(drms_path):
+    """
+    Unit: tests that the stored documents are not yielded and that the
+          documents are identified and extracted once.
+    """
+    store = UniquenessStore()
+    ocr_results = ["store coo: 1", "store coo: 2", "store coo: 1"]
+
+    with mock.patch(
+        "regex4ocr.batch.get_first_drm_match", wraps=get_first_drm_match
+    ) as identify, mock.patch(
+        "regex4ocr.batch.extract_pre_processed", wraps=extract_pre_processed
+    ) as extract:
+        results = list(
+            parse_many(
+                ocr_results,
+                drms_path,
+                workers=1,
+                chunksize=2,
+                uniqueness_store=store,
+                skip_duplicates=True,
+            )
+        )
+
+    assert [result.index for result in results] == [0, 1]
+    assert identify.call_count == 3
+    assert extract.call_count == 2
+
+
+@pytest.mark.parametrize("regex_timeout", [None, 1.0])
+def test_parse_many_time_limits(drms_path, regex_timeout):
+    """
+    Unit: tests the stored documents with the time limits.
+    """
+    store = UniquenessStore()
+    ocr_results = ["store coo: 1 total: 10", "store coo: 1 total: 99", "x"]
+    results = list(
+        parse_many(
+            ocr_results,
+            drms_path,
+            workers=1,
+            deadline=10.0,
+            regex_timeout=regex_timeout,
+            uniqueness_store=store,
+        )
+    )
+
+    assert [result.data for result in results] == [
+        {
+            "fields": {"coo": "1", "total": "10"},
+            "table": {},
+            "uniqueness_fields": {"coo": "1"},
+        },
+    ] * 2 + [{}]
+    assert len(store) == 1
+
+
+def test_parse_many_deadline_per_document(drms_path):
+    """
+    Unit: tests that the deadline of each document is not spent while the
+          other documents of its chunk are identified and extracted.
+    """
+    ocr_results = ["store coo: %s total: 10" % i for i in range(6)]
+
+    def slow_pre_process(ocr_result, drm):
+        time.sleep(0.05)
+        return pre_process_result(ocr_result, drm)
+
+    with mock.patch(
+        "regex4ocr.batch.pre_process_result", side_effect=slow_pre_process
+    ):
+        results = list(
+            parse_many(
+                ocr_results,
+                drms_path,
+                workers=1,
+                deadline=0.2,
+                uniqueness_store=UniquenessStore(),
+            )
+        )
+
+    assert all("skipped_sections" not in result.data for result in results)
+    assert [result.data["fields"]["coo"] for result in results] == [
+        str(i) for i in range(6)
+    ]
+
+
+def test_parse_many_invalid_store(drms_path):
+    """
+    Unit: tests the options not available with the uniqueness store.
+    """
+    store = UniquenessStore()
+
+    with pytest.raises(ValueError):
+        list(parse_many([], drms_path, workers=2, uniqueness_store=store))
+
+    with pytest.raises(ValueError):
+        list(
+            parse_many(
+                [],
+                drms_path,
+                workers=1,
+                selection="all_matches",
+                uniqueness_store=store,
+            )
+        )
@@ -0,0 +1,68 @@
+"""
+Module with unit tests for the validation functions.
+"""
+import pytest
+
+from regex4ocr.parser.validation import is_valid_drm
+
+
+@pytest.mark.parametrize(
+    "drm,is_valid",
+    [
+        ({"identifiers": ["id1"], "fields": {}}, True),
+        ({"identifiers": ["id1"]}, False),
+        ({"fields": {}}, False),
+        ({"identifiers": ["id1"], "fields": {}, "priority": 10}, True),
+        ({"identifiers": ["id1"], "fields": {}, "priority": -2.5}, True),
+        ({"identifiers": ["id1"], "fields": {}, "priority": "high"}, False),
+        ({"identifiers": ["id1"], "fields": {}, "priority": True}, False),
+        ({"identifiers": ["id1"], "fields": {}, "sequential": True}, True),
+        ({"identifiers": ["id1"], "fields": {}, "sequential": "yes"}, False),
+        (
+            {"identifiers": ["id1"], "fields": {}, "sequential_fallback": 0},
+            False,
+        ),
+        (
+            {
+                "identifiers": ["id1"],
+                "fields": {"a": "a", "b": "b", "c": "c"},
+                "regions": {
+                    "a": "before_table",
+                    "b": "after_table",
+                    "c": {"lines": [-3, None]},
+                },
+            },
+            True,
+        ),
+        (
+            {
+                "identifiers": ["id1"],
+                "fields": {"a": "a"},
+                "regions": {"b": "before_table"},
+            },
+            False,
+        ),
+        (
+            {
+                "identifiers": ["id1"],
+                "fields": {"a": "a"},
+                "regions": {"a": "inside_table"},
+            },
+            False,
+        ),
+        (
+            {
+                "identifiers": ["id1"],
+                "fields": {"a": "a"},
+                "regions": {"a": {"lines": [0, "10"]}},
+            },
+            False,
+        ),
+    ],
+)
+def test_is_valid_drm(drm, is_valid):
+    """
+    Unit: tests the DRM required keys, priority, sequential and regions
+          validation.
+    """
+    assert is_valid_drm(drm) == is_valid